@@ -0,0 +1,68 @@
+from django.contrib import admin, messages
+
+from .models import ApiKey, generate_key, hash_key
+
+
+@admin.register(ApiKey)
+class ApiKeyAdmin(admin.ModelAdmin):
+    """Административный интерфейс для модели ApiKey.
+
+    Ключ в открытом виде показывается один раз - в сообщении после
+    создания. Отзыв выполняется действием списка.
+
+    Attributes:
+        list_display (tuple): Поля, отображаемые в списке ключей.
+        list_filter (tuple): Поля для фильтрации списка ключей.
+        search_fields (tuple): Поля для поиска по ключам.
+        fields (tuple): Поля формы.
+        readonly_fields (tuple): Поля только для чтения.
+        actions (list): Действия над выбранными ключами.
+    """
+    list_display = (
+        'name',
+        'prefix',
+        'user',
+        'created_at',
+        'expires_at',
+        'revoked_at'
+    )
+    list_filter = (
+        'revoked_at',
+    )
+    search_fields = (
+        'name',
+        'prefix',
+        'user__username'
+    )
+    fields = (
+        'user',
+        'name',
+        'expires_at',
+        'prefix',
+        'created_at',
+        'revoked_at'
+    )
+    readonly_fields = (
+        'prefix',
+        'created_at',
+        'revoked_at'
+    )
+    actions = ['revoke_keys']
+
+    def save_model(self, request, obj, form, change):
+        """Выпускает ключ при создании и показывает его пользователю."""
+        if not change:
+            obj.prefix, raw_key = generate_key()
+            obj.key_hash = hash_key(raw_key)
+            self.message_user(
+                request,
+                f"Ключ: {raw_key} - сохраните его, повторно он показан не будет",
+                messages.WARNING
+            )
+        super().save_model(request, obj, form, change)
+
+    @admin.action(description="Отозвать выбранные ключи")
+    def revoke_keys(self, request, queryset):
+        """Отзывает выбранные ключи (по одному, чтобы сработала очистка кэша)."""
+        for api_key in queryset:
+            api_key.revoke()
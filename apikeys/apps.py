@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ApiKeysConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apikeys'
+    verbose_name = 'API-ключи'
+
+    def ready(self):
+        from . import signals  # noqa: F401
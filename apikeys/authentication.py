@@ -0,0 +1,54 @@
+"""Аутентификация API по ключу.
+
+Клиент передает заголовок ``Authorization: Api-Key <ключ>``. Проверка -
+это один SHA-256 и чтение из кэша, без хэширования пароля (PBKDF2),
+которое выполняет BasicAuthentication на каждом запросе.
+"""
+
+from django.utils import timezone
+from rest_framework import authentication, exceptions
+
+from .cache import INVALID, lookup
+from .models import hash_key
+
+
+class ApiKeyAuthentication(authentication.BaseAuthentication):
+    """Аутентификация по заголовку Authorization: Api-Key <ключ>.
+
+    Attributes:
+        keyword (str): Схема в заголовке Authorization.
+    """
+    keyword = 'Api-Key'
+
+    def authenticate(self, request):
+        """Проверяет API-ключ из заголовка запроса.
+
+        Returns:
+            tuple: (User, None) или None, если заголовок с ключом не передан.
+
+        Raises:
+            AuthenticationFailed: Если ключ неверный, отозван или истек.
+        """
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Некорректный заголовок API-ключа')
+        try:
+            raw_key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Некорректный заголовок API-ключа')
+
+        entry = lookup(hash_key(raw_key))
+        if entry == INVALID:
+            raise exceptions.AuthenticationFailed('Недействительный API-ключ')
+        user, expires_at = entry
+        if expires_at is not None and expires_at <= timezone.now():
+            raise exceptions.AuthenticationFailed('Срок действия API-ключа истек')
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('Пользователь неактивен')
+        return user, None
+
+    def authenticate_header(self, request):
+        """Значение WWW-Authenticate для ответа 401."""
+        return self.keyword
@@ -0,0 +1,73 @@
+"""Кэш проверки API-ключей.
+
+Проверенный ключ (пользователь и срок действия) хранится в кэше Django по
+хэшу ключа API_KEY_CACHE_TTL секунд, поэтому повторные запросы клиента не
+читают ApiKey и пользователя из БД.
+
+Кэш по умолчанию локален для процесса, поэтому согласованность между
+процессами (воркерами gunicorn, командой revoke_api_key) обеспечивает
+счетчик ApiKeyVersion в БД, как ReferenceVersion для справочников:
+- сигналы save/delete ключей и изменения их владельцев увеличивают
+  счетчик (см. signals.py);
+- версия входит в ключ записи кэша и читается из основной БД при каждой
+  проверке, так что после отзыва ключа старые записи не используются ни
+  одним процессом и вытесняются по TTL.
+
+Неизвестные хэши не кэшируются: иначе подбор ключей заполнял бы кэш.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from cashflow.db.replica import PRIMARY_DATABASE_ALIAS
+from cashflow.metrics import record_cache
+from .models import ApiKey, ApiKeyVersion
+
+API_KEY_CACHE_TTL = getattr(settings, 'API_KEY_CACHE_TTL', 300)
+
+# Отметка для отозванных и истекших ключей
+INVALID = 'invalid'
+
+
+def cache_key(key_hash, version):
+    """Ключ записи кэша для хэша API-ключа и версии ключей."""
+    return f'apikeys:{version}:{key_hash}'
+
+
+def _current_version():
+    """Читает счетчик версий API-ключей из основной БД (не с реплики)."""
+    versions = ApiKeyVersion.objects.using(PRIMARY_DATABASE_ALIAS).filter(pk=1)
+    version = versions.values_list('version', flat=True).first()
+    return version or 0
+
+
+def lookup(key_hash):
+    """Находит владельца API-ключа, используя кэш.
+
+    Args:
+        key_hash (str): SHA-256 ключа.
+
+    Returns:
+        tuple: (User, expires_at) или INVALID, если ключ не найден или отозван.
+    """
+    key = cache_key(key_hash, _current_version())
+    entry = cache.get(key)
+    record_cache('apikeys', entry is not None)
+    if entry is None:
+        api_key = ApiKey.objects.select_related('user').filter(key_hash=key_hash).first()
+        if api_key is None:
+            return INVALID
+        entry = (api_key.user, api_key.expires_at) if api_key.is_active() else INVALID
+        cache.set(key, entry, API_KEY_CACHE_TTL)
+    return entry
+
+
+def bump_version():
+    """Увеличивает версию API-ключей.
+
+    Записи кэша с прежней версией перестают использоваться во всех
+    процессах при следующей проверке ключа.
+    """
+    if not ApiKeyVersion.objects.filter(pk=1).update(version=F('version') + 1):
+        ApiKeyVersion.objects.get_or_create(pk=1, defaults={'version': 1})
@@ -0,0 +1,38 @@
+"""Команда выпуска API-ключа."""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apikeys.models import ApiKey
+
+
+class Command(BaseCommand):
+    """Выпускает API-ключ для пользователя и печатает его.
+
+    Использование:
+        python manage.py create_api_key <username> --name "Отчеты" [--days 90]
+    """
+    help = 'Выпускает API-ключ для пользователя'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Владелец ключа')
+        parser.add_argument('--name', required=True, help='Описание клиента')
+        parser.add_argument('--days', type=int, help='Срок действия в днях (по умолчанию - бессрочно)')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get_by_natural_key(options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Пользователь '{options['username']}' не найден")
+        if options['days'] is not None and options['days'] <= 0:
+            raise CommandError('--days должно быть положительным')
+
+        expires_at = None
+        if options['days']:
+            expires_at = timezone.now() + timedelta(days=options['days'])
+        api_key, raw_key = ApiKey.objects.create_key(user, options['name'], expires_at=expires_at)
+        self.stderr.write(f'Ключ {api_key} выпущен, повторно он показан не будет')
+        self.stdout.write(raw_key)
@@ -0,0 +1,28 @@
+"""Команда отзыва API-ключа."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apikeys.models import ApiKey
+
+
+class Command(BaseCommand):
+    """Отзывает API-ключ по префиксу.
+
+    Отзыв увеличивает ApiKeyVersion, поэтому работающие процессы
+    перестают принимать ключ со следующего запроса.
+
+    Использование:
+        python manage.py revoke_api_key <prefix>
+    """
+    help = 'Отзывает API-ключ по префиксу'
+
+    def add_arguments(self, parser):
+        parser.add_argument('prefix', help='Префикс ключа (часть до точки)')
+
+    def handle(self, *args, **options):
+        try:
+            api_key = ApiKey.objects.get(prefix=options['prefix'])
+        except ApiKey.DoesNotExist:
+            raise CommandError(f"Ключ с префиксом '{options['prefix']}' не найден")
+        api_key.revoke()
+        self.stdout.write(self.style.SUCCESS(f'Ключ {api_key} отозван'))
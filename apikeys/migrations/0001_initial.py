@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-18 20:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+                ('prefix', models.CharField(editable=False, max_length=8, unique=True, verbose_name='Префикс')),
+                ('key_hash', models.CharField(editable=False, max_length=64, unique=True, verbose_name='Хэш ключа')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата выпуска')),
+                ('expires_at', models.DateTimeField(blank=True, null=True, verbose_name='Действует до')),
+                ('revoked_at', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Отозван')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='api_keys', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'API-ключ',
+                'verbose_name_plural': 'API-ключи',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2 on 2026-10-18 21:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apikeys', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiKeyVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Версия')),
+            ],
+            options={
+                'verbose_name': 'Версия API-ключей',
+                'verbose_name_plural': 'Версии API-ключей',
+            },
+        ),
+    ]
@@ -0,0 +1,188 @@
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+KEY_PREFIX_LENGTH = 8
+
+
+def hash_key(raw_key):
+    """Хэш API-ключа для хранения и поиска.
+
+    Ключ - случайная строка высокой энтропии, поэтому достаточно SHA-256
+    без соли и растяжения (в отличие от паролей пользователей).
+
+    Args:
+        raw_key (str): Ключ в открытом виде.
+
+    Returns:
+        str: Шестнадцатеричный SHA-256.
+    """
+    return hashlib.sha256(raw_key.encode()).hexdigest()
+
+
+def generate_key():
+    """Генерирует новый API-ключ.
+
+    Returns:
+        tuple: (префикс, ключ в открытом виде вида "<префикс>.<секрет>").
+    """
+    prefix = secrets.token_hex(KEY_PREFIX_LENGTH // 2)
+    return prefix, f'{prefix}.{secrets.token_urlsafe(32)}'
+
+
+class ApiKeyManager(models.Manager):
+    """Менеджер API-ключей.
+
+    Methods:
+        create_key: Выпускает новый ключ для пользователя.
+    """
+
+    def create_key(self, user, name, expires_at=None):
+        """Выпускает новый API-ключ.
+
+        Ключ в открытом виде возвращается только здесь, в БД хранится
+        его хэш.
+
+        Args:
+            user (User): Владелец ключа.
+            name (str): Описание клиента, которому выдан ключ.
+            expires_at (datetime): Срок действия (None - бессрочно).
+
+        Returns:
+            tuple: (ApiKey, ключ в открытом виде).
+        """
+        prefix, raw_key = generate_key()
+        api_key = self.create(
+            user=user,
+            name=name,
+            prefix=prefix,
+            key_hash=hash_key(raw_key),
+            expires_at=expires_at,
+        )
+        return api_key, raw_key
+
+
+class ApiKey(models.Model):
+    """API-ключ сервисного клиента.
+
+    Attributes:
+        user (ForeignKey): Пользователь, от имени которого работает клиент.
+        name (CharField): Описание клиента.
+        prefix (CharField): Открытая часть ключа для опознания в админке.
+        key_hash (CharField): SHA-256 ключа.
+        created_at (DateTimeField): Дата выпуска.
+        expires_at (DateTimeField): Срок действия (пусто - бессрочно).
+        revoked_at (DateTimeField): Дата отзыва (пусто - действует).
+
+    Methods:
+        is_active: Действует ли ключ на указанный момент.
+        revoke: Отзывает ключ.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='api_keys',
+        verbose_name="Пользователь"
+    )
+    name = models.CharField(
+        max_length=100,
+        verbose_name="Название"
+    )
+    prefix = models.CharField(
+        max_length=KEY_PREFIX_LENGTH,
+        unique=True,
+        editable=False,
+        verbose_name="Префикс"
+    )
+    key_hash = models.CharField(
+        max_length=64,
+        unique=True,
+        editable=False,
+        verbose_name="Хэш ключа"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата выпуска"
+    )
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Действует до"
+    )
+    revoked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Отозван"
+    )
+
+    objects = ApiKeyManager()
+
+    class Meta:
+        verbose_name = "API-ключ"
+        verbose_name_plural = "API-ключи"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        """Строковое представление ключа.
+
+        Returns:
+            str: Название и префикс ключа.
+        """
+        return f"{self.name} ({self.prefix}…)"
+
+    def is_active(self, now=None):
+        """Проверяет, действует ли ключ.
+
+        Args:
+            now (datetime): Момент проверки (по умолчанию - текущий).
+
+        Returns:
+            bool: True, если ключ не отозван и не истек.
+        """
+        if self.revoked_at is not None:
+            return False
+        return self.expires_at is None or self.expires_at > (now or timezone.now())
+
+    def revoke(self):
+        """Отзывает ключ.
+
+        Записи кэша проверки ключей во всех процессах устаревают: сигнал
+        post_save увеличивает ApiKeyVersion.
+        """
+        if self.revoked_at is None:
+            self.revoked_at = timezone.now()
+            self.save(update_fields=['revoked_at'])
+
+
+class ApiKeyVersion(models.Model):
+    """Счетчик версий API-ключей.
+
+    Единственная строка (pk=1), значение которой увеличивается при каждом
+    изменении или удалении ключа и изменении владельца ключей. Версия
+    входит в ключ записи кэша проверки, поэтому после отзыва ключа в
+    одном процессе остальные процессы перестают видеть старые записи
+    своих локальных кэшей (см. apikeys.cache).
+
+    Attributes:
+        version (PositiveBigIntegerField): Текущая версия ключей.
+    """
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Версия"
+    )
+
+    class Meta:
+        verbose_name = "Версия API-ключей"
+        verbose_name_plural = "Версии API-ключей"
+
+    def __str__(self):
+        """Строковое представление версии.
+
+        Returns:
+            str: Номер версии.
+        """
+        return str(self.version)
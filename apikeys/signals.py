@@ -0,0 +1,32 @@
+"""Сигналы приложения API-ключей.
+
+Изменение или удаление ключа и изменение его владельца (например,
+деактивация) увеличивают версию API-ключей, и записи кэша проверки
+ключей устаревают во всех процессах.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+
+from .cache import bump_version
+from .models import ApiKey
+
+
+def invalidate_api_key(sender, instance, **kwargs):
+    """Сбрасывает кэш проверки после изменения или удаления ключа."""
+    bump_version()
+
+
+def invalidate_user_keys(sender, instance, **kwargs):
+    """Сбрасывает кэш проверки после изменения владельца ключей.
+
+    Пользователи без ключей (например, при обновлении last_login)
+    версию не меняют.
+    """
+    if ApiKey.objects.filter(user_id=instance.pk).exists():
+        bump_version()
+
+
+post_save.connect(invalidate_api_key, sender=ApiKey, dispatch_uid='apikeys_invalidate_save')
+post_delete.connect(invalidate_api_key, sender=ApiKey, dispatch_uid='apikeys_invalidate_delete')
+post_save.connect(invalidate_user_keys, sender=get_user_model(), dispatch_uid='apikeys_invalidate_user')
@@ -0,0 +1,104 @@
+import multiprocessing
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, connections
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apikeys.cache import _current_version, cache_key
+from apikeys.models import ApiKey, hash_key
+
+
+class ApiKeyAuthenticationTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='service', password='servicepass123')
+
+    def setUp(self):
+        cache.clear()
+        self.api_key, self.raw_key = ApiKey.objects.create_key(self.user, 'Отчеты')
+        self.url = reverse('transaction-list')
+
+    def get(self, raw_key=None):
+        return self.client.get(self.url, HTTP_AUTHORIZATION=f'Api-Key {raw_key or self.raw_key}')
+
+    def test_valid_key_authenticates(self):
+        self.assertEqual(self.get().status_code, status.HTTP_200_OK)
+
+    def test_key_is_stored_hashed(self):
+        self.assertTrue(self.raw_key.startswith(f'{self.api_key.prefix}.'))
+        self.assertNotIn(self.raw_key, self.api_key.key_hash)
+
+    def test_invalid_key_rejected(self):
+        response = self.get(f'{self.api_key.prefix}.wrong')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Api-Key')
+
+    def test_lookup_is_cached(self):
+        self.get()
+        with CaptureQueriesContext(connection) as queries:
+            self.get()
+        self.assertFalse([q for q in queries.captured_queries if '"apikeys_apikey"' in q['sql']])
+
+    def test_unknown_key_is_not_cached(self):
+        self.get(f'{self.api_key.prefix}.wrong')
+        self.assertEqual(cache.get(cache_key(hash_key(f'{self.api_key.prefix}.wrong'), _current_version())), None)
+
+    def test_revoke_invalidates_cache(self):
+        self.assertEqual(self.get().status_code, status.HTTP_200_OK)
+        self.api_key.revoke()
+        self.assertEqual(self.get().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        self.assertEqual(self.get().status_code, status.HTTP_200_OK)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_expired_key_rejected(self):
+        _, raw_key = ApiKey.objects.create_key(
+            self.user, 'Истекший', expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        self.assertEqual(self.get(raw_key).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_commands(self):
+        out = StringIO()
+        call_command('create_api_key', 'service', name='Скрипт', stdout=out, stderr=StringIO())
+        raw_key = out.getvalue().strip()
+        self.assertEqual(self.get(raw_key).status_code, status.HTTP_200_OK)
+
+        call_command('revoke_api_key', raw_key.split('.')[0], stdout=StringIO())
+        self.assertEqual(self.get(raw_key).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+def _revoke_in_process(prefix):
+    # Отдельный процесс со своей копией локального кэша, как второй воркер или manage.py
+    call_command('revoke_api_key', prefix, stdout=StringIO())
+
+
+class ApiKeyCrossProcessTestCase(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='service', password='servicepass123')
+        self.api_key, self.raw_key = ApiKey.objects.create_key(self.user, 'Отчеты')
+
+    def get(self):
+        return self.client.get(reverse('transaction-list'), HTTP_AUTHORIZATION=f'Api-Key {self.raw_key}')
+
+    def test_revoke_in_other_process_propagates(self):
+        self.assertEqual(self.get().status_code, status.HTTP_200_OK)
+        # Дочерний процесс не должен унаследовать открытое соединение SQLite
+        connections.close_all()
+        process = multiprocessing.get_context('fork').Process(target=_revoke_in_process, args=(self.api_key.prefix,))
+        process.start()
+        process.join(timeout=30)
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(self.get().status_code, status.HTTP_401_UNAUTHORIZED)
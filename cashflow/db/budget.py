@@ -0,0 +1,189 @@
+"""Бюджеты числа и времени SQL-запросов на запрос к представлению.
+
+QueryBudgetMiddleware считает запросы ко всем БД (основной и реплике),
+выполненные за время обработки запроса, и сравнивает их с бюджетом
+представления из настройки QUERY_BUDGETS по имени URL:
+
+    QUERY_BUDGETS = {
+        'transactions:list': {'queries': 6, 'ms': 500},
+    }
+
+Бюджет проверяется для методов из ключа methods (по умолчанию - только
+чтение: GET и HEAD), т.к. запись по тому же URL дороже.
+
+Бюджет по числу запросов не должен зависеть от числа строк на странице,
+поэтому его превышение обычно означает N+1 (например, __str__
+справочника в шаблоне без select_related).
+
+При превышении в журнал cashflow.querybudget пишется предупреждение, а
+при QUERY_BUDGET_STRICT (CI, тесты) выбрасывается QueryBudgetExceeded.
+Запросы потоковых ответов, выполненные после выхода из представления,
+не учитываются.
+"""
+
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('cashflow.querybudget')
+
+DEFAULT_METHODS = ('GET', 'HEAD')
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление вышло за бюджет SQL-запросов."""
+
+
+class QueryUsage:
+    """Счетчик SQL-запросов; сам является обработчиком execute_wrapper.
+
+    Attributes:
+        queries (int): Число выполненных запросов.
+        duration (float): Суммарное время запросов, секунд.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.duration += time.perf_counter() - started
+
+    @property
+    def milliseconds(self):
+        """Суммарное время запросов, миллисекунд."""
+        return self.duration * 1000
+
+    def __str__(self):
+        return f"{self.queries} запросов, {self.milliseconds:.1f} мс"
+
+
+class QueryLog(QueryUsage):
+    """Счетчик SQL-запросов, запоминающий каждый запрос и его время.
+
+    Attributes:
+        entries (list): (алиас БД, SQL, время в секундах) по каждому запросу.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.entries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.duration += elapsed
+            self.entries.append((context['connection'].alias, sql, elapsed))
+
+
+def get_budget(view_name, method='GET'):
+    """Бюджет представления из QUERY_BUDGETS для метода запроса.
+
+    Args:
+        view_name (str): Имя URL вида 'namespace:name'.
+        method (str): HTTP-метод запроса.
+
+    Returns:
+        dict: {'queries': int, 'ms': float} (ключи необязательны) или None.
+    """
+    if not view_name:
+        return None
+    budget = getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+    if budget is None or method not in budget.get('methods', DEFAULT_METHODS):
+        return None
+    return budget
+
+
+def check_budget(view_name, usage, method='GET'):
+    """Сравнивает использование с бюджетом представления.
+
+    Args:
+        view_name (str): Имя URL.
+        usage (QueryUsage): Использование за запрос.
+        method (str): HTTP-метод запроса.
+
+    Returns:
+        list: Описания превышений (пустой - бюджет соблюден или не задан).
+    """
+    budget = get_budget(view_name, method)
+    if budget is None:
+        return []
+    violations = []
+    if 'queries' in budget and usage.queries > budget['queries']:
+        violations.append(f"{usage.queries} запросов при бюджете {budget['queries']}")
+    if 'ms' in budget and usage.milliseconds > budget['ms']:
+        violations.append(f"{usage.milliseconds:.1f} мс в БД при бюджете {budget['ms']} мс")
+    return violations
+
+
+def track_queries(usage):
+    """Подключает счетчик ко всем соединениям с БД.
+
+    Args:
+        usage (QueryUsage): Счетчик запросов.
+
+    Returns:
+        ExitStack: Контекстный менеджер, на время которого ведется подсчет.
+    """
+    stack = ExitStack()
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(usage))
+    return stack
+
+
+class QueryBudgetMiddleware:
+    """Считает SQL-запросы представления и проверяет их по QUERY_BUDGETS.
+
+    Использование сохраняется в request.query_usage.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        usage = QueryUsage()
+        with track_queries(usage):
+            response = self.get_response(request)
+        request.query_usage = usage
+
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        violations = check_budget(view_name, usage, request.method)
+        if violations:
+            message = f"Превышен бюджет запросов {view_name} ({request.path}): {'; '.join(violations)}"
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+class QueryBudgetTestMixin:
+    """Проверка бюджета запросов в тестах по ответу тестового клиента."""
+
+    def assertWithinQueryBudget(self, response):
+        """Проверяет, что запрос уложился в бюджет своего представления.
+
+        Args:
+            response: Ответ django.test.Client или APIClient.
+        """
+        request = response.wsgi_request
+        view_name = response.resolver_match.view_name
+        self.assertIsNotNone(
+            get_budget(view_name, request.method),
+            f"Для {view_name} ({request.method}) не задан бюджет в QUERY_BUDGETS"
+        )
+        usage = request.query_usage
+        violations = check_budget(view_name, usage, request.method)
+        self.assertEqual(violations, [], f"{view_name}: {usage}")
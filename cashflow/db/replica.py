@@ -0,0 +1,180 @@
+"""Чтение с реплики БД для списков, отчетов и выгрузок.
+
+Представления, которым достаточно немного устаревших данных, включают
+чтение с реплики через use_replica() (или декоратор replica_reads), и
+ReplicaRouter направляет их чтения на алиас REPLICA_DATABASE_ALIAS.
+Остальное всегда идет на основную БД:
+- любые записи и чтения после записи в том же запросе;
+- запросы клиента в течение REPLICA_PIN_SECONDS после его запроса с
+  записью (cookie), чтобы он сразу видел свои изменения;
+- все запросы, если реплика отстает больше чем на REPLICA_MAX_LAG секунд
+  или недоступна.
+
+Отставание определяется по модели transactions.ReplicationHeartbeat
+(мигрируемая таблица, поэтому работает на любой СУБД): на основной БД в
+нее записывается время (write_heartbeat), и оно реплицируется вместе с
+данными. Локально репликацию заменяет команда sync_replica, которая
+сама пишет heartbeat перед копированием. При настоящей репликации рядом
+с основной БД должна работать команда
+    python manage.py replication_heartbeat --interval 1
+иначе отставание по heartbeat растет и через REPLICA_MAX_LAG секунд все
+чтения возвращаются на основную БД.
+"""
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+REPLICA_DATABASE_ALIAS = 'replica'
+PRIMARY_DATABASE_ALIAS = 'default'
+PIN_COOKIE = 'db_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@dataclass
+class RoutingState:
+    """Состояние маршрутизации чтений в рамках запроса.
+
+    Attributes:
+        pinned (bool): Клиент недавно писал - читать только с основной БД.
+        use_replica (bool): Представление разрешило чтение с реплики.
+        wrote (bool): В запросе уже была запись.
+    """
+    pinned: bool = False
+    use_replica: bool = False
+    wrote: bool = False
+
+
+_state = ContextVar('replica_routing_state', default=None)
+_lag_check = {'checked_at': None, 'available': False}
+
+
+def replica_enabled():
+    """Настроена ли реплика в этом окружении."""
+    return getattr(settings, 'REPLICA_ENABLED', False) and REPLICA_DATABASE_ALIAS in settings.DATABASES
+
+
+def replica_lag():
+    """Отставание реплики по heartbeat.
+
+    Returns:
+        float: Секунды с момента последнего heartbeat или None, если
+        реплика недоступна.
+    """
+    from transactions.models import ReplicationHeartbeat
+
+    try:
+        written_at = ReplicationHeartbeat.objects.using(REPLICA_DATABASE_ALIAS).filter(
+            pk=1).values_list('written_at', flat=True).first()
+    except DatabaseError:
+        return None
+    if written_at is None:
+        return None
+    return max((timezone.now() - written_at).total_seconds(), 0.0)
+
+
+def write_heartbeat(using=PRIMARY_DATABASE_ALIAS):
+    """Записывает текущее время в heartbeat основной БД."""
+    from transactions.models import ReplicationHeartbeat
+
+    ReplicationHeartbeat.objects.using(using).update_or_create(pk=1, defaults={'written_at': timezone.now()})
+
+
+def replica_available():
+    """Можно ли сейчас читать с реплики (с проверкой отставания).
+
+    Результат проверки кэшируется в процессе на
+    REPLICA_LAG_CHECK_INTERVAL секунд.
+    """
+    if not replica_enabled():
+        return False
+    now = time.monotonic()
+    interval = getattr(settings, 'REPLICA_LAG_CHECK_INTERVAL', 1)
+    checked_at = _lag_check['checked_at']
+    if checked_at is None or now - checked_at >= interval:
+        lag = replica_lag()
+        _lag_check['available'] = lag is not None and lag <= settings.REPLICA_MAX_LAG
+        _lag_check['checked_at'] = now
+    return _lag_check['available']
+
+
+def reset_lag_check():
+    """Сбрасывает кэш проверки отставания (после синхронизации реплики)."""
+    _lag_check['checked_at'] = None
+
+
+def use_replica():
+    """Разрешает чтение с реплики до конца текущего запроса.
+
+    Вызывается представлением после аутентификации. Без
+    ReplicaRoutingMiddleware (команды, тесты без клиента) ничего не делает.
+
+    Returns:
+        bool: Будут ли чтения идти на реплику.
+    """
+    state = _state.get()
+    if state is None or state.pinned or state.wrote or not replica_available():
+        return False
+    state.use_replica = True
+    return True
+
+
+def replica_reads(view):
+    """Декоратор представления-функции: чтения идут на реплику."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        use_replica()
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Роутер БД: чтения разрешенных представлений - на реплику, остальное - на основную БД."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is not None and state.use_replica and not state.wrote:
+            return REPLICA_DATABASE_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY_DATABASE_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплики приходит вместе с данными
+        return db != REPLICA_DATABASE_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """Создает состояние маршрутизации на запрос и закрепляет писавших клиентов за основной БД."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
@@ -0,0 +1,275 @@
+"""Журнал медленных SQL-запросов с местом вызова.
+
+SlowQueryMiddleware подключает SlowQueryLogger ко всем соединениям на
+время запроса. Запрос дольше SLOW_QUERY_THRESHOLD_MS миллисекунд
+записывается в журнал cashflow.slowquery; в settings.LOGGING журнал
+направлен в файл SLOW_QUERY_LOG (ротирует внешний logrotate) по записи
+JSON на строку:
+
+    {"time": "...", "duration_ms": 153.2, "alias": "default",
+     "view": "transactions:list", "view_func": "transactions.views.transaction_list",
+     "method": "GET", "path": "/?...",
+     "sql": "SELECT ...", "params": ["'2024-01-01'"], "many": false,
+     "fingerprint": "3f2a...", "frame": {"file": "transactions/views.py",
+     "line": 120, "function": "transaction_list", "code": "..."},
+     "stack": ["transactions/views.py:120 in transaction_list", ...]}
+
+frame - ближайший к запросу кадр кода приложений проекта (без Django,
+библиотек и инфраструктуры cashflow/). Для ленивого QuerySet, вычисленного
+в шаблоне, это строка render(...) представления; None - если в стеке нет
+кода приложений (например, запрос сессии из middleware или QuerySet
+ListView, вычисленный при отрисовке TemplateResponse) - тогда место
+указывает view_func.
+
+Параметры запросов к таблицам SLOW_QUERY_REDACTED_TABLES (сессии,
+пользователи, API-ключи) не записываются: вместо списка - REDACTED.
+
+Сводка по fingerprint (SQL без значений) - команда slow_query_report.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import time
+import traceback
+from contextlib import ExitStack
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('cashflow.slowquery')
+
+DEFAULT_THRESHOLD_MS = 100
+MAX_PARAMS = 50
+MAX_PARAM_LENGTH = 200
+MAX_STACK = 10
+# Каталоги кода, который не считается местом вызова
+INFRASTRUCTURE_DIRS = ('cashflow',)
+DEFAULT_REDACTED_TABLES = ('django_session', 'auth_user', 'apikeys_apikey')
+REDACTED = '<скрыто>'
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*\?\s*,?)+\)', re.IGNORECASE)
+_VALUES_RE = re.compile(r'\bVALUES\s*(?:\([^()]*\)\s*,?\s*)+', re.IGNORECASE)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """SQL без значений: литералы и числа заменены на ?, списки IN и VALUES свернуты.
+
+    Запросы, отличающиеся только значениями или длиной списка
+    IN (%s, %s, ...), получают одинаковый текст.
+    """
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    sql = _VALUES_RE.sub('VALUES (...) ', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    """Короткий хэш нормализованного SQL (см. normalize_sql)."""
+    return hashlib.sha1(normalize_sql(sql).encode()).hexdigest()[:12]
+
+
+def get_threshold_ms():
+    return getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', DEFAULT_THRESHOLD_MS)
+
+
+@lru_cache(maxsize=8)
+def _tables_re(tables):
+    return re.compile(r'\b(?:%s)\b' % '|'.join(map(re.escape, tables)))
+
+
+def _format_params(sql, params, many):
+    if params is None:
+        return None
+    tables = tuple(getattr(settings, 'SLOW_QUERY_REDACTED_TABLES', DEFAULT_REDACTED_TABLES))
+    if tables and _tables_re(tables).search(sql):
+        return REDACTED
+    if many:
+        # Для executemany - только первая строка параметров
+        params = next(iter(params), ())
+    if isinstance(params, dict):
+        params = list(params.values())
+    return [repr(value)[:MAX_PARAM_LENGTH] for value in list(params)[:MAX_PARAMS]]
+
+
+def _project_frames():
+    """Кадры стека из кода приложений проекта, от внешнего к ближайшему."""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    frames = []
+    for frame in traceback.extract_stack():
+        # <stdin>, <frozen ...> и т.п. - не файлы проекта
+        if not Path(frame.filename).is_absolute():
+            continue
+        try:
+            path = Path(frame.filename).resolve().relative_to(base_dir)
+        except ValueError:
+            continue
+        if path.parts[0] in INFRASTRUCTURE_DIRS or 'site-packages' in path.parts or path.parts[0].startswith('.'):
+            continue
+        frames.append((path.as_posix(), frame))
+    return frames
+
+
+class SlowQueryLogger:
+    """Обработчик execute_wrapper, записывающий медленные запросы.
+
+    Attributes:
+        request: HttpRequest, в рамках которого выполняются запросы (или None).
+        threshold (float): Порог, миллисекунд.
+    """
+
+    def __init__(self, request=None, threshold=None):
+        self.request = request
+        self.threshold = get_threshold_ms() if threshold is None else threshold
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            if duration >= self.threshold:
+                self.log(sql, params, many, context['connection'].alias, duration)
+
+    def log(self, sql, params, many, alias, duration):
+        frames = _project_frames()
+        frame = None
+        if frames:
+            path, nearest = frames[-1]
+            frame = {'file': path, 'line': nearest.lineno, 'function': nearest.name, 'code': nearest.line}
+        entry = {
+            'duration_ms': round(duration, 2),
+            'alias': alias,
+            'view': None,
+            'view_func': None,
+            'method': None,
+            'path': None,
+            'sql': sql,
+            'params': _format_params(sql, params, many),
+            'many': many,
+            'fingerprint': fingerprint(sql),
+            'frame': frame,
+            'stack': [f'{path}:{item.lineno} in {item.name}' for path, item in frames[-MAX_STACK:]],
+        }
+        if self.request is not None:
+            match = self.request.resolver_match
+            view = getattr(match.func, 'view_class', match.func) if match else None
+            entry.update({
+                'view': match.view_name if match else None,
+                'view_func': f'{view.__module__}.{view.__qualname__}' if view else None,
+                'method': self.request.method,
+                'path': self.request.get_full_path(),
+            })
+        logger.warning('Медленный запрос %.1f мс: %s', duration, entry['fingerprint'], extra={'slow_query': entry})
+
+
+def track_slow_queries(request=None, threshold=None):
+    """Подключает SlowQueryLogger ко всем соединениям с БД.
+
+    Подходит и для команд: with track_slow_queries(): ...
+
+    Returns:
+        ExitStack: Контекстный менеджер, на время которого ведется журнал.
+    """
+    wrapper = SlowQueryLogger(request, threshold)
+    stack = ExitStack()
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(wrapper))
+    return stack
+
+
+class SlowQueryMiddleware:
+    """Записывает медленные SQL-запросы представлений в журнал cashflow.slowquery."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with track_slow_queries(request):
+            return self.get_response(request)
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирует запись журнала как одну строку JSON.
+
+    Поля из extra={'slow_query': {...}} добавляются на верхний уровень.
+    """
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, dt_timezone.utc).isoformat(),
+            'level': record.levelname,
+            'message': record.getMessage(),
+            **getattr(record, 'slow_query', {}),
+        }
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def read_entries(paths):
+    """Читает записи журнала медленных запросов.
+
+    Строки, которые не являются JSON-объектами с полем sql, пропускаются.
+
+    Args:
+        paths (iterable): Файлы журнала (текущий и ротированные).
+
+    Yields:
+        dict: Запись журнала.
+    """
+    for path in paths:
+        with open(path, encoding='utf-8') as stream:
+            for line in stream:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and 'sql' in entry:
+                    yield entry
+
+
+def summarize_entries(entries):
+    """Сводка записей по fingerprint.
+
+    Returns:
+        list: Словари {'fingerprint', 'count', 'total_ms', 'mean_ms', 'max_ms',
+        'views', 'frames', 'sql'} (views и frames - {значение: количество}),
+        по убыванию суммарного времени.
+    """
+    groups = {}
+    for entry in entries:
+        key = entry.get('fingerprint') or fingerprint(entry['sql'])
+        group = groups.setdefault(key, {
+            'fingerprint': key, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            'views': {}, 'frames': {}, 'sql': normalize_sql(entry['sql']),
+        })
+        duration = float(entry.get('duration_ms') or 0)
+        group['count'] += 1
+        group['total_ms'] += duration
+        group['max_ms'] = max(group['max_ms'], duration)
+        view = entry.get('view') or '-'
+        group['views'][view] = group['views'].get(view, 0) + 1
+        frame = entry.get('frame')
+        if frame:
+            site = f"{frame['file']}:{frame['line']} in {frame['function']}"
+        else:
+            site = entry.get('view_func') or '-'
+        group['frames'][site] = group['frames'].get(site, 0) + 1
+
+    summary = []
+    for group in groups.values():
+        group['total_ms'] = round(group['total_ms'], 2)
+        group['mean_ms'] = round(group['total_ms'] / group['count'], 2)
+        group['views'] = dict(sorted(group['views'].items(), key=lambda item: -item[1]))
+        group['frames'] = dict(sorted(group['frames'].items(), key=lambda item: -item[1]))
+        summary.append(group)
+    summary.sort(key=lambda group: group['total_ms'], reverse=True)
+    return summary
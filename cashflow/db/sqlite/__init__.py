@@ -0,0 +1 @@
+"""SQLite-бэкенд с настройками для нескольких процессов (WAL, busy timeout, BEGIN IMMEDIATE)."""
@@ -0,0 +1,82 @@
+"""SQLite-бэкенд для работы под несколькими воркерами.
+
+Отличия от django.db.backends.sqlite3:
+- при открытии соединения выполняются PRAGMA из PRAGMAS настроек БД
+  (по умолчанию DEFAULT_PRAGMAS: WAL, synchronous=NORMAL, mmap, кэш
+  страниц), поэтому читатели и писатель не блокируют друг друга;
+- транзакции (transaction.atomic) начинаются с BEGIN IMMEDIATE: блокировка
+  на запись берется сразу и ожидается по busy timeout (OPTIONS['timeout']),
+  вместо мгновенной ошибки "database is locked" при повышении
+  блокировки чтения до записи;
+- если блокировка не получена за busy timeout, начало транзакции
+  повторяется WRITE_RETRIES раз с экспоненциальной паузой. До BEGIN
+  ничего не записано, поэтому повтор безопасен.
+
+BEGIN IMMEDIATE выполняется для каждого внешнего atomic(), в том числе
+для блоков, которые только читают: такой блок ждет текущего писателя и
+сам задерживает остальных писателей до своего завершения (читатели вне
+транзакций не блокируются благодаря WAL). В коде приложений atomic()
+используется только для записи; из Django так работают, например,
+страницы изменения объекта в админке (changeform_view открывает
+транзакцию и на GET). Поэтому чтения не нужно оборачивать в atomic(), а
+транзакции должны быть короткими. Отложенный BEGIN здесь не подходит:
+повышение блокировки чтения до записи в WAL при параллельной записи
+завершается ошибкой "database is locked" сразу, без ожидания busy
+timeout, и повторить его можно только с начала транзакции.
+"""
+
+import time
+
+from django.db import OperationalError
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # в КиБ: 64 МиБ на соединение
+    'temp_store': 'MEMORY',
+}
+
+DEFAULT_WRITE_RETRIES = 3
+RETRY_DELAY = 0.05
+
+
+def is_locked_error(exc):
+    """Проверяет, что ошибка вызвана блокировкой БД другим соединением."""
+    message = str(exc).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Соединение SQLite с PRAGMA, BEGIN IMMEDIATE и повтором начала транзакции.
+
+    Дополнительные ключи настроек БД:
+        PRAGMAS (dict): PRAGMA, выполняемые при открытии соединения.
+        WRITE_RETRIES (int): Повторы BEGIN IMMEDIATE после истечения busy timeout.
+    """
+
+    @property
+    def pragmas(self):
+        return self.settings_dict.get('PRAGMAS', DEFAULT_PRAGMAS)
+
+    @property
+    def write_retries(self):
+        return self.settings_dict.get('WRITE_RETRIES', DEFAULT_WRITE_RETRIES)
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        """Начинает транзакцию с блокировкой на запись (BEGIN IMMEDIATE)."""
+        for attempt in range(self.write_retries + 1):
+            try:
+                self.cursor().execute('BEGIN IMMEDIATE')
+                return
+            except OperationalError as exc:
+                if not is_locked_error(exc) or attempt == self.write_retries:
+                    raise
+                time.sleep(RETRY_DELAY * 2 ** attempt)
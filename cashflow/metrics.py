@@ -0,0 +1,342 @@
+"""Метрики приложения в текстовом формате Prometheus.
+
+Собираются:
+- cashflow_http_requests_total и гистограмма
+  cashflow_http_request_duration_seconds - по имени URL (view), методу и
+  статусу; имя URL, а не путь, чтобы число рядов было ограничено;
+- гистограмма cashflow_db_query_duration_seconds - время SQL-запросов,
+  сгруппированных по представлению, алиасу БД и виду запроса (statement:
+  SELECT, INSERT, UPDATE, DELETE или OTHER); отдельные запросы и их
+  форма не различаются - для этого есть журнал медленных запросов
+  (cashflow/db/slowlog.py); и гистограмма cashflow_db_queries_per_request
+  - число запросов за HTTP-запрос;
+- cashflow_cache_requests_total - обращения к кэшам (справочники,
+  API-ключи) с результатом hit/miss.
+
+Каждый процесс (воркер gunicorn) копит приращения в памяти, а фоновый
+поток раз в METRICS_FLUSH_INTERVAL секунд прибавляет их к общей
+SQLite-базе METRICS_DB одной транзакцией (UPSERT value = value +
+приращение), так что запись в базу не задерживает ответы. Все метрики -
+счетчики и гистограммы, поэтому сумма по процессам корректна, а значения
+переживают перезапуск воркеров. Эндпоинт /metrics отдает сумму из базы.
+
+Доступ к /metrics: с токеном METRICS_TOKEN (заголовок Authorization:
+Bearer <токен>, как bearer_token в Prometheus) или, если токен не задан,
+с адресов METRICS_ALLOWED_IPS. За обратным прокси REMOTE_ADDR - адрес
+самого прокси, и проверка по адресу пропустит любого клиента: там нужен
+токен (или закрыть /metrics на прокси).
+
+Оповещение о росте p99:
+    histogram_quantile(0.99, sum by (le, view)
+        (rate(cashflow_http_request_duration_seconds_bucket[5m])))
+"""
+
+import atexit
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import closing
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from cashflow.db.budget import QueryLog, track_queries
+
+logger = logging.getLogger('cashflow.metrics')
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+UNRESOLVED_VIEW = '<unresolved>'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+QUERY_COUNT_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+# Значения метки statement; остальные запросы (SAVEPOINT, PRAGMA, ...) - OTHER
+STATEMENTS = {'SELECT': 'SELECT', 'WITH': 'SELECT', 'INSERT': 'INSERT', 'UPDATE': 'UPDATE', 'DELETE': 'DELETE'}
+# Нижняя граница интервала фонового сброса, секунд
+MIN_FLUSH_INTERVAL = 0.05
+
+# Семейства метрик: имя -> (тип, описание)
+FAMILIES = {
+    'cashflow_http_requests_total': ('counter', 'HTTP-запросы по имени URL, методу и статусу'),
+    'cashflow_http_request_duration_seconds': ('histogram', 'Время обработки HTTP-запроса'),
+    'cashflow_db_query_duration_seconds': ('histogram', 'Время SQL-запросов по представлению, БД и виду запроса'),
+    'cashflow_db_queries_per_request': ('histogram', 'Число SQL-запросов за HTTP-запрос'),
+    'cashflow_cache_requests_total': ('counter', 'Обращения к кэшам: hit - из кэша, miss - загрузка'),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metric_samples (
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (name, labels)
+) WITHOUT ROWID
+"""
+UPSERT = """
+INSERT INTO metric_samples (name, labels, value) VALUES (?, ?, ?)
+ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value
+"""
+
+
+def metrics_enabled():
+    return getattr(settings, 'METRICS_ENABLED', True)
+
+
+def _labels_key(labels):
+    return json.dumps(sorted(labels.items()), ensure_ascii=False)
+
+
+@lru_cache(maxsize=4096)
+def _histogram_keys(name, labels, buckets):
+    """Ключи рядов гистограммы для набора меток (labels - кортеж пар).
+
+    Returns:
+        tuple: ([(граница, ключ корзины)], ключ _sum, ключ _count).
+    """
+    labels = dict(labels)
+    bucket_keys = [
+        (bound, (f'{name}_bucket', _labels_key({**labels, 'le': _format_value(bound)})))
+        for bound in (*buckets, math.inf)
+    ]
+    key = _labels_key(labels)
+    return bucket_keys, (f'{name}_sum', key), (f'{name}_count', key)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+def statement_kind(sql):
+    """Вид SQL-запроса для метки statement (WITH ... считается SELECT)."""
+    words = sql.split(None, 1)
+    return STATEMENTS.get(words[0].upper(), 'OTHER') if words else 'OTHER'
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+class MetricsRegistry:
+    """Приращения метрик текущего процесса с фоновым сбросом в METRICS_DB.
+
+    Поток сброса запускается при первом приращении в процессе - в том
+    числе заново в дочернем процессе после fork (воркеры gunicorn с
+    --preload), где потоки родителя не существуют.
+
+    Attributes:
+        pending (dict): {(имя ряда, метки в JSON): приращение}.
+    """
+
+    def __init__(self):
+        self.pending = defaultdict(float)
+        self.lock = threading.Lock()
+        self.flusher_pid = None
+
+    def inc(self, name, labels, amount=1):
+        """Увеличивает счетчик."""
+        self.start_flusher()
+        with self.lock:
+            self.pending[(name, _labels_key(labels))] += amount
+
+    def observe(self, name, labels, value, buckets):
+        """Добавляет наблюдение в гистограмму (корзины накопительные, как в Prometheus)."""
+        self.start_flusher()
+        bucket_keys, sum_key, count_key = _histogram_keys(name, tuple(sorted(labels.items())), buckets)
+        with self.lock:
+            # Пустые корзины тоже записываются: у ряда в выдаче должны быть все границы
+            for bound, key in bucket_keys:
+                self.pending[key] += value <= bound
+            self.pending[sum_key] += value
+            self.pending[count_key] += 1
+
+    def start_flusher(self):
+        """Запускает поток сброса, если он еще не запущен в этом процессе."""
+        pid = os.getpid()
+        if self.flusher_pid == pid:
+            return
+        with self.lock:
+            if self.flusher_pid == pid:
+                return
+            self.flusher_pid = pid
+        threading.Thread(target=self._flush_periodically, name='metrics-flush', daemon=True).start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(max(getattr(settings, 'METRICS_FLUSH_INTERVAL', 1), MIN_FLUSH_INTERVAL))
+            self.flush()
+
+    def reset_after_fork(self):
+        """Сбрасывает состояние в дочернем процессе после fork.
+
+        Приращения родителя он сбросит сам, а блокировка могла быть
+        захвачена его потоком в момент fork.
+        """
+        self.pending = defaultdict(float)
+        self.lock = threading.Lock()
+        self.flusher_pid = None
+
+    def flush(self):
+        """Прибавляет накопленные приращения к METRICS_DB.
+
+        При ошибке записи (например, база занята дольше таймаута)
+        приращения возвращаются в очередь и будут записаны при следующем
+        сбросе.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, defaultdict(float)
+        if not pending:
+            return
+        try:
+            with closing(_connect()) as db, db:
+                db.executemany(UPSERT, [(name, labels, value) for (name, labels), value in pending.items()])
+        except sqlite3.Error:
+            logger.exception('Не удалось записать метрики в %s', settings.METRICS_DB)
+            with self.lock:
+                for key, value in pending.items():
+                    self.pending[key] += value
+
+
+# Базы, в которых процесс уже создал таблицу и включил WAL (режим
+# сохраняется в файле базы)
+_prepared = set()
+
+
+def _connect():
+    path = str(settings.METRICS_DB)
+    db = sqlite3.connect(path, timeout=5)
+    if path not in _prepared:
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute(SCHEMA)
+        _prepared.add(path)
+    return db
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush)
+os.register_at_fork(after_in_child=registry.reset_after_fork)
+
+
+def record_cache(cache_name, hit):
+    """Учитывает обращение к кэшу.
+
+    Args:
+        cache_name (str): Название кэша ('reference', 'apikeys').
+        hit (bool): Значение взято из кэша (True) или загружено (False).
+    """
+    if metrics_enabled():
+        registry.inc('cashflow_cache_requests_total', {'cache': cache_name, 'result': 'hit' if hit else 'miss'})
+
+
+def collect():
+    """Текущие значения метрик всех процессов.
+
+    Returns:
+        list: (имя ряда, метки в JSON, значение), упорядоченные по имени и меткам.
+    """
+    registry.flush()
+    with closing(_connect()) as db:
+        return db.execute('SELECT name, labels, value FROM metric_samples ORDER BY name, labels').fetchall()
+
+
+def _histogram_order(family):
+    """Ключ сортировки рядов гистограммы: корзины ряда по возрастанию le, затем _sum и _count."""
+    suffixes = {f'{family}_bucket': 0, f'{family}_sum': 1, f'{family}_count': 2}
+
+    def key(row):
+        name, labels, _ = row
+        le = dict(labels).get('le')
+        bound = math.inf if le == '+Inf' else float(le or 0)
+        return [item for item in labels if item[0] != 'le'], suffixes[name], bound
+
+    return key
+
+
+def render_metrics(samples):
+    """Текстовый формат Prometheus (exposition format 0.0.4).
+
+    Args:
+        samples (list): Результат collect().
+
+    Returns:
+        str: Текст для эндпоинта /metrics.
+    """
+    by_family = defaultdict(list)
+    for name, labels, value in samples:
+        family = name
+        for suffix in ('_bucket', '_sum', '_count'):
+            if name.endswith(suffix) and name[:-len(suffix)] in FAMILIES:
+                family = name[:-len(suffix)]
+        by_family[family].append((name, json.loads(labels), value))
+
+    lines = []
+    for family, (kind, description) in FAMILIES.items():
+        lines.append(f'# HELP {family} {description}')
+        lines.append(f'# TYPE {family} {kind}')
+        rows = by_family.get(family, [])
+        if kind == 'histogram':
+            rows.sort(key=_histogram_order(family))
+        for name, labels, value in rows:
+            rendered = ','.join(f'{key}="{_escape(item)}"' for key, item in labels)
+            series = f'{name}{{{rendered}}}' if rendered else name
+            lines.append(f'{series} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """Записывает время запроса и SQL-запросов по имени URL.
+
+    Должен стоять первым в MIDDLEWARE, чтобы учитывать все остальные
+    middleware. Запросы потоковых ответов, выполненные после выхода из
+    представления, не учитываются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not metrics_enabled():
+            return self.get_response(request)
+
+        query_log = QueryLog()
+        started = time.perf_counter()
+        with track_queries(query_log):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = match.view_name if match else UNRESOLVED_VIEW
+        registry.inc('cashflow_http_requests_total', {
+            'view': view, 'method': request.method, 'status': str(response.status_code),
+        })
+        registry.observe('cashflow_http_request_duration_seconds', {'view': view, 'method': request.method},
+                         elapsed, LATENCY_BUCKETS)
+        registry.observe('cashflow_db_queries_per_request', {'view': view}, query_log.queries, QUERY_COUNT_BUCKETS)
+        for alias, sql, duration in query_log.entries:
+            registry.observe('cashflow_db_query_duration_seconds',
+                             {'view': view, 'alias': alias, 'statement': statement_kind(sql)},
+                             duration, QUERY_BUCKETS)
+        return response
+
+
+def metrics_allowed(request):
+    """Доступен ли /metrics: по токену METRICS_TOKEN или, без токена, по адресу клиента."""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        return constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    return request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', ('127.0.0.1', '::1'))
+
+
+def metrics_view(request):
+    """Метрики в формате Prometheus (доступ - см. metrics_allowed)."""
+    if not metrics_allowed(request):
+        raise Http404
+    return HttpResponse(render_metrics(collect()), content_type=CONTENT_TYPE)
@@ -0,0 +1,220 @@
+"""Профилирование отдельных запросов по требованию.
+
+ProfilingMiddleware запускает cProfile для запроса, если:
+- сотрудник (is_staff, вход через сессию) передал заголовок
+  PROFILING_HEADER (по умолчанию X-Profile: 1), или
+- запрос попал в выборку PROFILING_SAMPLE_RATE (доля от 0 до 1).
+
+Отчет сохраняется в PROFILING_DIR двумя файлами с общим именем:
+<имя>.prof - статистика cProfile (snakeviz, python -m pstats) и
+<имя>.json - сводка: время ответа, SQL-запросы с временем каждого,
+время отрисовки шаблонов и самые дорогие функции. Имя отчета
+возвращается в заголовке ответа X-Profile-Report. Хранится не больше
+PROFILING_MAX_REPORTS последних отчетов.
+
+Список отчетов доступен сотрудникам в админке: /admin/profiles/.
+"""
+
+import cProfile
+import json
+import logging
+import pstats
+import random
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.shortcuts import render
+from django.template.base import Template
+from django.utils import timezone
+
+from cashflow.db.budget import QueryLog, track_queries
+
+logger = logging.getLogger('cashflow.profiling')
+
+REPORT_HEADER = 'X-Profile-Report'
+REPORT_NAME_RE = re.compile(r'^[\w.-]+$')
+TOP_FUNCTIONS = 30
+TOP_QUERIES = 20
+DEFAULT_MAX_REPORTS = 200
+
+# Ключ Template.render в статистике cProfile: (файл, строка, функция)
+_TEMPLATE_RENDER = Template.render.__code__
+TEMPLATE_RENDER_KEY = (_TEMPLATE_RENDER.co_filename, _TEMPLATE_RENDER.co_firstlineno, _TEMPLATE_RENDER.co_name)
+
+
+def get_profiles_dir():
+    """Каталог отчетов из PROFILING_DIR."""
+    return Path(getattr(settings, 'PROFILING_DIR', settings.BASE_DIR / 'profiles'))
+
+
+def profile_trigger(request):
+    """Причина профилирования запроса или None.
+
+    Returns:
+        str: 'header' (заголовок от сотрудника), 'sample' (выборка) или None.
+    """
+    header = getattr(settings, 'PROFILING_HEADER', 'X-Profile')
+    if header and request.headers.get(header) and getattr(request, 'user', None) is not None:
+        if request.user.is_staff:
+            return 'header'
+    rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+    if rate and random.random() < rate:
+        return 'sample'
+    return None
+
+
+def build_summary(request, response, stats, query_log, elapsed, trigger):
+    """Сводка профиля запроса.
+
+    Args:
+        request: HttpRequest.
+        response: HttpResponse.
+        stats (pstats.Stats): Статистика cProfile.
+        query_log (QueryLog): SQL-запросы запроса.
+        elapsed (float): Время обработки, секунд.
+        trigger (str): Причина профилирования.
+
+    Returns:
+        dict: Сводка для JSON-файла отчета.
+    """
+    match = request.resolver_match
+    template = stats.stats.get(TEMPLATE_RENDER_KEY)
+    stats.sort_stats('cumulative')
+    functions = []
+    for key in stats.fcn_list[:TOP_FUNCTIONS]:
+        _, calls, tottime, cumtime, _ = stats.stats[key]
+        functions.append({
+            'function': pstats.func_std_string(key),
+            'calls': calls,
+            'tottime_ms': round(tottime * 1000, 2),
+            'cumtime_ms': round(cumtime * 1000, 2),
+        })
+    slowest = sorted(query_log.entries, key=lambda entry: entry[2], reverse=True)[:TOP_QUERIES]
+    return {
+        'created_at': timezone.now().isoformat(),
+        'trigger': trigger,
+        'method': request.method,
+        'path': request.get_full_path(),
+        'view_name': match.view_name if match else None,
+        'user': request.user.get_username() if getattr(request, 'user', None) else '',
+        'status': response.status_code,
+        'total_ms': round(elapsed * 1000, 2),
+        # Накопленное время Template.render: рекурсивные вызовы ({% include %}) учтены один раз
+        'template_ms': round(template[3] * 1000, 2) if template else 0.0,
+        'sql': {
+            'queries': query_log.queries,
+            'ms': round(query_log.milliseconds, 2),
+            'slowest': [
+                {'alias': alias, 'sql': sql, 'ms': round(duration * 1000, 2)}
+                for alias, sql, duration in slowest
+            ],
+        },
+        'functions': functions,
+    }
+
+
+def save_report(summary, profile):
+    """Записывает .prof и .json отчета и удаляет старые отчеты сверх лимита.
+
+    Returns:
+        str: Имя отчета (без расширения).
+    """
+    directory = get_profiles_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    view = re.sub(r'[^\w.-]', '.', summary['view_name'] or 'unresolved')
+    name = f"{timezone.now():%Y%m%d-%H%M%S-%f}-{view}"
+    profile.dump_stats(directory / f'{name}.prof')
+    with open(directory / f'{name}.json', 'w', encoding='utf-8') as stream:
+        json.dump(summary, stream, ensure_ascii=False, indent=2)
+
+    limit = getattr(settings, 'PROFILING_MAX_REPORTS', DEFAULT_MAX_REPORTS)
+    for old in sorted(directory.glob('*.json'))[:-limit]:
+        old.unlink(missing_ok=True)
+        old.with_suffix('.prof').unlink(missing_ok=True)
+    return name
+
+
+def list_reports():
+    """Сводки сохраненных отчетов, новые первыми.
+
+    Returns:
+        list: Сводки с добавленным ключом 'name'.
+    """
+    directory = get_profiles_dir()
+    if not directory.is_dir():
+        return []
+    reports = []
+    for path in sorted(directory.glob('*.json'), reverse=True):
+        try:
+            with open(path, encoding='utf-8') as stream:
+                summary = json.load(stream)
+        except (OSError, ValueError):
+            continue
+        summary['name'] = path.stem
+        reports.append(summary)
+    return reports
+
+
+class ProfilingMiddleware:
+    """Профилирует запрос по заголовку сотрудника или по выборке.
+
+    Должен стоять после AuthenticationMiddleware: заголовок принимается
+    только от сотрудника, вошедшего через сессию.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trigger = profile_trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: в процессе уже работает другой профилировщик
+            # (параллельный запрос в другом потоке, отладчик, coverage)
+            logger.warning('Профилировщик уже активен, запрос %s выполняется без профиля', request.path)
+            return self.get_response(request)
+        query_log = QueryLog()
+        started = time.perf_counter()
+        try:
+            with track_queries(query_log):
+                response = self.get_response(request)
+        finally:
+            profile.disable()
+        elapsed = time.perf_counter() - started
+
+        try:
+            summary = build_summary(request, response, pstats.Stats(profile), query_log, elapsed, trigger)
+            response[REPORT_HEADER] = save_report(summary, profile)
+        except OSError:
+            logger.exception('Не удалось сохранить профиль запроса %s', request.path)
+        return response
+
+
+def report_list(request):
+    """Страница админки со списком отчетов профилирования."""
+    return render(request, 'admin/profiling/report_list.html', {
+        **admin.site.each_context(request),
+        'title': 'Профили запросов',
+        'reports': list_reports(),
+        'directory': get_profiles_dir(),
+        'header': getattr(settings, 'PROFILING_HEADER', 'X-Profile'),
+    })
+
+
+def report_download(request, name, extension):
+    """Скачивание файла отчета (.prof или .json)."""
+    if not REPORT_NAME_RE.match(name):
+        raise Http404('Некорректное имя отчета')
+    path = get_profiles_dir() / f'{name}.{extension}'
+    if not path.is_file():
+        raise Http404('Отчет не найден')
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name)
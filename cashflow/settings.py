@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -22,6 +23,7 @@ INSTALLED_APPS = [
     'rest_framework',
     'reference.apps.ReferenceConfig',
     'transactions.apps.TransactionsConfig',
+    'apikeys.apps.ApiKeysConfig',
 ]
 
 REST_FRAMEWORK = {
@@ -29,18 +31,27 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'apikeys.authentication.ApiKeyAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ],
 }
 
+# Время жизни записи кэша проверки API-ключа, секунд
+API_KEY_CACHE_TTL = 300
+
 MIDDLEWARE = [
+    'cashflow.metrics.MetricsMiddleware',
+    'cashflow.db.budget.QueryBudgetMiddleware',
+    'cashflow.db.slowlog.SlowQueryMiddleware',
+    'cashflow.db.replica.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.contrib.admindocs.middleware.XViewMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'cashflow.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -58,6 +69,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'reference.context_processors.reference_tree',
             ],
         },
     },
@@ -65,13 +77,53 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'cashflow.wsgi.application'
 
+# SQLite под несколькими воркерами: WAL, PRAGMA, BEGIN IMMEDIATE с
+# ожиданием блокировки и повтором (см. cashflow/db/sqlite/base.py)
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'cashflow.db.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение переиспользуется между запросами воркера
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # busy timeout: сколько секунд ждать блокировку другого соединения
+            'timeout': 5,
+        },
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64 * 1024,
+            'temp_store': 'MEMORY',
+        },
+        'WRITE_RETRIES': 3,
+        'TEST': {
+            # Тестовая БД в файле, а не в памяти: WAL и блокировки
+            # между соединениями работают так же, как в работе
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
+# Реплика для чтения списков, отчетов и выгрузок (см. cashflow/db/replica.py).
+# Включается переменной окружения CASHFLOW_REPLICA_DB с путем к файлу реплики;
+# локально реплику обновляет команда sync_replica.
+REPLICA_DATABASE = os.environ.get('CASHFLOW_REPLICA_DB')
+REPLICA_ENABLED = bool(REPLICA_DATABASE)
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': REPLICA_DATABASE or BASE_DIR / 'db.replica.sqlite3',
+    'TEST': {'MIRROR': 'default'},
+}
+DATABASE_ROUTERS = ['cashflow.db.replica.ReplicaRouter']
+# Максимальное отставание реплики, при котором с нее еще читаем, секунд
+REPLICA_MAX_LAG = 10
+# Как часто проверять отставание реплики, секунд
+REPLICA_LAG_CHECK_INTERVAL = 1
+# Сколько секунд после записи клиент читает только с основной БД
+REPLICA_PIN_SECONDS = 15
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -87,6 +139,88 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Бюджеты SQL-запросов на запрос по имени URL (см. cashflow/db/budget.py):
+# queries - не больше запросов независимо от числа строк, ms - время в БД.
+# В бюджеты страниц входят сессия, пользователь и загрузка кэша
+# справочников после их изменения (4 запроса).
+QUERY_BUDGETS = {
+    # + граница архива для предупреждения об архивных транзакциях
+    'transactions:list': {'queries': 9, 'ms': 500},
+    'transactions:list_rows': {'queries': 4, 'ms': 500},
+    'transactions:create': {'queries': 8, 'ms': 200},
+    'transactions:update': {'queries': 8, 'ms': 200},
+    'transactions:delete': {'queries': 8, 'ms': 200},
+    'transactions:transaction-list': {'queries': 5, 'ms': 500},
+    'transactions:transaction-detail': {'queries': 5, 'ms': 200},
+    'transactions:transaction-report': {'queries': 5, 'ms': 500},
+    'transactions:transaction-balance': {'queries': 6, 'ms': 500},
+    'reference:index': {'queries': 8, 'ms': 200},
+    'reference:tree': {'queries': 8, 'ms': 200},
+    'admin:transactions_transaction_changelist': {'queries': 12, 'ms': 1000},
+}
+# Превышение бюджета - ошибка (CI) вместо предупреждения в журнале
+QUERY_BUDGET_STRICT = os.environ.get('CASHFLOW_QUERY_BUDGET_STRICT') == '1'
+
+# Профилирование запросов (cashflow/profiling.py): заголовок от сотрудника
+# или доля случайных запросов; отчеты - в PROFILING_DIR, список - /admin/profiles/
+PROFILING_HEADER = 'X-Profile'
+PROFILING_SAMPLE_RATE = float(os.environ.get('CASHFLOW_PROFILING_SAMPLE_RATE', 0))
+PROFILING_DIR = Path(os.environ.get('CASHFLOW_PROFILING_DIR', BASE_DIR / 'profiles'))
+PROFILING_MAX_REPORTS = 200
+
+# Метрики Prometheus (cashflow/metrics.py): фоновый поток каждого процесса
+# раз в METRICS_FLUSH_INTERVAL секунд складывает приращения в общую METRICS_DB
+# (в тестах - во временный файл, см. cashflow/test_runner.py)
+METRICS_ENABLED = os.environ.get('CASHFLOW_METRICS', '1') == '1'
+METRICS_DB = Path(os.environ.get('CASHFLOW_METRICS_DB', BASE_DIR / 'metrics.sqlite3'))
+METRICS_FLUSH_INTERVAL = 1
+# Токен для /metrics (Authorization: Bearer <токен>); обязателен за обратным
+# прокси, где REMOTE_ADDR - адрес прокси. Без токена /metrics доступен
+# только с METRICS_ALLOWED_IPS
+METRICS_TOKEN = os.environ.get('CASHFLOW_METRICS_TOKEN')
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+
+TEST_RUNNER = 'cashflow.test_runner.CashflowTestRunner'
+
+# Журнал медленных SQL-запросов (cashflow/db/slowlog.py): запросы дольше
+# порога пишутся в JSON-файл, сводка - slow_query_report. Файл общий для
+# всех воркеров, поэтому ротирует его внешний logrotate по конфигурации
+# deploy/logrotate/cashflow (10 МБ, 5 нумерованных копий .1, .2, ... - их
+# читает slow_query_report), а WatchedFileHandler каждого процесса
+# переоткрывает файл после ротации. Без logrotate файл растет без предела.
+# RotatingFileHandler здесь не годится: каждый процесс ротировал бы файл
+# сам и затирал записи других.
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('CASHFLOW_SLOW_QUERY_MS', 100))
+SLOW_QUERY_LOG = Path(os.environ.get('CASHFLOW_SLOW_QUERY_LOG', BASE_DIR / 'slow_queries.log'))
+# Таблицы, параметры запросов к которым не пишутся в журнал: ключи сессий,
+# хэши паролей и API-ключей
+SLOW_QUERY_REDACTED_TABLES = ('django_session', 'auth_user', 'apikeys_apikey')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'cashflow.db.slowlog.JsonFormatter'},
+    },
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.WatchedFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'encoding': 'utf-8',
+            # Файл создается при первой записи
+            'delay': True,
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        'cashflow.slowquery': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 LANGUAGE_CODE = 'ru-ru'
 
 TIME_ZONE = 'Asia/Novosibirsk'
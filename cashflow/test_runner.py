@@ -0,0 +1,30 @@
+"""Запуск тестов без записи метрик в рабочую базу."""
+
+import tempfile
+from pathlib import Path
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class CashflowTestRunner(DiscoverRunner):
+    """DiscoverRunner, направляющий METRICS_DB во временный каталог.
+
+    MetricsMiddleware учитывает и запросы тестового клиента; без этого
+    они копились бы в metrics.sqlite3 рядом с проектом.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.metrics_dir = tempfile.TemporaryDirectory()
+        self.metrics_settings = override_settings(METRICS_DB=Path(self.metrics_dir.name) / 'metrics.sqlite3')
+        self.metrics_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        from cashflow.metrics import registry
+
+        # Остаток приращений - во временную базу, а не в рабочую при выходе
+        registry.flush()
+        self.metrics_settings.disable()
+        self.metrics_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -1,6 +1,7 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework import routers
+from cashflow import metrics, profiling
 from reference import views_api as reference_views
 from transactions import views_api as transaction_views
 
@@ -13,7 +14,11 @@ router.register(r'api/transactions', transaction_views.TransactionViewSet)
 
 urlpatterns = [
     path('admin/doc/', include('django.contrib.admindocs.urls')),
+    path('admin/profiles/', admin.site.admin_view(profiling.report_list), name='profiling_reports'),
+    re_path(r'^admin/profiles/(?P<name>[\w.-]+)\.(?P<extension>prof|json)$',
+            admin.site.admin_view(profiling.report_download), name='profiling_report_download'),
     path('admin/', admin.site.urls),
+    path('metrics', metrics.metrics_view, name='metrics'),
     path('', include('transactions.urls', namespace='transactions')),
     path('reference/', include('reference.urls', namespace='reference')),
     path('', include(router.urls)),  # Include API URLs
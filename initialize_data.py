@@ -17,7 +17,7 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cashflow.settings')
 django.setup()
 
-from reference.models import Status, OperationType, Category, SubCategory
+from reference.models import EXPENSE, INCOME, Status, OperationType, Category, SubCategory
 
 
 def initialize_data():
@@ -39,8 +39,8 @@ def initialize_data():
     tax, _ = Status.objects.get_or_create(name="Налог")
 
     # Создание типов операций
-    income, _ = OperationType.objects.get_or_create(name="Пополнение")
-    expense, _ = OperationType.objects.get_or_create(name="Списание")
+    income, _ = OperationType.objects.get_or_create(name="Пополнение", defaults={'sign': INCOME})
+    expense, _ = OperationType.objects.get_or_create(name="Списание", defaults={'sign': EXPENSE})
 
     # Создание категорий расходов
     infrastructure, _ = Category.objects.get_or_create(
@@ -22,7 +22,7 @@ class OperationTypeAdmin(admin.ModelAdmin):
         list_display (tuple): Поля, отображаемые в списке объектов.
         search_fields (tuple): Поля, по которым осуществляется поиск.
     """
-    list_display = ('name',)
+    list_display = ('name', 'sign')
     search_fields = ('name',)
 
 
@@ -0,0 +1,214 @@
+"""Кэш справочников в памяти процесса.
+
+Справочники (статусы, типы операций, категории, подкатегории) малы и
+меняются редко, поэтому целиком держатся в памяти каждого процесса.
+
+Согласованность между процессами (воркерами gunicorn) обеспечивает
+счетчик версий ReferenceVersion в БД:
+- сигналы save/delete справочников увеличивают счетчик;
+- процесс сверяет свою версию со счетчиком не чаще одного раза за
+  HTTP-запрос и при расхождении перечитывает справочники.
+
+Таким образом вместо 4-6 запросов к справочникам на запрос остается
+один легкий SELECT версии.
+
+Версия и сами справочники всегда читаются с основной БД, даже в
+представлениях, читающих с реплики: иначе снимок с отстающей реплики
+закэшировался бы в процессе под новой версией.
+
+Использование:
+    from reference.cache import get_reference_data
+
+    data = get_reference_data()
+    data.categories_for(operation_type_id)
+"""
+
+import json
+import threading
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import request_started
+from django.db.models import F
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+
+from cashflow.db.replica import PRIMARY_DATABASE_ALIAS
+from cashflow.metrics import record_cache
+from .models import Status, OperationType, Category, SubCategory, ReferenceVersion
+
+_lock = threading.Lock()
+_local = threading.local()
+_snapshot = None
+
+
+def _to_id(value):
+    """Приводит id из GET-параметра к int.
+
+    Returns:
+        int: id или None, если значение пустое или некорректное.
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ReferenceData:
+    """Неизменяемый снимок всех справочников.
+
+    Категории и подкатегории связаны с уже загруженными родителями,
+    поэтому __str__ и обращения к operation_type/category не делают
+    запросов к БД. Объекты общие для всех запросов процесса и не должны
+    изменяться.
+
+    Attributes:
+        version (int): Версия справочников, с которой снят снимок.
+        statuses (list): Статусы в порядке id.
+        operation_types (list): Типы операций в порядке id.
+        categories (list): Категории в порядке id.
+        subcategories (list): Подкатегории в порядке id.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.statuses = list(Status.objects.using(PRIMARY_DATABASE_ALIAS).order_by('id'))
+        self.operation_types = list(OperationType.objects.using(PRIMARY_DATABASE_ALIAS).order_by('id'))
+        self.categories = list(Category.objects.using(PRIMARY_DATABASE_ALIAS).order_by('id'))
+        self.subcategories = list(SubCategory.objects.using(PRIMARY_DATABASE_ALIAS).order_by('id'))
+
+        self.status_by_id = {obj.id: obj for obj in self.statuses}
+        self.operation_type_by_id = {obj.id: obj for obj in self.operation_types}
+        self.category_by_id = {obj.id: obj for obj in self.categories}
+        self.subcategory_by_id = {obj.id: obj for obj in self.subcategories}
+
+        for category in self.categories:
+            category.operation_type = self.operation_type_by_id[category.operation_type_id]
+        for subcategory in self.subcategories:
+            subcategory.category = self.category_by_id[subcategory.category_id]
+
+    def categories_for(self, operation_type_id):
+        """Категории типа операции.
+
+        Args:
+            operation_type_id: id типа операции (int или строка).
+
+        Returns:
+            list: Категории в порядке id.
+        """
+        operation_type_id = _to_id(operation_type_id)
+        return [obj for obj in self.categories if obj.operation_type_id == operation_type_id]
+
+    def subcategories_for(self, category_id):
+        """Подкатегории категории.
+
+        Args:
+            category_id: id категории (int или строка).
+
+        Returns:
+            list: Подкатегории в порядке id.
+        """
+        category_id = _to_id(category_id)
+        return [obj for obj in self.subcategories if obj.category_id == category_id]
+
+    @cached_property
+    def tree(self):
+        """Дерево ТипОперации -> Категория -> Подкатегория и список статусов.
+
+        Категории и подкатегории отсортированы по названию.
+
+        Returns:
+            dict: Данные для JSON-ответа reference:tree.
+        """
+        def by_name(objects):
+            return sorted(objects, key=lambda obj: obj.name)
+
+        return {
+            'version': self.version,
+            'statuses': [{'id': obj.id, 'name': obj.name} for obj in self.statuses],
+            'operation_types': [
+                {
+                    'id': operation_type.id,
+                    'name': operation_type.name,
+                    'categories': [
+                        {
+                            'id': category.id,
+                            'name': category.name,
+                            'subcategories': [
+                                {'id': subcategory.id, 'name': subcategory.name}
+                                for subcategory in by_name(self.subcategories_for(category.id))
+                            ],
+                        }
+                        for category in by_name(self.categories_for(operation_type.id))
+                    ],
+                }
+                for operation_type in self.operation_types
+            ],
+        }
+
+    @cached_property
+    def tree_json(self):
+        """Дерево справочников, сериализованное в JSON один раз на снимок.
+
+        Returns:
+            bytes: JSON-представление tree.
+        """
+        return json.dumps(self.tree, cls=DjangoJSONEncoder, ensure_ascii=False).encode()
+
+
+def _current_version():
+    """Читает счетчик версий справочников из основной БД."""
+    versions = ReferenceVersion.objects.using(PRIMARY_DATABASE_ALIAS).filter(pk=1)
+    version = versions.values_list('version', flat=True).first()
+    return version or 0
+
+
+def get_reference_data():
+    """Возвращает актуальный снимок справочников.
+
+    Версия в БД сверяется один раз за HTTP-запрос; вне запросов
+    (команды, shell) - при первом обращении в потоке и после
+    локальных изменений справочников.
+
+    Returns:
+        ReferenceData: Снимок справочников.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and getattr(_local, 'checked', False):
+        record_cache('reference', True)
+        return snapshot
+
+    version = _current_version()
+    hit = snapshot is not None and snapshot.version == version
+    if not hit:
+        with _lock:
+            if _snapshot is None or _snapshot.version != version:
+                _snapshot = ReferenceData(version)
+            snapshot = _snapshot
+    record_cache('reference', hit)
+    _local.checked = True
+    return snapshot
+
+
+def invalidate():
+    """Сбрасывает снимок текущего процесса."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+def bump_version():
+    """Увеличивает версию справочников и сбрасывает локальный снимок.
+
+    Вызывается сигналами при любом изменении справочников. Остальные
+    процессы увидят новую версию при следующей сверке.
+    """
+    if not ReferenceVersion.objects.filter(pk=1).update(version=F('version') + 1):
+        ReferenceVersion.objects.get_or_create(pk=1, defaults={'version': 1})
+    invalidate()
+
+
+@receiver(request_started)
+def _reset_version_check(**kwargs):
+    """Требует сверки версии в начале каждого HTTP-запроса."""
+    _local.checked = False
@@ -0,0 +1,26 @@
+"""Контекстные процессоры приложения справочников."""
+
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+
+from .cache import get_reference_data
+
+
+def reference_tree(request):
+    """Добавляет в контекст URL дерева справочников с текущей версией.
+
+    Версия в URL позволяет браузеру кэшировать дерево без ограничения
+    срока: после изменения справочников URL меняется сам. Значение
+    ленивое, поэтому страницы без дерева не обращаются к кэшу.
+
+    Args:
+        request: HttpRequest объект.
+
+    Returns:
+        dict: {'reference_tree_url': str}.
+    """
+    return {
+        'reference_tree_url': SimpleLazyObject(
+            lambda: f"{reverse('reference:tree')}?v={get_reference_data().version}"
+        )
+    }
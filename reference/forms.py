@@ -31,12 +31,13 @@ class OperationTypeForm(forms.ModelForm):
     """
     class Meta:
         model = OperationType
-        fields = ['name']
+        fields = ['name', 'sign']
         widgets = {
             'name': forms.TextInput(attrs={
                 'class': 'form-control',
                 'placeholder': 'Введите название типа'
-            })
+            }),
+            'sign': forms.Select(attrs={'class': 'form-select'})
         }
 
 
@@ -0,0 +1,63 @@
+# Generated by Django 4.2 on 2026-10-18 20:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OperationType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Название')),
+            ],
+            options={
+                'verbose_name': 'Тип операции',
+                'verbose_name_plural': 'Типы операций',
+            },
+        ),
+        migrations.CreateModel(
+            name='Status',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Название')),
+            ],
+            options={
+                'verbose_name': 'Статус',
+                'verbose_name_plural': 'Статусы',
+            },
+        ),
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+                ('operation_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reference.operationtype', verbose_name='Тип операции')),
+            ],
+            options={
+                'verbose_name': 'Категория',
+                'verbose_name_plural': 'Категории',
+                'unique_together': {('name', 'operation_type')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SubCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reference.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Подкатегория',
+                'verbose_name_plural': 'Подкатегории',
+                'unique_together': {('name', 'category')},
+            },
+        ),
+    ]
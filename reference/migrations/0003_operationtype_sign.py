@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-18 20:36
+
+from django.db import migrations, models
+
+
+def mark_income(apps, schema_editor):
+    """Существующий тип "Пополнение" - приход, остальные остаются расходом."""
+    OperationType = apps.get_model('reference', 'OperationType')
+    OperationType.objects.using(schema_editor.connection.alias).filter(name='Пополнение').update(sign=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference', '0002_reference_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='operationtype',
+            name='sign',
+            field=models.SmallIntegerField(choices=[(1, 'Приход'), (-1, 'Расход')], default=-1, verbose_name='Направление'),
+        ),
+        migrations.RunPython(mark_income, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,12 @@
 from django.db import models
 
+INCOME = 1
+EXPENSE = -1
+SIGN_CHOICES = (
+    (INCOME, "Приход"),
+    (EXPENSE, "Расход"),
+)
+
 
 class Status(models.Model):
     """Модель статуса операции.
@@ -38,6 +45,8 @@ class OperationType(models.Model):
 
     Attributes:
         name (CharField): Название типа операции (уникальное поле).
+        sign (SmallIntegerField): Направление движения денег: 1 - приход,
+            -1 - расход. Используется при расчете остатка.
 
     Meta:
         verbose_name (str): Человекочитаемое имя модели в единственном числе.
@@ -51,6 +60,11 @@ class OperationType(models.Model):
         unique=True,
         verbose_name="Название"
     )
+    sign = models.SmallIntegerField(
+        choices=SIGN_CHOICES,
+        default=EXPENSE,
+        verbose_name="Направление"
+    )
 
     class Meta:
         verbose_name = "Тип операции"
@@ -65,6 +79,20 @@ class OperationType(models.Model):
         return self.name
 
 
+class CategoryManager(models.Manager):
+    """Менеджер категорий: тип операции выбирается сразу, его использует __str__."""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('operation_type')
+
+
+class SubCategoryManager(models.Manager):
+    """Менеджер подкатегорий: категория и ее тип выбираются сразу, их использует __str__."""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('category__operation_type')
+
+
 class Category(models.Model):
     """Модель категории операции.
 
@@ -90,6 +118,8 @@ class Category(models.Model):
         verbose_name="Тип операции"
     )
 
+    objects = CategoryManager()
+
     class Meta:
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
@@ -129,6 +159,8 @@ class SubCategory(models.Model):
         verbose_name="Категория"
     )
 
+    objects = SubCategoryManager()
+
     class Meta:
         verbose_name = "Подкатегория"
         verbose_name_plural = "Подкатегории"
@@ -140,4 +172,32 @@ class SubCategory(models.Model):
         Returns:
             str: Название подкатегории с указанием родительской категории.
         """
-        return f"{self.name} ({self.category})"
\ No newline at end of file
+        return f"{self.name} ({self.category})"
+
+
+class ReferenceVersion(models.Model):
+    """Счетчик версий справочников.
+
+    Единственная строка (pk=1), значение которой увеличивается при каждом
+    изменении справочников. По нему процессы определяют, что их кэш
+    справочников устарел (см. reference.cache).
+
+    Attributes:
+        version (PositiveBigIntegerField): Текущая версия справочников.
+    """
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Версия"
+    )
+
+    class Meta:
+        verbose_name = "Версия справочников"
+        verbose_name_plural = "Версии справочников"
+
+    def __str__(self):
+        """Строковое представление версии.
+
+        Returns:
+            str: Номер версии.
+        """
+        return str(self.version)
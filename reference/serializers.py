@@ -1,7 +1,36 @@
 from rest_framework import serializers
+from .cache import get_reference_data
 from .models import Status, OperationType, Category, SubCategory
 
 
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Поле связи со справочником, проверяющее id по кэшу справочников.
+
+    Вместо запроса к БД на каждое поле значение ищется в снимке
+    reference.cache. Возвращается общий объект из кэша, который нельзя
+    изменять.
+
+    Attributes:
+        cache_attr (str): Атрибут ReferenceData со словарем {id: объект}.
+    """
+
+    def __init__(self, cache_attr, **kwargs):
+        self.cache_attr = cache_attr
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        obj = getattr(get_reference_data(), self.cache_attr).get(pk)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
+
 class StatusSerializer(serializers.ModelSerializer):
     """Сериализатор для модели Status."""
     class Meta:
@@ -18,7 +47,8 @@ class OperationTypeSerializer(serializers.ModelSerializer):
 
 class CategorySerializer(serializers.ModelSerializer):
     """Сериализатор для модели Category."""
-    operation_type = serializers.PrimaryKeyRelatedField(
+    operation_type = CachedPrimaryKeyRelatedField(
+        'operation_type_by_id',
         queryset=OperationType.objects.all(),
         required=True
     )
@@ -30,7 +60,8 @@ class CategorySerializer(serializers.ModelSerializer):
 
 class SubCategorySerializer(serializers.ModelSerializer):
     """Сериализатор для модели SubCategory."""
-    category = serializers.PrimaryKeyRelatedField(
+    category = CachedPrimaryKeyRelatedField(
+        'category_by_id',
         queryset=Category.objects.all(),
         required=True
     )
@@ -0,0 +1,21 @@
+"""Сигналы приложения справочников.
+
+Любое сохранение или удаление справочника увеличивает версию
+справочников, чтобы кэши всех процессов были перечитаны.
+"""
+
+from django.db.models.signals import post_delete, post_save
+
+from .cache import bump_version
+from .models import Status, OperationType, Category, SubCategory
+
+
+def bump_reference_version(sender, raw=False, **kwargs):
+    """Увеличивает версию справочников после изменения."""
+    if not raw:
+        bump_version()
+
+
+for model in (Status, OperationType, Category, SubCategory):
+    post_save.connect(bump_reference_version, sender=model, dispatch_uid=f'reference_version_save_{model.__name__}')
+    post_delete.connect(bump_reference_version, sender=model, dispatch_uid=f'reference_version_delete_{model.__name__}')
@@ -2,7 +2,11 @@ from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from reference.models import Status, OperationType, Category, SubCategory
+from django.core.signals import request_started
+from django.db import close_old_connections
+from django.db.models import F
+from reference import cache
+from reference.models import Status, OperationType, Category, SubCategory, ReferenceVersion
 
 User = get_user_model()
 
@@ -136,4 +140,89 @@ class OperationTypeViewSetTests(ReferenceAPITestCase):
         response = self.client.post(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(OperationType.objects.count(), 2)
-        self.assertTrue(OperationType.objects.filter(name='New Operation Type').exists())
\ No newline at end of file
+        self.assertTrue(OperationType.objects.filter(name='New Operation Type').exists())
+
+
+class ReferenceCacheTests(ReferenceAPITestCase):
+    def start_request(self):
+        # Как тестовый клиент Django: без закрытия соединения внутри теста
+        request_started.disconnect(close_old_connections)
+        try:
+            request_started.send(sender=None)
+        finally:
+            request_started.connect(close_old_connections)
+
+    def test_snapshot_is_reused_within_request(self):
+        self.start_request()
+        data = cache.get_reference_data()
+        self.assertEqual(
+            [c.name for c in data.categories_for(self.operation_type.id)],
+            ['Category 1', 'Category 2']
+        )
+        with self.assertNumQueries(0):
+            again = cache.get_reference_data()
+            self.assertEqual(str(again.subcategory_by_id[self.subcategory.id]), 'SubCategory 1 (Category 1 (Test Operation))')
+        self.assertIs(data, again)
+
+    def test_local_change_invalidates_snapshot(self):
+        cache.get_reference_data()
+        Status.objects.create(name='Status 3')
+        names = {s.name for s in cache.get_reference_data().statuses}
+        self.assertIn('Status 3', names)
+
+    def test_version_change_from_other_process_is_detected(self):
+        self.start_request()
+        data = cache.get_reference_data()
+        # Другой процесс меняет справочники: в этом процессе сигналы не срабатывают
+        Status.objects.filter(pk=self.status1.pk).update(name='Renamed')
+        ReferenceVersion.objects.filter(pk=1).update(version=F('version') + 1)
+
+        self.assertIs(cache.get_reference_data(), data)
+        self.start_request()
+        with self.assertNumQueries(5):
+            fresh = cache.get_reference_data()
+        self.assertEqual(fresh.status_by_id[self.status1.pk].name, 'Renamed')
+
+
+class ReferenceTreeTests(ReferenceAPITestCase):
+    def test_tree_contains_whole_hierarchy(self):
+        response = self.client.get(reverse('reference:tree'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tree = response.json()
+        self.assertEqual({s['name'] for s in tree['statuses']}, {'Status 1', 'Status 2'})
+        self.assertEqual(tree['operation_types'], [{
+            'id': self.operation_type.id,
+            'name': 'Test Operation',
+            'categories': [
+                {
+                    'id': self.category1.id,
+                    'name': 'Category 1',
+                    'subcategories': [{'id': self.subcategory.id, 'name': 'SubCategory 1'}],
+                },
+                {'id': self.category2.id, 'name': 'Category 2', 'subcategories': []},
+            ],
+        }])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_tree_etag_and_versioned_caching(self):
+        response = self.client.get(reverse('reference:tree'))
+        etag = response['ETag']
+        version = response.json()['version']
+
+        response = self.client.get(reverse('reference:tree'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(reverse('reference:tree'), {'v': version})
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+
+        Status.objects.create(name='Status 3')
+        response = self.client.get(reverse('reference:tree'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_transaction_form_uses_versioned_tree_url(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('transactions:create'))
+        self.assertContains(response, '<script src="/static/js/reference.js"></script>', html=True)
+        version = self.client.get(reverse('reference:tree')).json()['version']
+        self.assertContains(response, f'data-reference-tree-url="{reverse("reference:tree")}?v={version}"')
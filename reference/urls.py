@@ -31,6 +31,7 @@ urlpatterns = [
     path('subcategory/<int:pk>/delete/', views.subcategory_delete, name='subcategory_delete'),
 
     # AJAX-эндпоинты для динамических форм.
+    path('tree/', views.reference_tree, name='tree'),
     path('ajax/load-categories/', views.load_categories, name='ajax_load_categories'),
     path('ajax/load-subcategories/', views.load_subcategories, name='ajax_load_subcategories'),
 ]
\ No newline at end of file
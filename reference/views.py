@@ -4,11 +4,16 @@
 - Отображения главной страницы справочников
 - CRUD операций для статусов, типов операций, категорий и подкатегорий
 - AJAX обработчиков для динамических форм
+- JSON-дерева справочников с поддержкой ETag
 """
 
+from django.http import HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_GET
 from django.views.generic import ListView
 from django.contrib import messages
+from .cache import get_reference_data
 from .models import Status, OperationType, Category, SubCategory
 from .forms import StatusForm, OperationTypeForm, CategoryForm, SubCategoryForm
 
@@ -343,8 +348,8 @@ def load_categories(request):
         HttpResponse: HTML с опциями категорий.
     """
     operation_type_id = request.GET.get('operation_type')
-    categories = Category.objects.filter(operation_type_id=operation_type_id).order_by('name')
-    return render(request, 'reference/includes/category_options.html', {
+    categories = sorted(get_reference_data().categories_for(operation_type_id), key=lambda obj: obj.name)
+    return render(request, 'reference/category_options.html', {
         'categories': categories
     })
 
@@ -359,7 +364,40 @@ def load_subcategories(request):
         HttpResponse: HTML с опциями подкатегорий.
     """
     category_id = request.GET.get('category')
-    subcategories = SubCategory.objects.filter(category_id=category_id).order_by('name')
-    return render(request, 'reference/includes/subcategory_options.html', {
+    subcategories = sorted(get_reference_data().subcategories_for(category_id), key=lambda obj: obj.name)
+    return render(request, 'reference/subcategory_options.html', {
         'subcategories': subcategories
-    })
\ No newline at end of file
+    })
+
+
+TREE_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def _reference_tree_etag(request):
+    """ETag дерева справочников - текущая версия справочников."""
+    return f"ref-{get_reference_data().version}"
+
+
+@require_GET
+@condition(etag_func=_reference_tree_etag)
+def reference_tree(request):
+    """Возвращает все дерево справочников одним JSON-ответом.
+
+    Ответ содержит статусы и дерево ТипОперации -> Категория -> Подкатегория.
+    Поддерживается If-None-Match (ответ 304 без тела). Если в запросе
+    передана актуальная версия (?v=...), ответ кэшируется браузером
+    на год; без версии браузер обязан перепроверять его по ETag.
+
+    Args:
+        request: HttpRequest объект.
+
+    Returns:
+        HttpResponse: JSON с деревом справочников.
+    """
+    data = get_reference_data()
+    response = HttpResponse(data.tree_json, content_type='application/json')
+    if request.GET.get('v') == str(data.version):
+        patch_cache_control(response, public=True, max_age=TREE_CACHE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
@@ -1,28 +1,25 @@
 $(document).ready(function() {
+    // URL дерева справочников (с версией) задается шаблоном через data-атрибут формы
+    var treeUrl = $("[data-reference-tree-url]").data('referenceTreeUrl');
+
     $("#id_operation_type").change(function() {
-        $.ajax({
-            url: "/reference/ajax/load-categories/",
-            data: {
-                'operation_type': $(this).val()
-            },
-            success: function(data) {
-                $("#id_category").html(data);
-                $("#id_subcategory").html('<option value="">---------</option>');
-            }
+        var operationTypeId = $(this).val();
+        ReferenceTree.load(treeUrl).done(function(tree) {
+            ReferenceTree.fillSelect(
+                $("#id_category"), operationTypeId ? ReferenceTree.categories(tree, operationTypeId) : [], '---------'
+            ).prop('disabled', false);
+            $("#id_subcategory").html('<option value="">---------</option>').prop('disabled', true);
         });
     });
 
     $("#id_category").change(function() {
-        if ($(this).val()) {
-            $.ajax({
-                url: "/reference/ajax/load-subcategories/",
-                data: {
-                    'category': $(this).val()
-                },
-                success: function(data) {
-                    $("#id_subcategory").html(data);
-                }
+        var categoryId = $(this).val();
+        if (categoryId) {
+            ReferenceTree.load(treeUrl).done(function(tree) {
+                ReferenceTree.fillSelect(
+                    $("#id_subcategory"), ReferenceTree.subcategories(tree, categoryId), '---------'
+                ).prop('disabled', false);
             });
         }
     });
-});
\ No newline at end of file
+});
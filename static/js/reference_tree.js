@@ -0,0 +1,51 @@
+// Дерево справочников ТипОперации -> Категория -> Подкатегория.
+//
+// Загружается одним запросом к reference:tree. URL содержит версию
+// справочников, поэтому браузер кэширует ответ надолго, а смена
+// выбранных значений в select'ах не требует обращений к серверу.
+var ReferenceTree = (function() {
+    var requests = {};
+
+    function load(url) {
+        if (!requests[url]) {
+            requests[url] = $.getJSON(url);
+        }
+        return requests[url];
+    }
+
+    function categories(tree, operationTypeId) {
+        var result = [];
+        $.each(tree.operation_types, function(_, operationType) {
+            if (!operationTypeId || String(operationType.id) === String(operationTypeId)) {
+                result = result.concat(operationType.categories);
+            }
+        });
+        return result;
+    }
+
+    function subcategories(tree, categoryId) {
+        var result = [];
+        $.each(categories(tree), function(_, category) {
+            if (String(category.id) === String(categoryId)) {
+                result = category.subcategories;
+            }
+        });
+        return result;
+    }
+
+    function fillSelect($select, items, emptyLabel, selected) {
+        $select.empty().append($('<option>').val('').text(emptyLabel));
+        $.each(items, function(_, item) {
+            $select.append($('<option>').val(item.id).text(item.name));
+        });
+        $select.val($select.find('option[value="' + selected + '"]').length ? selected : '');
+        return $select;
+    }
+
+    return {
+        load: load,
+        categories: categories,
+        subcategories: subcategories,
+        fillSelect: fillSelect
+    };
+})();
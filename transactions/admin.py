@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Transaction
+from .models import REFERENCE_RELATED, ArchivedTransaction, Transaction
+from .search import fts_enabled, search_transactions
 
 
 @admin.register(Transaction)
@@ -11,7 +12,7 @@ class TransactionAdmin(admin.ModelAdmin):
     Attributes:
         list_display (tuple): Поля, отображаемые в списке транзакций.
         list_filter (tuple): Поля для фильтрации списка транзакций.
-        search_fields (tuple): Поля для поиска по транзакциям.
+        search_fields (tuple): Поля для поиска по транзакциям (если нет FTS5-индекса).
         date_hierarchy (str): Поле для иерархической навигации по датам.
         ordering (tuple): Поля для сортировки транзакций по умолчанию.
         fieldsets (tuple): Группировка полей на форме редактирования.
@@ -33,7 +34,6 @@ class TransactionAdmin(admin.ModelAdmin):
     )
     search_fields = (
         'comment',
-        'amount'
     )
     date_hierarchy = 'date'
     ordering = (
@@ -70,9 +70,55 @@ class TransactionAdmin(admin.ModelAdmin):
         Returns:
             QuerySet: Оптимизированный queryset с уменьшенным числом запросов к БД.
         """
-        return super().get_queryset(request).select_related(
-            'status',
-            'operation_type',
-            'category',
-            'subcategory'
-        )
\ No newline at end of file
+        return super().get_queryset(request).select_related(*REFERENCE_RELATED)
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по FTS5-индексу комментариев вместо LIKE по всей таблице.
+
+        Args:
+            request: HttpRequest объект.
+            queryset (QuerySet): Набор транзакций списка.
+            search_term (str): Строка поиска.
+
+        Returns:
+            tuple: (QuerySet, нужен ли distinct).
+        """
+        if not search_term or not fts_enabled(queryset):
+            return super().get_search_results(request, queryset, search_term)
+        return search_transactions(queryset, search_term), False
+
+
+@admin.register(ArchivedTransaction)
+class ArchivedTransactionAdmin(admin.ModelAdmin):
+    """Административный интерфейс для архивных транзакций (только просмотр).
+
+    Attributes:
+        list_display (tuple): Поля, отображаемые в списке транзакций.
+        list_filter (tuple): Поля для фильтрации списка транзакций.
+        date_hierarchy (str): Поле для иерархической навигации по датам.
+        list_select_related (tuple): Справочники, выбираемые одним запросом со списком.
+    """
+    list_display = (
+        'date',
+        'status',
+        'operation_type',
+        'category',
+        'subcategory',
+        'amount',
+        'created_at'
+    )
+    list_filter = (
+        'status',
+        'operation_type'
+    )
+    date_hierarchy = 'date'
+    list_select_related = REFERENCE_RELATED
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
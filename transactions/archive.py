@@ -0,0 +1,84 @@
+"""Перенос транзакций закрытых периодов в архивную таблицу.
+
+Транзакции старше границы переносятся порциями: каждая порция
+копируется в ArchivedTransaction одним INSERT ... SELECT и удаляется из
+Transaction в одной транзакции БД. Прерванный перенос можно запустить
+снова - он продолжится с оставшихся строк. Сигналы моделей при переносе
+не срабатывают, поэтому дневные агрегаты не меняются, а FTS-индекс
+комментариев (триггеры БД) перестает содержать архивные транзакции.
+"""
+
+from django.db import connections, router, transaction as db_transaction
+
+from .models import ArchiveState, ArchivedTransaction, Transaction
+
+ARCHIVE_BATCH_SIZE = 500
+# Заголовок ответа поиска в списке API: транзакции раньше этой даты в архиве
+# и в результаты поиска не входят
+ARCHIVED_BEFORE_HEADER = 'X-Archived-Before'
+
+
+def archive_batches(cutoff, batch_size=ARCHIVE_BATCH_SIZE, limit=None, using=None):
+    """Переносит транзакции с датой раньше cutoff в архив.
+
+    Граница архива сдвигается до начала переноса, чтобы
+    Transaction.ledger видел уже перенесенные строки даже при прерывании.
+
+    Args:
+        cutoff (date): Переносятся транзакции с date < cutoff.
+        batch_size (int): Размер порции.
+        limit (int): Перенести не больше указанного числа строк (None - все).
+        using (str): Алиас БД (по умолчанию - БД записи транзакций).
+
+    Yields:
+        int: Количество перенесенных строк в каждой порции.
+    """
+    using = using or router.db_for_write(Transaction)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in ArchivedTransaction._meta.concrete_fields)
+    source = quote(Transaction._meta.db_table)
+    target = quote(ArchivedTransaction._meta.db_table)
+
+    ArchiveState.objects.db_manager(using).advance(cutoff)
+
+    moved = 0
+    while limit is None or moved < limit:
+        size = batch_size if limit is None else min(batch_size, limit - moved)
+        with db_transaction.atomic(using=using):
+            ids = list(
+                Transaction.objects.using(using).filter(date__lt=cutoff)
+                .order_by('date', 'id').values_list('id', flat=True)[:size]
+            )
+            if not ids:
+                return
+            placeholders = ', '.join(['%s'] * len(ids))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {target} ({columns}) SELECT {columns} FROM {source} WHERE id IN ({placeholders})',
+                    ids
+                )
+                cursor.execute(f'DELETE FROM {source} WHERE id IN ({placeholders})', ids)
+        moved += len(ids)
+        yield len(ids)
+
+
+def vacuum(using=None):
+    """Возвращает освободившееся после переноса место (SQLite и PostgreSQL).
+
+    Returns:
+        bool: Выполнен ли VACUUM.
+    """
+    connection = connections[using or router.db_for_write(Transaction)]
+    if connection.vendor == 'sqlite':
+        sql = 'VACUUM'
+    elif connection.vendor == 'postgresql':
+        sql = f'VACUUM ANALYZE {connection.ops.quote_name(Transaction._meta.db_table)}'
+    else:
+        return False
+    # VACUUM нельзя выполнять внутри транзакции
+    if connection.in_atomic_block:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+    return True
@@ -0,0 +1,167 @@
+"""Остаток денежных средств по статусам во времени.
+
+Остаток считается в БД по таблице дневных агрегатов
+TransactionDailyAggregate (она включает и архивные транзакции): суммы
+берутся со знаком типа операции (OperationType.sign), а нарастающий итог
+и изменение за период - оконными функциями SUM() OVER (...). Ряд
+прореживается группировкой по дню, неделе, месяцу, кварталу или году так,
+чтобы в нем было не больше max_points точек, поэтому объем ответа и
+стоимость расчета не зависят от числа транзакций.
+"""
+
+from datetime import timedelta
+
+from django.db.models import DecimalField, ExpressionWrapper, F, Max, Min, Sum, Window
+from django.db.models.functions import TruncQuarter, TruncYear
+
+from .models import TransactionDailyAggregate
+from .reports import PERIODS
+
+BALANCE_PERIODS = dict(PERIODS, quarter=TruncQuarter, year=TruncYear)
+
+BALANCE_MAX_POINTS = 400
+
+
+def signed_amount():
+    """Сумма агрегата со знаком типа операции (приход - плюс, расход - минус)."""
+    return ExpressionWrapper(
+        F('total_amount') * F('operation_type__sign'),
+        output_field=DecimalField(max_digits=16, decimal_places=2)
+    )
+
+
+def period_buckets(period, date_from, date_to):
+    """Число календарных периодов (точек ряда), которые задевает диапазон.
+
+    Считаются границы периодов, а не длина диапазона: 2024-01-31 -
+    2024-04-01 - это 62 дня, но 4 месяца и 2 квартала.
+
+    Args:
+        period (str): Ключ из BALANCE_PERIODS.
+        date_from (date): Начало диапазона.
+        date_to (date): Конец диапазона.
+
+    Returns:
+        int: Количество периодов.
+    """
+    if period == 'day':
+        return (date_to - date_from).days + 1
+    if period == 'week':
+        # Недели начинаются с понедельника, как у TruncWeek
+        monday_from = date_from - timedelta(days=date_from.weekday())
+        monday_to = date_to - timedelta(days=date_to.weekday())
+        return (monday_to - monday_from).days // 7 + 1
+    if period == 'month':
+        return (date_to.year - date_from.year) * 12 + date_to.month - date_from.month + 1
+    if period == 'quarter':
+        return (date_to.year - date_from.year) * 4 + (date_to.month - 1) // 3 - (date_from.month - 1) // 3 + 1
+    return date_to.year - date_from.year + 1
+
+
+def choose_period(date_from, date_to, max_points=BALANCE_MAX_POINTS):
+    """Самый подробный период, при котором в ряду не больше max_points точек.
+
+    Args:
+        date_from (date): Начало диапазона.
+        date_to (date): Конец диапазона.
+        max_points (int): Максимальное число точек на статус.
+
+    Returns:
+        str: Ключ из BALANCE_PERIODS; 'year', если не подходит ни один
+        период (тогда точек больше max_points).
+    """
+    for period in BALANCE_PERIODS:
+        if period_buckets(period, date_from, date_to) <= max_points:
+            return period
+    return 'year'
+
+
+def balance_timeline(date_from=None, date_to=None, statuses=None, period=None, max_points=BALANCE_MAX_POINTS):
+    """Нарастающий остаток по статусам, прореженный до периодов.
+
+    Точка ряда - начало периода, изменение остатка за период и остаток на
+    его конец. Периоды без операций в ряд не попадают (остаток в них не
+    меняется). Остаток на начало диапазона (opening) - сумма всех операций
+    до date_from.
+
+    Args:
+        date_from (date, optional): Начало диапазона (включительно).
+        date_to (date, optional): Конец диапазона (включительно).
+        statuses (iterable, optional): id статусов; по умолчанию - все.
+        period (str, optional): Период из BALANCE_PERIODS; по умолчанию
+            выбирается по длине диапазона и max_points.
+        max_points (int): Максимальное число точек на статус при выборе периода.
+
+    Returns:
+        dict: {'period': ..., 'date_from': ..., 'date_to': ..., 'results': [
+            {'status': id, 'opening': str, 'points': [
+                {'date': str, 'change': str, 'balance': str}, ...]}, ...]}.
+
+    Raises:
+        ValueError: Если указан неизвестный период или период не задан, а
+            в max_points точек не укладываются даже годы диапазона.
+    """
+    if period is not None and period not in BALANCE_PERIODS:
+        raise ValueError(f"Неизвестный период '{period}'")
+
+    rows = TransactionDailyAggregate.objects.order_by()
+    if statuses:
+        rows = rows.filter(status_id__in=statuses)
+
+    if date_from is None or date_to is None:
+        bounds = rows.aggregate(first=Min('date'), last=Max('date'))
+        date_from = date_from or bounds['first']
+        date_to = date_to or bounds['last']
+    if date_from is None or date_to is None:
+        # Операций нет
+        return {'period': period, 'date_from': None, 'date_to': None, 'results': []}
+    if period is None:
+        period = choose_period(date_from, date_to, max_points)
+        if period_buckets(period, date_from, date_to) > max_points:
+            raise ValueError(f'Диапазон {date_from} - {date_to} не укладывается в {max_points} точек')
+
+    opening = dict(
+        rows.filter(date__lt=date_from).values('status_id')
+        .annotate(total=Sum(signed_amount())).values_list('status_id', 'total')
+    )
+
+    # Оконные суммы считаются по строкам агрегатов: у всех строк одного
+    # периода они одинаковы (в рамку ORDER BY попадают равные значения),
+    # DISTINCT оставляет по строке на статус и период.
+    points = (
+        rows.filter(date__gte=date_from, date__lte=date_to)
+        .annotate(period_start=BALANCE_PERIODS[period]('date'))
+        .annotate(
+            change=Window(Sum(signed_amount()), partition_by=[F('status_id'), F('period_start')]),
+            running=Window(Sum(signed_amount()), partition_by=[F('status_id')], order_by=F('period_start').asc()),
+        )
+        .values('status_id', 'period_start', 'change', 'running')
+        .distinct()
+        .order_by('status_id', 'period_start')
+    )
+
+    series = {status_id: [] for status_id in sorted(opening)}
+    for row in points:
+        series.setdefault(row['status_id'], []).append(row)
+
+    results = []
+    for status_id in sorted(series):
+        start = opening.get(status_id) or 0
+        results.append({
+            'status': status_id,
+            'opening': f"{start:.2f}",
+            'points': [
+                {
+                    'date': row['period_start'].isoformat(),
+                    'change': f"{row['change']:.2f}",
+                    'balance': f"{start + row['running']:.2f}",
+                }
+                for row in series[status_id]
+            ],
+        })
+    return {
+        'period': period,
+        'date_from': date_from.isoformat(),
+        'date_to': date_to.isoformat(),
+        'results': results,
+    }
@@ -0,0 +1,109 @@
+"""Пакетное создание и обновление транзакций через API.
+
+Каждый элемент пакета проверяется TransactionCreateSerializer (справочники -
+по кэшу, без запросов к БД), обновляемые транзакции читаются одним
+запросом, а запись выполняется одним bulk_create и одним bulk_update в
+общей транзакции БД. Некорректные элементы не записываются и
+возвращаются с ошибками, остальные сохраняются.
+"""
+
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from .models import Transaction
+from .serializers import TransactionCreateSerializer
+
+BATCH_MAX_SIZE = 1000
+
+
+def _to_pk(value):
+    """Приводит id элемента пакета к int или None."""
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def apply_batch(items):
+    """Создает и обновляет транзакции пакетом.
+
+    Элементы с ключом id обновляют существующие транзакции (частично -
+    меняются только переданные поля), элементы без id создают новые.
+    Повторный id в одном пакете - ошибка элемента: иначе одна запись
+    попала бы в bulk_update дважды, а изменение сумм учитывалось бы в
+    агрегатах два раза.
+
+    Args:
+        items (list): Элементы пакета (словари полей транзакции).
+
+    Returns:
+        dict: {'created': int, 'updated': int, 'errors': int,
+        'results': [{'index', 'status', 'id' | 'errors'}]} в порядке элементов.
+    """
+    existing = Transaction.objects.in_bulk([
+        pk for pk in (_to_pk(item.get('id')) for item in items if isinstance(item, dict))
+        if pk is not None
+    ])
+
+    results = []
+    to_create = []
+    to_update = []
+    seen_pks = set()
+    update_fields = set()
+    now = timezone.now()
+
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results.append({'index': index, 'status': 'error', 'errors': {'non_field_errors': ['Ожидается объект']}})
+            continue
+
+        if 'id' in item:
+            instance = existing.get(_to_pk(item['id']))
+            if instance is None:
+                results.append({'index': index, 'status': 'error', 'errors': {'id': ['Транзакция не найдена']}})
+                continue
+            if instance.pk in seen_pks:
+                results.append({'index': index, 'status': 'error', 'errors': {'id': ['Транзакция уже есть в пакете']}})
+                continue
+            seen_pks.add(instance.pk)
+            serializer = TransactionCreateSerializer(instance, data=item, partial=True)
+        else:
+            instance = None
+            serializer = TransactionCreateSerializer(data=item)
+
+        if not serializer.is_valid():
+            results.append({'index': index, 'status': 'error', 'errors': serializer.errors})
+            continue
+
+        if instance is None:
+            obj = Transaction(**serializer.validated_data)
+            to_create.append(obj)
+            results.append({'index': index, 'status': 'created', 'object': obj})
+        else:
+            for field, value in serializer.validated_data.items():
+                setattr(instance, field, value)
+            # bulk_update не обновляет auto_now поля сам
+            instance.updated_at = now
+            update_fields.update(serializer.validated_data)
+            to_update.append(instance)
+            results.append({'index': index, 'status': 'updated', 'object': instance})
+
+    with db_transaction.atomic():
+        if to_create:
+            Transaction.objects.bulk_create(to_create)
+        if to_update:
+            Transaction.objects.bulk_update(to_update, sorted(update_fields | {'updated_at'}))
+
+    for result in results:
+        obj = result.pop('object', None)
+        if obj is not None:
+            result['id'] = obj.pk
+
+    return {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'errors': len(results) - len(to_create) - len(to_update),
+        'results': results,
+    }
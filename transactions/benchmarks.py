@@ -0,0 +1,224 @@
+"""Замеры скорости страниц и API транзакций на синтетических данных.
+
+Замеры (benchmark_urls) - горячие представления: список транзакций и его
+подгрузка, выгрузка, список API с фильтрами и поиском, отчеты и список
+в админке. Запросы выполняются тестовым клиентом Django в том же
+процессе, поэтому измеряется время представления и БД без сети.
+
+Результаты сохраняются в JSON, который можно сравнить с результатами
+другого коммита (compare_results).
+"""
+
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .filters import filter_transactions
+from .pagination import paginate_keyset
+
+
+@dataclass
+class BenchmarkResult:
+    """Результат замера одного представления на одном объеме данных.
+
+    Attributes:
+        size (int): Количество сгенерированных транзакций.
+        benchmark (str): Название замера.
+        url (str): Запрошенный URL.
+        status (int): HTTP-статус ответа.
+        queries (int): Число SQL-запросов за запрос.
+        min_ms (float): Минимальное время ответа, мс.
+        median_ms (float): Медиана времени ответа, мс.
+        max_ms (float): Максимальное время ответа, мс.
+    """
+    size: int
+    benchmark: str
+    url: str
+    status: int
+    queries: int
+    min_ms: float
+    median_ms: float
+    max_ms: float
+
+
+def _url(name, params=None, args=None):
+    url = reverse(name, args=args)
+    return f'{url}?{urlencode(params)}' if params else url
+
+
+def benchmark_urls():
+    """URL замеров для текущих данных.
+
+    Returns:
+        dict: {название замера: URL}.
+    """
+    today = timezone.localdate()
+    month = {'date_from': today.replace(day=1).isoformat(), 'date_to': today.isoformat()}
+    year = {'date_from': (today - timedelta(days=365)).isoformat(), 'date_to': today.isoformat()}
+
+    # Курсор второй страницы списка за год
+    _, cursor = paginate_keyset(filter_transactions(year)[0])
+    rows_params = dict(year, cursor=cursor) if cursor else year
+
+    return {
+        'list': _url('transactions:list'),
+        'list_year': _url('transactions:list', year),
+        'list_rows_page2': _url('transactions:list_rows', rows_params),
+        'export_month_csv': _url('transactions:export', month),
+        'api_list': _url('transactions:transaction-list'),
+        'api_list_filtered': _url('transactions:transaction-list', dict(year, amount_min='1000')),
+        'api_list_fields': _url('transactions:transaction-list', {'fields': 'id,date,amount'}),
+        'api_search': _url('transactions:transaction-list', {'search': 'оплата'}),
+        'api_report_month': _url('transactions:transaction-report', {'period': 'month', 'group_by': 'status'}),
+        'api_balance': _url('transactions:transaction-balance'),
+        'admin_changelist': _url('admin:transactions_transaction_changelist'),
+    }
+
+
+def benchmark_client():
+    """Тестовый клиент, вошедший под временным суперпользователем.
+
+    Пользователь создается в текущей транзакции БД и исчезает при ее откате.
+    """
+    user, _ = User.objects.get_or_create(
+        username='benchmark', defaults={'is_staff': True, 'is_superuser': True}
+    )
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def measure(client, url, repeat):
+    """Замеряет GET-запрос: один прогрев и repeat замеров.
+
+    Returns:
+        tuple: (статус, число запросов, список времен в мс).
+    """
+    timings = []
+    response = None
+    for attempt in range(repeat + 1):
+        started = time.perf_counter()
+        response = client.get(url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        elapsed = (time.perf_counter() - started) * 1000
+        if attempt:
+            timings.append(elapsed)
+    usage = getattr(response.wsgi_request, 'query_usage', None)
+    return response.status_code, usage.queries if usage else None, timings
+
+
+def run_benchmarks(client, size, repeat=5, only=None):
+    """Выполняет замеры на текущих данных.
+
+    Чтение с реплики на время замеров выключено: данные генерируются в
+    неподтвержденной транзакции основной БД, и на реплике их нет.
+
+    Args:
+        client (Client): Клиент из benchmark_client().
+        size (int): Объем данных для записи в результат.
+        repeat (int): Количество замеров каждого URL.
+        only (iterable, optional): Названия замеров; по умолчанию - все.
+
+    Returns:
+        list: BenchmarkResult по каждому замеру.
+    """
+    results = []
+    for name, url in benchmark_urls().items():
+        if only and name not in only:
+            continue
+        # Клиент обращается к хосту testserver, как в тестах
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], REPLICA_ENABLED=False):
+            status, queries, timings = measure(client, url, repeat)
+        results.append(BenchmarkResult(
+            size=size,
+            benchmark=name,
+            url=url,
+            status=status,
+            queries=queries,
+            min_ms=round(min(timings), 2),
+            median_ms=round(statistics.median(timings), 2),
+            max_ms=round(max(timings), 2),
+        ))
+    return results
+
+
+def current_commit():
+    """Хэш текущего коммита git или None."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def report_meta(**meta):
+    """Описание окружения для отчета: коммит, время, версии и БД.
+
+    Args:
+        **meta: Параметры запуска (seed, repeat и т.д.).
+
+    Returns:
+        dict: Описание окружения вместе с параметрами запуска.
+    """
+    return {
+        'commit': current_commit(),
+        'created_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        **meta,
+    }
+
+
+def build_report(results, **meta):
+    """Собирает JSON-отчет замеров с описанием окружения.
+
+    Args:
+        results (list): BenchmarkResult.
+        **meta: Параметры запуска (seed, repeat и т.д.).
+
+    Returns:
+        dict: {'meta': {...}, 'results': [...]}.
+    """
+    return {
+        'meta': report_meta(**meta),
+        'results': [asdict(result) for result in results],
+    }
+
+
+def compare_results(previous, current):
+    """Сравнивает медианы двух отчетов.
+
+    Args:
+        previous (dict): Отчет прошлого запуска.
+        current (dict): Отчет текущего запуска.
+
+    Returns:
+        list: (size, benchmark, прошлая медиана, текущая медиана, изменение в %)
+        для замеров, которые есть в обоих отчетах.
+    """
+    before = {(row['size'], row['benchmark']): row['median_ms'] for row in previous['results']}
+    rows = []
+    for row in current['results']:
+        key = (row['size'], row['benchmark'])
+        if key not in before:
+            continue
+        old = before[key]
+        change = (row['median_ms'] - old) / old * 100 if old else 0.0
+        rows.append((*key, old, row['median_ms'], round(change, 1)))
+    return rows
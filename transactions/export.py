@@ -0,0 +1,105 @@
+"""Потоковый экспорт транзакций в CSV и NDJSON.
+
+Строки читаются одним запросом с JOIN справочников через
+QuerySet.iterator(chunk_size=...) и сразу кодируются, поэтому память не
+зависит от числа транзакций, а первые байты уходят клиенту до того,
+как прочитан весь результат.
+"""
+
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .pagination import KEYSET_ORDERING
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('date', 'date'),
+    ('status', 'status__name'),
+    ('operation_type', 'operation_type__name'),
+    ('category', 'category__name'),
+    ('subcategory', 'subcategory__name'),
+    ('amount', 'amount'),
+    ('comment', 'comment'),
+    ('created_at', 'created_at'),
+)
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class _Echo:
+    """Псевдофайл для csv.writer: возвращает записанную строку вместо буферизации."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Итерирует строки экспорта без загрузки всего результата в память.
+
+    Args:
+        queryset (QuerySet): Отфильтрованный набор транзакций.
+        chunk_size (int): Количество строк, читаемых из БД за раз.
+
+    Yields:
+        tuple: Значения колонок EXPORT_COLUMNS.
+    """
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    yield from queryset.order_by(*KEYSET_ORDERING).values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+def iter_csv(rows):
+    """Кодирует строки экспорта в CSV с заголовком.
+
+    Args:
+        rows (iterable): Строки из export_rows.
+
+    Yields:
+        str: Строки CSV.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(rows):
+    """Кодирует строки экспорта в NDJSON (один JSON-объект на строку).
+
+    Args:
+        rows (iterable): Строки из export_rows.
+
+    Yields:
+        str: Строки NDJSON.
+    """
+    names = [name for name, _ in EXPORT_COLUMNS]
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + '\n'
+
+
+def iter_export(queryset, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Потоковое представление транзакций в выбранном формате.
+
+    Args:
+        queryset (QuerySet): Отфильтрованный набор транзакций.
+        export_format (str): 'csv' или 'ndjson'.
+        chunk_size (int): Количество строк, читаемых из БД за раз.
+
+    Returns:
+        iterator: Строки выбранного формата.
+
+    Raises:
+        ValueError: Если формат не поддерживается.
+    """
+    rows = export_rows(queryset, chunk_size)
+    if export_format == 'csv':
+        return iter_csv(rows)
+    if export_format == 'ndjson':
+        return iter_ndjson(rows)
+    raise ValueError(f"Неподдерживаемый формат экспорта '{export_format}'")
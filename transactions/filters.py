@@ -0,0 +1,147 @@
+"""Фильтрация транзакций по параметрам запроса.
+
+Общие правила фильтрации для API, HTML-списка, экспорта и команд
+управления описаны в TransactionFilterSet: диапазоны дат и сумм, статус,
+тип операции, категория и подкатегория (в том числе несколько значений
+через запятую). Каждый фильтр опирается на индекс таблицы транзакций
+(см. Transaction.Meta.indexes).
+"""
+
+from datetime import datetime
+
+import django_filters
+from django.utils import timezone
+
+from .models import Transaction
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    """Фильтр по списку чисел через запятую (?category__in=1,2,3)."""
+
+
+class TransactionFilterSet(django_filters.FilterSet):
+    """Фильтры списка транзакций.
+
+    Attributes:
+        date_from (DateFilter): Дата не раньше (txn_date_created_idx).
+        date_to (DateFilter): Дата не позже (txn_date_created_idx).
+        amount_min (NumberFilter): Сумма не меньше (txn_amount_idx).
+        amount_max (NumberFilter): Сумма не больше (txn_amount_idx).
+        status (NumberFilter): Статус (txn_status_date_idx).
+        operation_type (NumberFilter): Тип операции.
+        category (NumberFilter): Категория (txn_category_date_idx).
+        subcategory (NumberFilter): Подкатегория.
+        status__in (NumberInFilter): Один из статусов (txn_status_date_idx).
+        category__in (NumberInFilter): Одна из категорий (txn_category_date_idx).
+    """
+    date_from = django_filters.DateFilter(field_name='date', lookup_expr='gte')
+    date_to = django_filters.DateFilter(field_name='date', lookup_expr='lte')
+    amount_min = django_filters.NumberFilter(field_name='amount', lookup_expr='gte')
+    amount_max = django_filters.NumberFilter(field_name='amount', lookup_expr='lte')
+    # Фильтры справочников - по числовому *_id: ModelChoiceFilter из Meta.fields
+    # проверял бы значение отдельным запросом к таблице справочника
+    status = django_filters.NumberFilter(field_name='status_id')
+    operation_type = django_filters.NumberFilter(field_name='operation_type_id')
+    category = django_filters.NumberFilter(field_name='category_id')
+    subcategory = django_filters.NumberFilter(field_name='subcategory_id')
+    status__in = NumberInFilter(field_name='status_id', lookup_expr='in')
+    category__in = NumberInFilter(field_name='category_id', lookup_expr='in')
+
+    class Meta:
+        model = Transaction
+        fields = ['date']
+
+
+def filter_transactions(params):
+    """Строит отфильтрованный набор транзакций по параметрам запроса.
+
+    Используется списком транзакций, его подгрузкой и экспортом, чтобы
+    все они понимали одни и те же параметры. В отличие от API, диапазон
+    дат по умолчанию - текущий месяц, а некорректные значения фильтров
+    не приводят к ошибке, а пропускаются.
+
+    Args:
+        params (QueryDict): GET-параметры запроса.
+
+    Returns:
+        tuple: QuerySet транзакций и словарь с разобранными значениями фильтров.
+    """
+    data, filters = _filter_data(params)
+    filterset = TransactionFilterSet(
+        data,
+        queryset=Transaction.objects.with_references()
+    )
+    # Некорректные значения не попадают в cleaned_data и просто не применяются
+    return filterset.qs, filters
+
+
+def filter_ledger(params, using=None):
+    """Как filter_transactions, но вместе с архивными транзакциями.
+
+    Те же фильтры применяются к Transaction и ArchivedTransaction, архив
+    читается, только если диапазон дат начинается раньше его границы.
+
+    Args:
+        params (QueryDict): GET-параметры запроса.
+        using (str): Алиас БД (None - по маршрутизации чтения).
+
+    Returns:
+        tuple: LedgerRange транзакций и словарь с разобранными значениями фильтров.
+    """
+    data, filters = _filter_data(params)
+    rows = Transaction.ledger.db_manager(using).rows(
+        filters['date_from'], filters['date_to'], refine=filterset_refiner(data)
+    )
+    return rows, filters
+
+
+def filterset_refiner(data):
+    """Функция, применяющая TransactionFilterSet с данными data к набору любой таблицы журнала.
+
+    FilterSet не принимает набор ArchivedTransaction через бэкенд DRF,
+    но его фильтры ссылаются только на общие поля TransactionFields.
+    """
+    def refine(queryset):
+        return TransactionFilterSet(data, queryset=queryset).qs
+    return refine
+
+
+def _filter_data(params):
+    """Данные для TransactionFilterSet с диапазоном дат по умолчанию и разобранные фильтры."""
+    today = timezone.now().date()
+    default_date_from = today.replace(day=1)  # Первое число текущего месяца
+    default_date_to = today  # Текущая дата
+
+    # Получаем параметры фильтрации из GET-запроса
+    date_from = params.get('date_from', default_date_from.strftime('%Y-%m-%d'))
+    date_to = params.get('date_to', default_date_to.strftime('%Y-%m-%d'))
+    status_id = params.get('status')
+    operation_type_id = params.get('operation_type')
+    category_id = params.get('category')
+    subcategory_id = params.get('subcategory')
+
+    # Обработка и валидация дат
+    try:
+        date_from = datetime.strptime(date_from, '%Y-%m-%d').date()
+        date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        date_from = default_date_from
+        date_to = default_date_to
+
+    data = params.copy()
+    data['date_from'] = date_from.isoformat()
+    data['date_to'] = date_to.isoformat()
+
+    filters = {
+        'date_from': date_from,
+        'date_to': date_to,
+        'default_date_from': default_date_from,
+        'default_date_to': default_date_to,
+        'status': status_id,
+        'operation_type': operation_type_id,
+        'category': category_id,
+        'subcategory': subcategory_id,
+        'amount_min': params.get('amount_min', ''),
+        'amount_max': params.get('amount_max', ''),
+    }
+    return data, filters
@@ -0,0 +1,188 @@
+"""Быстрое чтение транзакций через values() с выбором полей.
+
+Вместо ModelSerializer с четырьмя вложенными сериализаторами на строку
+транзакции выбираются одним запросом через values() и превращаются в
+словари напрямую. По умолчанию результат совпадает по форме с
+TransactionSerializer (те же ключи, порядок и форматы значений).
+
+FlatProjection позволяет клиенту запросить только нужные поля
+(?fields=) и вложенные справочники (?expand=): в SQL попадают только
+нужные колонки, а JOIN выполняется только для раскрытых справочников.
+"""
+
+from rest_framework import serializers
+
+SCALAR_FIELDS = ('id', 'date', 'amount', 'comment', 'created_at', 'updated_at')
+
+# Поля вложенного представления справочника: (ключ, колонка values())
+RELATIONS = {
+    'status': (('id', 'status_id'), ('name', 'status__name')),
+    'operation_type': (
+        ('id', 'operation_type_id'),
+        ('name', 'operation_type__name'),
+        ('sign', 'operation_type__sign'),
+    ),
+    'category': (
+        ('id', 'category_id'),
+        ('operation_type', 'category__operation_type_id'),
+        ('name', 'category__name'),
+    ),
+    'subcategory': (
+        ('id', 'subcategory_id'),
+        ('category', 'subcategory__category_id'),
+        ('name', 'subcategory__name'),
+    ),
+}
+
+DEFAULT_FIELDS = (
+    'id', 'status', 'operation_type', 'category', 'subcategory',
+    'date', 'amount', 'comment', 'created_at', 'updated_at',
+)
+
+# Колонки, которые всегда выбираются: по ним работает курсорная пагинация
+ALWAYS_SELECTED = ('id', 'date', 'amount', 'created_at')
+
+# Поля DRF используются только для форматирования значений так же,
+# как это делает TransactionSerializer
+_date_field = serializers.DateField()
+_datetime_field = serializers.DateTimeField()
+_amount_field = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+FORMATTERS = {
+    'date': _date_field.to_representation,
+    'amount': _amount_field.to_representation,
+    'created_at': _datetime_field.to_representation,
+    'updated_at': _datetime_field.to_representation,
+}
+
+
+def parse_field_list(value):
+    """Разбирает список полей из GET-параметра ("a,b,c").
+
+    Returns:
+        list: Имена полей или None, если параметр не передан.
+    """
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class FlatProjection:
+    """Набор выводимых полей транзакции и соответствующие колонки values().
+
+    Без fields и expand выводится полное представление TransactionSerializer.
+    Если передан хотя бы один из параметров:
+    - fields задает выводимые ключи (по умолчанию - все);
+    - справочник в fields выводится как id, а если он указан в expand -
+      вложенным объектом; справочники из expand добавляются к выводу;
+    - ключи вида category_id выводят id справочника под этим именем.
+
+    Attributes:
+        values (list): Колонки для QuerySet.values().
+        columns (list): Правила построения ключей ответа.
+
+    Raises:
+        ValueError: Если указано неизвестное поле или справочник.
+    """
+
+    def __init__(self, fields=None, expand=None):
+        sparse = fields is not None or expand is not None
+        fields = list(fields) if fields else list(DEFAULT_FIELDS)
+        expanded = set(expand or ()) if sparse else set(RELATIONS)
+
+        unknown_expand = expanded - set(RELATIONS)
+        if unknown_expand:
+            raise ValueError(f"Нельзя раскрыть: {', '.join(sorted(unknown_expand))}")
+        id_aliases = {f'{name}_id': name for name in RELATIONS}
+        unknown = [
+            name for name in fields
+            if name not in SCALAR_FIELDS and name not in RELATIONS and name not in id_aliases
+        ]
+        if unknown:
+            raise ValueError(f"Неизвестные поля: {', '.join(unknown)}")
+
+        for name in RELATIONS:
+            if name in expanded and name not in fields:
+                fields.append(name)
+
+        self.columns = []
+        values = list(ALWAYS_SELECTED)
+        for name in dict.fromkeys(fields):
+            if name in SCALAR_FIELDS:
+                self.columns.append((name, 'scalar', name))
+                values.append(name)
+            elif name in id_aliases:
+                self.columns.append((name, 'scalar', name))
+                values.append(name)
+            elif name in expanded:
+                self.columns.append((name, 'nested', RELATIONS[name]))
+                values.extend(column for _, column in RELATIONS[name])
+            else:
+                self.columns.append((name, 'scalar', f'{name}_id'))
+                values.append(f'{name}_id')
+        self.values = list(dict.fromkeys(values))
+
+    def queryset(self, queryset):
+        """Переводит набор транзакций в values() с нужными колонками.
+
+        Args:
+            queryset (QuerySet): Отфильтрованный и отсортированный набор транзакций.
+
+        Аннотации набора (например, search_rank) тоже выбираются: по ним
+        может идти сортировка курсорной пагинации.
+
+        Returns:
+            QuerySet: Набор словарей с колонками self.values.
+        """
+        return queryset.values(*self.values, *queryset.query.annotations)
+
+    def row(self, row):
+        """Строит представление транзакции из строки values().
+
+        Args:
+            row (dict): Строка с колонками self.values.
+
+        Returns:
+            dict: Данные транзакции.
+        """
+        result = {}
+        for key, kind, spec in self.columns:
+            if kind == 'scalar':
+                value = row[spec]
+                formatter = FORMATTERS.get(spec)
+                result[key] = formatter(value) if formatter and value is not None else value
+            elif row[spec[0][1]] is None:
+                result[key] = None
+            else:
+                result[key] = {name: row[column] for name, column in spec}
+        return result
+
+
+DEFAULT_PROJECTION = FlatProjection()
+
+
+def flat_queryset(queryset, projection=DEFAULT_PROJECTION):
+    """Переводит набор транзакций в values() для быстрого чтения.
+
+    Args:
+        queryset (QuerySet): Отфильтрованный и отсортированный набор транзакций.
+        projection (FlatProjection): Выбор полей (по умолчанию - полное представление).
+
+    Returns:
+        QuerySet: Набор словарей.
+    """
+    return projection.queryset(queryset)
+
+
+def serialize_rows(rows, projection=DEFAULT_PROJECTION):
+    """Преобразует строки flat_queryset в список представлений.
+
+    Args:
+        rows (iterable): Строки values().
+        projection (FlatProjection): Тот же выбор полей, что и в flat_queryset.
+
+    Returns:
+        list: Данные транзакций.
+    """
+    build = projection.row
+    return [build(row) for row in rows]
@@ -1,8 +1,24 @@
 from django import forms
+from reference.cache import get_reference_data
 from reference.models import SubCategory
 from .models import Transaction
 
 
+def _cached_choices(field, objects):
+    """Формирует варианты выбора ModelChoiceField из кэша справочников.
+
+    Args:
+        field (ModelChoiceField): Поле формы.
+        objects (iterable): Объекты справочника из кэша.
+
+    Returns:
+        list: Пары (id, подпись), как их сформировал бы сам ModelChoiceField.
+    """
+    choices = [('', field.empty_label)] if field.empty_label is not None else []
+    choices.extend((obj.pk, field.label_from_instance(obj)) for obj in objects)
+    return choices
+
+
 class TransactionForm(forms.ModelForm):
     """Форма для создания и редактирования транзакций.
 
@@ -26,6 +42,7 @@ class TransactionForm(forms.ModelForm):
         - Добавление классов Bootstrap для всех полей
         - Динамическое управление доступными подкатегориями
         - Сделать поле подкатегории необязательным
+        - Варианты выбора справочников берутся из кэша, без запросов к БД
 
         Args:
             *args: Позиционные аргументы.
@@ -52,24 +69,39 @@ class TransactionForm(forms.ModelForm):
         # Поле подкатегории необязательное
         self.fields['subcategory'].required = False
 
+        references = get_reference_data()
+
         # Динамическое управление доступными подкатегориями
+        subcategories = []
         if 'category' in self.data:
             try:
                 category_id = int(self.data.get('category'))
                 self.fields['subcategory'].queryset = SubCategory.objects.filter(
                     category_id=category_id
                 ).order_by('name')
+                subcategories = references.subcategories_for(category_id)
             except (ValueError, TypeError):
                 pass  # Оставляем пустой queryset при невалидных данных
         elif self.instance.pk:
             # Для существующей транзакции показываем подкатегории текущей категории
-            self.fields['subcategory'].queryset = (
-                self.instance.category.subcategory_set.all().order_by('name')
-            )
+            self.fields['subcategory'].queryset = SubCategory.objects.filter(
+                category_id=self.instance.category_id
+            ).order_by('name')
+            subcategories = references.subcategories_for(self.instance.category_id)
         else:
             # Для новой транзакции без выбранной категории - пустой список
             self.fields['subcategory'].queryset = SubCategory.objects.none()
 
+        # Варианты выбора из кэша справочников (queryset остается для валидации)
+        self.fields['status'].choices = _cached_choices(self.fields['status'], references.statuses)
+        self.fields['operation_type'].choices = _cached_choices(
+            self.fields['operation_type'], references.operation_types
+        )
+        self.fields['category'].choices = _cached_choices(self.fields['category'], references.categories)
+        self.fields['subcategory'].choices = _cached_choices(
+            self.fields['subcategory'], sorted(subcategories, key=lambda obj: obj.name)
+        )
+
     class Meta:
         model = Transaction
         fields = [
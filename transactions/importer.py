@@ -0,0 +1,258 @@
+"""Массовый импорт транзакций из CSV и JSON.
+
+Входной файл читается потоково, названия справочников сопоставляются
+по кэшу справочников в памяти, строки проверяются без обращений к БД и
+записываются через bulk_create порциями, каждая в своей транзакции БД.
+Формат колонок совпадает с выгрузкой (см. export.py): date, status,
+operation_type, category, subcategory, amount, comment.
+"""
+
+import csv
+import json
+import time
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction as db_transaction
+
+from reference.cache import get_reference_data
+from .models import Transaction
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_FORMATS = ('csv', 'json', 'ndjson')
+
+_JSON_READ_SIZE = 64 * 1024
+
+
+def read_csv(stream):
+    """Читает CSV с заголовком.
+
+    Yields:
+        tuple: Номер строки файла и словарь значений.
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_ndjson(stream):
+    """Читает NDJSON: по одному JSON-объекту в строке.
+
+    Некорректная строка не прерывает чтение: вместо значений
+    возвращается ошибка, которая попадет в отчет импорта.
+
+    Yields:
+        tuple: Номер строки файла и словарь значений (или ValueError).
+    """
+    for line_num, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_num, json.loads(line)
+        except ValueError as exc:
+            yield line_num, ValueError(f'Некорректный JSON: {exc}')
+
+
+def read_json_array(stream):
+    """Потоково читает JSON-массив объектов, не загружая файл целиком.
+
+    Yields:
+        tuple: Порядковый номер элемента массива и словарь значений.
+
+    Raises:
+        ValueError: Если файл не является JSON-массивом.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    index = 0
+    eof = False
+
+    while True:
+        # Пропускаем пробелы и разделители между элементами
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if not started and position < len(buffer):
+            if buffer[position] != '[':
+                raise ValueError('Ожидается JSON-массив объектов')
+            started = True
+            position += 1
+            continue
+        if started and position < len(buffer) and buffer[position] == ']':
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise ValueError('Некорректный JSON-массив') from None
+            chunk = stream.read(_JSON_READ_SIZE)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        if not started:
+            raise ValueError('Ожидается JSON-массив объектов')
+        index += 1
+        yield index, item
+        position = end
+
+
+READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+    'json': read_json_array,
+}
+
+
+class ImportReport:
+    """Итог импорта.
+
+    Attributes:
+        total (int): Прочитано строк.
+        imported (int): Записано транзакций.
+        errors (list): Пары (номер строки, сообщение об ошибке).
+        elapsed (float): Длительность импорта в секундах.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.imported = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        """Скорость обработки строк."""
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+
+class TransactionImporter:
+    """Проверяет строки импорта в памяти и записывает их порциями.
+
+    Attributes:
+        batch_size (int): Размер порции для bulk_create.
+        dry_run (bool): Только проверить строки, ничего не записывая.
+    """
+
+    amount_field = Transaction._meta.get_field('amount')
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+
+        references = get_reference_data()
+        self.statuses = {obj.name: obj for obj in references.statuses}
+        self.operation_types = {obj.name: obj for obj in references.operation_types}
+        self.categories = {(obj.operation_type_id, obj.name): obj for obj in references.categories}
+        self.subcategories = {(obj.category_id, obj.name): obj for obj in references.subcategories}
+
+    def _value(self, row, name, required=True):
+        value = row.get(name)
+        value = '' if value is None else str(value).strip()
+        if required and not value:
+            raise ValueError(f"Не заполнено поле '{name}'")
+        return value
+
+    def _lookup(self, mapping, key, label, name):
+        try:
+            return mapping[key]
+        except KeyError:
+            raise ValueError(f"{label} '{name}' не найден(а)") from None
+
+    def build(self, row):
+        """Строит несохраненную транзакцию из строки импорта.
+
+        Повторяет проверки Transaction.save() (соответствие категории типу
+        операции и подкатегории категории) без запросов к БД.
+
+        Args:
+            row (dict): Значения колонок.
+
+        Returns:
+            Transaction: Несохраненная транзакция.
+
+        Raises:
+            ValueError: Если строка некорректна.
+        """
+        if isinstance(row, ValueError):
+            raise row
+        if not isinstance(row, dict):
+            raise ValueError('Строка должна быть объектом')
+
+        try:
+            day = date.fromisoformat(self._value(row, 'date'))
+        except ValueError as exc:
+            raise ValueError(f"Некорректная дата: {exc}") from None
+
+        try:
+            amount = Decimal(self._value(row, 'amount'))
+        except InvalidOperation:
+            raise ValueError(f"Некорректная сумма '{row.get('amount')}'") from None
+        if not amount.is_finite() or amount.as_tuple().exponent < -self.amount_field.decimal_places:
+            raise ValueError(f"Некорректная сумма '{row.get('amount')}'")
+        if amount and amount.adjusted() + 1 > self.amount_field.max_digits - self.amount_field.decimal_places:
+            raise ValueError(f"Слишком большая сумма '{row.get('amount')}'")
+
+        status_name = self._value(row, 'status')
+        status = self._lookup(self.statuses, status_name, 'Статус', status_name)
+        operation_type_name = self._value(row, 'operation_type')
+        operation_type = self._lookup(self.operation_types, operation_type_name, 'Тип операции', operation_type_name)
+        category_name = self._value(row, 'category')
+        category = self._lookup(
+            self.categories, (operation_type.id, category_name),
+            f"Категория типа '{operation_type_name}'", category_name
+        )
+        subcategory = None
+        subcategory_name = self._value(row, 'subcategory', required=False)
+        if subcategory_name:
+            subcategory = self._lookup(
+                self.subcategories, (category.id, subcategory_name),
+                f"Подкатегория категории '{category_name}'", subcategory_name
+            )
+
+        return Transaction(
+            date=day,
+            status=status,
+            operation_type=operation_type,
+            category=category,
+            subcategory=subcategory,
+            amount=amount,
+            comment=self._value(row, 'comment', required=False),
+        )
+
+    def _flush(self, batch, report):
+        if batch and not self.dry_run:
+            with db_transaction.atomic():
+                Transaction.objects.bulk_create(batch, batch_size=self.batch_size)
+        report.imported += len(batch)
+        batch.clear()
+
+    def run(self, rows):
+        """Импортирует строки.
+
+        Некорректные строки пропускаются и попадают в отчет, остальные
+        записываются порциями по batch_size.
+
+        Args:
+            rows (iterable): Пары (номер строки, словарь значений) от READERS.
+
+        Returns:
+            ImportReport: Итог импорта.
+        """
+        report = ImportReport()
+        started = time.monotonic()
+        batch = []
+        for line_num, row in rows:
+            report.total += 1
+            try:
+                batch.append(self.build(row))
+            except ValueError as exc:
+                report.errors.append((line_num, str(exc)))
+                continue
+            if len(batch) >= self.batch_size:
+                self._flush(batch, report)
+        self._flush(batch, report)
+        report.elapsed = time.monotonic() - started
+        return report
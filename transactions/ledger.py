@@ -0,0 +1,169 @@
+"""Генерация синтетического журнала транзакций для замеров.
+
+Транзакции распределяются по существующим справочникам (см.
+initialize_data.py) с правдоподобными весами и суммами: продаж и
+расходов на инфраструктуру много, зарплата - редкие крупные суммы, в
+выходные операций меньше. Генератор детерминирован при заданном seed,
+поэтому замеры на разных коммитах идут на одинаковых данных.
+"""
+
+import math
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction as db_transaction
+
+from reference.cache import get_reference_data
+from .models import Transaction, TransactionDailyAggregate
+
+GENERATE_BATCH_SIZE = 5000
+
+# Профиль категории: (вес, медиана суммы, разброс логнормального распределения)
+CATEGORY_PROFILES = {
+    'Продажи': (30, 15000, 0.9),
+    'Маркетинг': (20, 3000, 0.8),
+    'Инфраструктура': (25, 1500, 0.7),
+    'Зарплата': (5, 60000, 0.3),
+}
+DEFAULT_CATEGORY_PROFILE = (10, 2000, 1.0)
+
+STATUS_WEIGHTS = {
+    'Бизнес': 70,
+    'Личное': 20,
+    'Налог': 10,
+}
+DEFAULT_STATUS_WEIGHT = 10
+
+# Доля операций в выходные относительно будних дней
+WEEKEND_WEIGHT = 0.3
+SUBCATEGORY_SHARE = 0.7
+COMMENT_SHARE = 0.6
+COMMENT_WORDS = (
+    'оплата', 'счет', 'аренда', 'реклама', 'сервер', 'клиент', 'договор',
+    'возврат', 'поставщик', 'заказ', 'подписка', 'услуги', 'аванс', 'доставка',
+)
+MAX_AMOUNT = Decimal('9999999999.99')
+
+
+class LedgerGenerator:
+    """Строит несохраненные транзакции со случайными, но воспроизводимыми значениями.
+
+    Attributes:
+        start (date): Первая дата журнала.
+        end (date): Последняя дата журнала.
+        seed (int): Начальное значение генератора случайных чисел.
+
+    Raises:
+        ValueError: Если справочники не заполнены или диапазон дат пуст.
+    """
+
+    def __init__(self, start, end, seed=None):
+        if start > end:
+            raise ValueError('Начало диапазона позже конца')
+        references = get_reference_data()
+        if not references.statuses or not references.categories:
+            raise ValueError('Нет статусов или категорий: сначала выполните python initialize_data.py')
+
+        self.start = start
+        self.end = end
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.days = (end - start).days
+
+        self.statuses = references.statuses
+        self.status_weights = [STATUS_WEIGHTS.get(obj.name, DEFAULT_STATUS_WEIGHT) for obj in self.statuses]
+        self.categories = references.categories
+        self.category_weights = [
+            CATEGORY_PROFILES.get(obj.name, DEFAULT_CATEGORY_PROFILE)[0] for obj in self.categories
+        ]
+        self.subcategories = {
+            obj.id: references.subcategories_for(obj.id) for obj in self.categories
+        }
+
+    def _date(self):
+        while True:
+            day = self.start + timedelta(days=self.random.randint(0, self.days))
+            if day.weekday() < 5 or self.random.random() < WEEKEND_WEIGHT:
+                return day
+
+    def _amount(self, category):
+        _, median, sigma = CATEGORY_PROFILES.get(category.name, DEFAULT_CATEGORY_PROFILE)
+        value = Decimal(str(round(self.random.lognormvariate(math.log(median), sigma), 2)))
+        return min(max(value, Decimal('0.01')), MAX_AMOUNT)
+
+    def _comment(self):
+        if self.random.random() >= COMMENT_SHARE:
+            return ''
+        words = self.random.sample(COMMENT_WORDS, self.random.randint(1, 3))
+        if self.random.random() < 0.5:
+            words.append(f'№{self.random.randint(1, 99999)}')
+        return ' '.join(words).capitalize()
+
+    def build(self):
+        """Одна несохраненная транзакция.
+
+        Returns:
+            Transaction: Транзакция с согласованными типом, категорией и подкатегорией.
+        """
+        category = self.random.choices(self.categories, self.category_weights)[0]
+        subcategories = self.subcategories[category.id]
+        subcategory = None
+        if subcategories and self.random.random() < SUBCATEGORY_SHARE:
+            subcategory = self.random.choice(subcategories)
+        return Transaction(
+            date=self._date(),
+            status=self.random.choices(self.statuses, self.status_weights)[0],
+            operation_type_id=category.operation_type_id,
+            category=category,
+            subcategory=subcategory,
+            amount=self._amount(category),
+            comment=self._comment(),
+        )
+
+
+def generate_ledger(count, start, end, seed=None, batch_size=GENERATE_BATCH_SIZE):
+    """Создает count синтетических транзакций порциями.
+
+    Каждая порция записывается через bulk_create в своей транзакции БД
+    (FTS-индекс обновляется вместе с ней). Дневные агрегаты по каждой
+    порции не обновляются - на случайных данных почти каждая строка дает
+    свой ключ агрегата - а пересобираются один раз в конце.
+
+    Args:
+        count (int): Количество транзакций.
+        start (date): Первая дата журнала.
+        end (date): Последняя дата журнала.
+        seed (int, optional): Начальное значение генератора.
+        batch_size (int): Размер порции.
+
+    Yields:
+        int: Количество созданных транзакций в каждой порции.
+
+    Raises:
+        ValueError: Если справочники не заполнены или диапазон дат пуст.
+    """
+    generator = LedgerGenerator(start, end, seed)
+    created = 0
+    while created < count:
+        size = min(batch_size, count - created)
+        batch = [generator.build() for _ in range(size)]
+        with db_transaction.atomic():
+            Transaction.objects.bulk_create(batch, batch_size=batch_size, update_aggregates=False)
+        created += size
+        yield size
+    if created:
+        TransactionDailyAggregate.objects.rebuild()
+
+
+def analyze():
+    """Обновляет статистику планировщика после массовой вставки.
+
+    Returns:
+        bool: Выполнен ли ANALYZE.
+    """
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return True
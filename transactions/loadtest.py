@@ -0,0 +1,511 @@
+"""Нагрузочное тестирование по HTTP с параллельными клиентами.
+
+В отличие от замеров (benchmarks.py), запросы идут по сети к настоящему
+WSGI-серверу из многих потоков одновременно, поэтому видны конкуренция
+за блокировку записи SQLite, очередь запросов и накладные расходы HTTP.
+
+Сценарии (SCENARIOS) - страница списка транзакций, отправка формы
+создания, чтение и запись через /api/transactions/. Доля каждого задается
+смесью весов (parse_mix). Созданные транзакции помечаются комментарием
+прогона и удаляются в конце (cleanup_load_test) вместе с пользователем
+прогона, его сессией и API-ключом.
+
+Прогон пишет в БД и нагружает ее: запускайте его на отдельной базе
+(копии или стенде), а не на рабочей.
+"""
+
+import http.client
+import json
+import math
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from apikeys.models import ApiKey
+from reference.cache import get_reference_data
+from .models import Transaction
+
+# Имя пользователя прогона: LOAD_TEST_USERNAME-<метка прогона>
+LOAD_TEST_USERNAME = 'loadtest'
+COMMENT_PREFIX = 'Нагрузочный тест'
+DEFAULT_MIX = {'list': 4, 'create': 1, 'api_read': 4, 'api_write': 1}
+PERCENTILES = (50, 95, 99)
+REQUEST_TIMEOUT = 30
+LOCKED_MARKERS = (b'database is locked', b'database is busy')
+
+
+def parse_mix(value):
+    """Разбирает смесь сценариев ("list=4,create=1").
+
+    Args:
+        value (str): Пары сценарий=вес через запятую.
+
+    Returns:
+        dict: {сценарий: вес} без нулевых весов.
+
+    Raises:
+        ValueError: Если сценарий неизвестен, вес не число или все веса нулевые.
+    """
+    mix = {}
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Неизвестный сценарий '{name}', доступны: {', '.join(SCENARIOS)}")
+        try:
+            mix[name] = int(weight) if weight else 1
+        except ValueError:
+            raise ValueError(f"Некорректный вес сценария '{item}'") from None
+        if mix[name] < 0:
+            raise ValueError(f"Отрицательный вес сценария '{name}'")
+    mix = {name: weight for name, weight in mix.items() if weight}
+    if not mix:
+        raise ValueError('В смеси нет ни одного сценария с положительным весом')
+    return mix
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга.
+
+    Args:
+        values (list): Отсортированные значения.
+        percent (float): Перцентиль, 0-100.
+
+    Returns:
+        float: Значение перцентиля или None для пустого списка.
+    """
+    if not values:
+        return None
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+@dataclass
+class Sample:
+    """Результат одного запроса.
+
+    Attributes:
+        scenario (str): Сценарий.
+        status (int): HTTP-статус (0 - ответ не получен).
+        elapsed (float): Время ответа, секунд.
+        error (str): Вид ошибки или None.
+    """
+    scenario: str
+    status: int
+    elapsed: float
+    error: str = None
+
+
+def classify(scenario, status, body):
+    """Вид ошибки ответа или None, если ответ ожидаемый.
+
+    Ошибки блокировки SQLite распознаются по тексту исключения в
+    отладочной странице (DEBUG = True); без DEBUG они видны только в
+    журнале сервера (см. LocalServer.locked_errors).
+    """
+    if status == SCENARIOS[scenario].expected_status:
+        return None
+    if status >= 500:
+        return 'sqlite_locked' if any(marker in body for marker in LOCKED_MARKERS) else 'http_5xx'
+    if status >= 400:
+        return 'http_4xx'
+    return f'unexpected_{status}'
+
+
+class LoadContext:
+    """Общие для всех клиентов данные прогона.
+
+    Attributes:
+        run_id (str): Метка прогона в комментариях созданных транзакций.
+        username (str): Пользователь прогона (удаляется в cleanup_load_test).
+        session_key (str): Сессия пользователя нагрузочного теста для HTML-страниц.
+        api_key (str): API-ключ в открытом виде.
+        choices (list): Допустимые сочетания (статус, тип, категория, подкатегория).
+        date_from (date): Начало диапазона дат запросов и создаваемых транзакций.
+        date_to (date): Конец диапазона.
+    """
+
+    def __init__(self, run_id, username, session_key, api_key, choices, date_from, date_to):
+        self.run_id = run_id
+        self.username = username
+        self.session_key = session_key
+        self.api_key = api_key
+        self.choices = choices
+        self.date_from = date_from
+        self.date_to = date_to
+
+    @property
+    def comment(self):
+        """Комментарий, по которому находятся транзакции прогона."""
+        return f'{COMMENT_PREFIX} {self.run_id}'
+
+    def transaction_data(self, rng):
+        """Поля новой транзакции со случайными согласованными справочниками."""
+        status_id, operation_type_id, category_id, subcategory_id = rng.choice(self.choices)
+        day = self.date_from + timedelta(days=rng.randint(0, (self.date_to - self.date_from).days))
+        data = {
+            'date': day.isoformat(),
+            'status': status_id,
+            'operation_type': operation_type_id,
+            'category': category_id,
+            'amount': f'{rng.randint(100, 100000)}.{rng.randint(0, 99):02d}',
+            'comment': self.comment,
+        }
+        if subcategory_id:
+            data['subcategory'] = subcategory_id
+        return data
+
+
+def prepare_load_test(run_id, days=30):
+    """Создает пользователя, сессию и API-ключ для прогона.
+
+    Пользователь свой у каждого прогона, без прав сотрудника и без пароля:
+    сценариям достаточно обычного входа, а после прогона он удаляется.
+
+    Args:
+        run_id (str): Метка прогона.
+        days (int): Глубина диапазона дат запросов, дней.
+
+    Returns:
+        LoadContext: Данные прогона.
+
+    Raises:
+        ValueError: Если справочники не заполнены.
+    """
+    references = get_reference_data()
+    choices = []
+    for status in references.statuses:
+        for category in references.categories:
+            subcategories = [obj.id for obj in references.subcategories_for(category.id)] or [None]
+            for subcategory_id in subcategories:
+                choices.append((status.id, category.operation_type_id, category.id, subcategory_id))
+    if not choices:
+        raise ValueError('Нет статусов или категорий: сначала выполните python initialize_data.py')
+
+    user = User.objects.create_user(username=f'{LOAD_TEST_USERNAME}-{run_id}')
+    # Сессия создается так же, как при входе: cookie передается клиентам
+    client = Client()
+    client.force_login(user)
+    session_key = client.cookies[settings.SESSION_COOKIE_NAME].value
+    _, api_key = ApiKey.objects.create_key(user, f'{COMMENT_PREFIX} {run_id}')
+
+    date_to = timezone.localdate()
+    return LoadContext(run_id, user.username, session_key, api_key, choices, date_to - timedelta(days=days), date_to)
+
+
+def cleanup_load_test(context, keep_transactions=False):
+    """Удаляет пользователя прогона, его API-ключ, сессию и (если не keep_transactions) транзакции.
+
+    Returns:
+        int: Количество удаленных транзакций.
+    """
+    ApiKey.objects.filter(name=context.comment).delete()
+    Session.objects.filter(session_key=context.session_key).delete()
+    User.objects.filter(username=context.username).delete()
+    if keep_transactions:
+        return 0
+    # Удаление по одной записи через post_delete поддерживает дневные агрегаты
+    deleted, _ = Transaction.objects.filter(comment=context.comment).delete()
+    return deleted
+
+
+class LoadClient:
+    """HTTP-клиент одного потока с постоянным соединением и cookie.
+
+    Attributes:
+        context (LoadContext): Данные прогона.
+        random (random.Random): Генератор выбора сценариев и данных.
+    """
+
+    def __init__(self, base_url, context, seed=None):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.context = context
+        self.random = random.Random(seed)
+        self.cookies = {settings.SESSION_COOKIE_NAME: context.session_key}
+        self.connection = None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def request(self, method, path, body=None, headers=None):
+        """Выполняет запрос и запоминает cookie ответа.
+
+        Returns:
+            tuple: (статус, тело ответа в байтах).
+        """
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=REQUEST_TIMEOUT)
+        headers = dict(headers or {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        for header in response.headers.get_all('Set-Cookie') or ():
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        return response.status, data
+
+    def ensure_csrf(self):
+        """Получает cookie CSRF со страницы формы перед первой отправкой."""
+        if settings.CSRF_COOKIE_NAME not in self.cookies:
+            self.request('GET', reverse('transactions:create'))
+
+    def list(self):
+        params = {'date_from': self.context.date_from.isoformat(), 'date_to': self.context.date_to.isoformat()}
+        return self.request('GET', f"{reverse('transactions:list')}?{urlencode(params)}")
+
+    def create(self):
+        self.ensure_csrf()
+        data = self.context.transaction_data(self.random)
+        # Секрет из cookie принимается CsrfViewMiddleware и без маскирования
+        data['csrfmiddlewaretoken'] = self.cookies[settings.CSRF_COOKIE_NAME]
+        return self.request('POST', reverse('transactions:create'), urlencode(data), {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Referer': f'http://{self.host}:{self.port}/',
+        })
+
+    def api_read(self):
+        params = {'date_from': self.context.date_from.isoformat(), 'date_to': self.context.date_to.isoformat()}
+        return self.request('GET', f"{reverse('transactions:transaction-list')}?{urlencode(params)}", headers={
+            'Authorization': f'Api-Key {self.context.api_key}',
+        })
+
+    def api_write(self):
+        data = self.context.transaction_data(self.random)
+        return self.request('POST', reverse('transactions:transaction-list'), json.dumps(data), {
+            'Authorization': f'Api-Key {self.context.api_key}',
+            'Content-Type': 'application/json',
+        })
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Сценарий нагрузки.
+
+    Attributes:
+        method (str): Метод LoadClient, выполняющий запрос.
+        expected_status (int): HTTP-статус успешного ответа.
+    """
+    method: str
+    expected_status: int
+
+
+SCENARIOS = {
+    'list': Scenario('list', 200),
+    # Успешная отправка формы перенаправляет на список
+    'create': Scenario('create', 302),
+    'api_read': Scenario('api_read', 200),
+    'api_write': Scenario('api_write', 201),
+}
+
+
+def run_load(base_url, context, mix, concurrency, duration=None, requests=None, seed=None):
+    """Выполняет сценарии смеси из concurrency потоков.
+
+    Прогон заканчивается по истечении duration секунд или после requests
+    запросов суммарно (что наступит раньше).
+
+    Args:
+        base_url (str): Адрес сервера, например http://127.0.0.1:8000.
+        context (LoadContext): Данные прогона.
+        mix (dict): {сценарий: вес}.
+        concurrency (int): Количество параллельных клиентов.
+        duration (float, optional): Длительность прогона, секунд.
+        requests (int, optional): Общее количество запросов.
+        seed (int, optional): Начальное значение генераторов клиентов.
+
+    Returns:
+        tuple: (список Sample, фактическая длительность в секундах).
+    """
+    if duration is None and requests is None:
+        raise ValueError('Нужно задать длительность или количество запросов')
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = []
+    lock = threading.Lock()
+    remaining = [requests]
+    deadline = time.perf_counter() + duration if duration is not None else None
+
+    def take():
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        if requests is None:
+            return True
+        with lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def worker(index):
+        client = LoadClient(base_url, context, None if seed is None else seed + index)
+        own = []
+        try:
+            while take():
+                scenario = client.random.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    status, body = getattr(client, SCENARIOS[scenario].method)()
+                    error = classify(scenario, status, body)
+                except (OSError, http.client.HTTPException):
+                    status, error = 0, 'connection'
+                own.append(Sample(scenario, status, time.perf_counter() - started, error))
+        finally:
+            client.close()
+            with lock:
+                samples.extend(own)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples, elapsed):
+    """Сводка прогона по сценариям и в целом.
+
+    Args:
+        samples (list): Sample прогона.
+        elapsed (float): Длительность прогона, секунд.
+
+    Returns:
+        dict: {сценарий или 'total': {'requests', 'rps', 'errors', 'error_rate',
+        'error_kinds', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}}.
+    """
+    groups = {}
+    for sample in samples:
+        groups.setdefault(sample.scenario, []).append(sample)
+    groups = dict(sorted(groups.items()))
+    groups['total'] = samples
+
+    summary = {}
+    for name, group in groups.items():
+        timings = sorted(sample.elapsed * 1000 for sample in group)
+        kinds = {}
+        for sample in group:
+            if sample.error:
+                kinds[sample.error] = kinds.get(sample.error, 0) + 1
+        errors = sum(kinds.values())
+        row = {
+            'requests': len(group),
+            'rps': round(len(group) / elapsed, 1) if elapsed else 0.0,
+            'errors': errors,
+            'error_rate': round(errors / len(group), 4) if group else 0.0,
+            'error_kinds': dict(sorted(kinds.items())),
+        }
+        for percent in PERCENTILES:
+            value = percentile(timings, percent)
+            row[f'p{percent}_ms'] = round(value, 1) if value is not None else None
+        row['max_ms'] = round(timings[-1], 1) if timings else None
+        summary[name] = row
+    return summary
+
+
+def free_port(host='127.0.0.1'):
+    """Свободный TCP-порт на host."""
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class LocalServer:
+    """Сервер приложения (manage.py runserver) в отдельном процессе.
+
+    Клиенты и сервер в разных процессах не делят GIL, поэтому
+    замеряется сервер, а не генератор нагрузки. Журнал сервера пишется
+    в файл: по нему считаются ошибки блокировки SQLite, которые без DEBUG
+    не видны в ответе.
+
+    Attributes:
+        url (str): Адрес сервера.
+        log_path (str): Файл журнала (stderr) сервера.
+    """
+
+    def __init__(self, log_path, host='127.0.0.1', port=None):
+        self.host = host
+        self.port = port or free_port(host)
+        self.url = f'http://{self.host}:{self.port}'
+        self.log_path = log_path
+        self.process = None
+
+    def start(self, timeout=30):
+        """Запускает сервер и ждет, пока он начнет принимать соединения.
+
+        Raises:
+            RuntimeError: Если сервер завершился или не ответил за timeout секунд.
+        """
+        log = open(self.log_path, 'wb')
+        self.process = subprocess.Popen(
+            [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'runserver',
+             f'{self.host}:{self.port}', '--noreload', '--skip-checks'],
+            cwd=settings.BASE_DIR, stdout=log, stderr=subprocess.STDOUT,
+        )
+        log.close()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f'Сервер завершился с кодом {self.process.returncode}, см. {self.log_path}')
+            try:
+                with socket.create_connection((self.host, self.port), timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f'Сервер не ответил за {timeout} с, см. {self.log_path}')
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+    def locked_errors(self):
+        """Количество ошибок блокировки SQLite в журнале сервера.
+
+        Считается последняя строка трассировки (исключение Django), а не
+        исходное sqlite3.OperationalError, чтобы не учитывать ошибку дважды.
+        """
+        with open(self.log_path, 'rb') as stream:
+            return sum(
+                1 for line in stream
+                if line.startswith(b'django.db.utils.OperationalError')
+                and any(marker in line for marker in LOCKED_MARKERS)
+            )
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
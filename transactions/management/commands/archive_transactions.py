@@ -0,0 +1,55 @@
+"""Команда переноса транзакций закрытых периодов в архив."""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from transactions.archive import ARCHIVE_BATCH_SIZE, archive_batches, vacuum
+
+
+def months_ago(day, months):
+    """Первое число месяца, отстоящего от day на months месяцев назад."""
+    index = day.year * 12 + day.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class Command(BaseCommand):
+    """Переносит старые транзакции в ArchivedTransaction порциями и выполняет VACUUM.
+
+    По умолчанию в основной таблице остаются текущий месяц и
+    KEEP_MONTHS предыдущих. Каждая порция переносится в своей транзакции
+    БД, поэтому команду можно прервать и запустить снова.
+
+    Использование:
+        python manage.py archive_transactions [--before 2024-01-01 | --keep-months 12] \\
+            [--batch-size 500] [--limit 100000] [--no-vacuum]
+    """
+    help = 'Переносит транзакции закрытых периодов в архив'
+
+    KEEP_MONTHS = 12
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', type=date.fromisoformat,
+                            help='Перенести транзакции раньше этой даты (YYYY-MM-DD)')
+        parser.add_argument('--keep-months', type=int, default=self.KEEP_MONTHS,
+                            help='Сколько прошлых месяцев оставить в основной таблице')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='Размер порции')
+        parser.add_argument('--limit', type=int, help='Перенести не больше указанного числа строк за запуск')
+        parser.add_argument('--no-vacuum', action='store_true', help='Не выполнять VACUUM после переноса')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size должно быть положительным')
+        if options['keep_months'] < 0:
+            raise CommandError('--keep-months не может быть отрицательным')
+        cutoff = options['before'] or months_ago(timezone.localdate(), options['keep_months'])
+
+        moved = 0
+        for count in archive_batches(cutoff, options['batch_size'], options['limit']):
+            moved += count
+            self.stdout.write(f'Перенесено: {moved}')
+        self.stdout.write(self.style.SUCCESS(f'В архив перенесено транзакций раньше {cutoff}: {moved}'))
+
+        if moved and not options['no_vacuum'] and vacuum():
+            self.stdout.write('VACUUM выполнен')
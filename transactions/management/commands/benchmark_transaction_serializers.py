@@ -0,0 +1,81 @@
+"""Команда сравнения скорости сериализации списка транзакций."""
+
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
+
+from reference.models import Status, OperationType, Category, SubCategory
+from transactions.flat import flat_queryset, serialize_rows
+from transactions.models import Transaction
+from transactions.serializers import TransactionSerializer
+
+
+class Command(BaseCommand):
+    """Сравнивает TransactionSerializer и быстрый путь values() в строках в секунду.
+
+    С параметром --rows создает указанное число синтетических транзакций
+    во временной транзакции БД, которая откатывается после замера; без
+    него замеряет существующие данные.
+
+    Использование:
+        python manage.py benchmark_transaction_serializers --rows 20000 --repeat 3
+    """
+    help = 'Сравнивает скорость TransactionSerializer и values()-сериализации'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=0,
+                            help='Создать N временных транзакций для замера')
+        parser.add_argument('--repeat', type=int, default=3, help='Количество повторов замера')
+
+    def handle(self, *args, **options):
+        with db_transaction.atomic():
+            if options['rows']:
+                self._create_rows(options['rows'])
+            queryset = Transaction.objects.order_by('-date', '-created_at', '-id')
+            total = queryset.count()
+
+            timings = {
+                'TransactionSerializer (без select_related)': lambda: TransactionSerializer(
+                    queryset, many=True
+                ).data,
+                'TransactionSerializer + select_related': lambda: TransactionSerializer(
+                    queryset.select_related('status', 'operation_type', 'category', 'subcategory'), many=True
+                ).data,
+                'values() fast path': lambda: serialize_rows(flat_queryset(queryset)),
+            }
+            for name, run in timings.items():
+                best = min(self._measure(run) for _ in range(max(options['repeat'], 1)))
+                rate = total / best if best else 0
+                self.stdout.write(f'{name:45} {total:>8} строк  {best:8.3f} с  {rate:12.0f} строк/с')
+
+            db_transaction.set_rollback(True)
+
+    def _measure(self, run):
+        started = time.perf_counter()
+        run()
+        return time.perf_counter() - started
+
+    def _create_rows(self, count):
+        status, _ = Status.objects.get_or_create(name='Benchmark')
+        operation_type, _ = OperationType.objects.get_or_create(name='Benchmark')
+        category, _ = Category.objects.get_or_create(name='Benchmark', operation_type=operation_type)
+        subcategory, _ = SubCategory.objects.get_or_create(name='Benchmark', category=category)
+        start = date.today()
+        Transaction.objects.bulk_create(
+            (
+                Transaction(
+                    date=start - timedelta(days=i % 365),
+                    status=status,
+                    operation_type=operation_type,
+                    category=category,
+                    subcategory=subcategory if i % 2 else None,
+                    amount=Decimal(i % 10000) + Decimal('0.99'),
+                    comment=f'Benchmark {i}',
+                )
+                for i in range(count)
+            ),
+            batch_size=2000
+        )
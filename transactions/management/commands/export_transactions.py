@@ -0,0 +1,54 @@
+"""Команда потоковой выгрузки транзакций в CSV или NDJSON."""
+
+from django.core.management.base import BaseCommand
+from django.http import QueryDict
+
+from transactions.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, iter_export
+from transactions.filters import filter_transactions
+
+
+class Command(BaseCommand):
+    """Выгружает транзакции с теми же фильтрами, что и список транзакций.
+
+    Строки читаются из БД порциями, поэтому память не растет с объемом
+    выгрузки.
+
+    Использование:
+        python manage.py export_transactions --date-from 2024-01-01 --date-to 2024-12-31 \\
+            --format ndjson --output transactions.ndjson
+    """
+    help = 'Потоково выгружает транзакции в CSV или NDJSON'
+
+    FILTERS = (
+        'date_from', 'date_to', 'status', 'operation_type', 'category', 'subcategory',
+        'amount_min', 'amount_max',
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv', help='Формат выгрузки')
+        parser.add_argument('--output', help='Файл выгрузки (по умолчанию stdout)')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+                            help='Количество строк, читаемых из БД за раз')
+        parser.add_argument('--date-from', help='Начало диапазона дат (YYYY-MM-DD)')
+        parser.add_argument('--date-to', help='Конец диапазона дат (YYYY-MM-DD)')
+        parser.add_argument('--status', help='id статуса')
+        parser.add_argument('--operation-type', help='id типа операции')
+        parser.add_argument('--category', help='id категории')
+        parser.add_argument('--subcategory', help='id подкатегории')
+        parser.add_argument('--amount-min', help='Сумма не меньше')
+        parser.add_argument('--amount-max', help='Сумма не больше')
+
+    def handle(self, *args, **options):
+        params = QueryDict(mutable=True)
+        for name in self.FILTERS:
+            if options[name]:
+                params[name] = options[name]
+        transactions, _ = filter_transactions(params)
+
+        chunks = iter_export(transactions, options['format'], options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,67 @@
+"""Команда массового импорта транзакций из CSV/JSON."""
+
+import csv
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.importer import IMPORT_BATCH_SIZE, IMPORT_FORMATS, READERS, TransactionImporter
+
+
+class Command(BaseCommand):
+    """Импортирует транзакции из файла порциями через bulk_create.
+
+    Справочники указываются названиями (как в выгрузке export_transactions).
+    Некорректные строки пропускаются и перечисляются в отчете.
+
+    Использование:
+        python manage.py import_transactions statement.csv --batch-size 2000 --errors errors.csv
+    """
+    help = 'Импортирует транзакции из CSV, JSON или NDJSON'
+
+    MAX_PRINTED_ERRORS = 20
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл для импорта')
+        parser.add_argument('--format', choices=IMPORT_FORMATS,
+                            help='Формат файла (по умолчанию по расширению)')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help='Количество строк в одной транзакции БД')
+        parser.add_argument('--errors', help='CSV-файл для отчета об ошибках по строкам')
+        parser.add_argument('--dry-run', action='store_true', help='Только проверить файл')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if import_format == 'jsonl':
+            import_format = 'ndjson'
+        if import_format not in READERS:
+            raise CommandError(f"Не удалось определить формат файла '{path}', укажите --format")
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+
+        importer = TransactionImporter(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        try:
+            with open(path, encoding='utf-8-sig', newline='') as stream:
+                report = importer.run(READERS[import_format](stream))
+        except OSError as exc:
+            raise CommandError(str(exc)) from exc
+        except ValueError as exc:
+            raise CommandError(f'Ошибка чтения файла: {exc}') from exc
+
+        for line_num, message in report.errors[:self.MAX_PRINTED_ERRORS]:
+            self.stderr.write(f'Строка {line_num}: {message}')
+        if len(report.errors) > self.MAX_PRINTED_ERRORS:
+            self.stderr.write(f'... и еще {len(report.errors) - self.MAX_PRINTED_ERRORS} ошибок')
+
+        if options['errors']:
+            with open(options['errors'], 'w', encoding='utf-8', newline='') as output:
+                writer = csv.writer(output)
+                writer.writerow(['line', 'error'])
+                writer.writerows(report.errors)
+
+        action = 'Проверено' if options['dry_run'] else 'Импортировано'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action}: {report.imported} из {report.total}, ошибок: {len(report.errors)}, '
+            f'{report.elapsed:.2f} с ({report.rows_per_second:.0f} строк/с)'
+        ))
@@ -0,0 +1,126 @@
+"""Команда нагрузочного тестирования приложения параллельными HTTP-клиентами."""
+
+import json
+import os
+import tempfile
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.benchmarks import report_meta
+from transactions.loadtest import (
+    DEFAULT_MIX, LocalServer, cleanup_load_test, parse_mix, prepare_load_test, run_load, summarize,
+)
+
+
+def mix_argument(value):
+    try:
+        return parse_mix(value)
+    except ValueError as exc:
+        raise CommandError(str(exc)) from exc
+
+
+class Command(BaseCommand):
+    """Нагружает список, форму создания и API транзакций из многих потоков.
+
+    По умолчанию запускает manage.py runserver на свободном порту в
+    отдельном процессе; с --url нагружает уже запущенный сервер (например,
+    gunicorn с несколькими воркерами). Печатает пропускную способность,
+    p50/p95/p99 времени ответа и долю ошибок по сценариям, отдельно -
+    ошибки блокировки SQLite. Созданные транзакции удаляются в конце
+    (если не указан --keep), пользователь прогона и его API-ключ - всегда.
+    Запускайте на отдельной БД (копии или стенде), не на рабочей.
+
+    Использование:
+        python manage.py load_test --concurrency 16 --duration 30 \\
+            --mix list=4,create=1,api_read=4,api_write=1 [--url http://127.0.0.1:8000] [--output load.json]
+    """
+    help = 'Нагрузочный тест страниц и API транзакций с перцентилями времени ответа'
+
+    def add_arguments(self, parser):
+        default_mix = ','.join(f'{name}={weight}' for name, weight in DEFAULT_MIX.items())
+        parser.add_argument('--url', help='Адрес запущенного сервера; по умолчанию запускается runserver')
+        parser.add_argument('--concurrency', type=int, default=8, help='Количество параллельных клиентов')
+        parser.add_argument('--duration', type=float, default=30, help='Длительность прогона, секунд')
+        parser.add_argument('--requests', type=int, help='Общее количество запросов (вместо длительности)')
+        parser.add_argument('--mix', type=mix_argument, default=DEFAULT_MIX,
+                            help=f'Веса сценариев, по умолчанию {default_mix}')
+        parser.add_argument('--seed', type=int, default=42, help='Начальное значение генераторов клиентов')
+        parser.add_argument('--output', help='JSON-файл для результатов')
+        parser.add_argument('--keep', action='store_true', help='Не удалять созданные транзакции')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency должно быть положительным')
+        if options['requests'] is not None and options['requests'] < 1:
+            raise CommandError('--requests должно быть положительным')
+        if options['requests'] is None and options['duration'] <= 0:
+            raise CommandError('--duration должно быть положительным')
+        duration = None if options['requests'] is not None else options['duration']
+
+        try:
+            context = prepare_load_test(uuid.uuid4().hex[:8])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        server = None
+        try:
+            if options['url']:
+                base_url = options['url'].rstrip('/')
+            else:
+                fd, log_path = tempfile.mkstemp(prefix='load_test_', suffix='.log')
+                os.close(fd)
+                server = LocalServer(log_path)
+                try:
+                    server.start()
+                except RuntimeError as exc:
+                    raise CommandError(str(exc)) from exc
+                base_url = server.url
+                self.stdout.write(f'Сервер {base_url}, журнал {log_path}')
+
+            self.stdout.write(
+                f"Прогон {context.run_id}: {options['concurrency']} клиентов, "
+                + (f"{options['requests']} запросов" if duration is None else f'{duration:g} с')
+            )
+            samples, elapsed = run_load(
+                base_url, context, options['mix'], options['concurrency'],
+                duration=duration, requests=options['requests'], seed=options['seed'],
+            )
+        finally:
+            if server is not None:
+                server.stop()
+            deleted = cleanup_load_test(context, keep_transactions=options['keep'])
+
+        summary = summarize(samples, elapsed)
+        server_locked = server.locked_errors() if server is not None else None
+        self.stdout.write(f'{"сценарий":10} {"запросы":>8} {"в сек.":>8} {"ошибки":>7} '
+                          f'{"p50":>8} {"p95":>8} {"p99":>8} {"max":>8} мс')
+        for name, row in summary.items():
+            self.stdout.write(
+                f"{name:10} {row['requests']:8} {row['rps']:8.1f} {row['error_rate']:7.1%} "
+                + ' '.join(f'{row[key] if row[key] is not None else "-":>8}'
+                           for key in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms'))
+            )
+            if row['error_kinds']:
+                kinds = ', '.join(f'{kind}: {count}' for kind, count in row['error_kinds'].items())
+                self.stdout.write(f'{"":10} {kinds}')
+        if server_locked is not None:
+            self.stdout.write(f'Ошибок блокировки SQLite в журнале сервера: {server_locked}')
+        if deleted:
+            self.stdout.write(f'Удалено транзакций прогона: {deleted}')
+
+        if options['output']:
+            report = {
+                'meta': report_meta(
+                    url=options['url'],
+                    concurrency=options['concurrency'],
+                    duration=round(elapsed, 2),
+                    mix=options['mix'],
+                    seed=options['seed'],
+                ),
+                'summary': summary,
+                'server_locked_errors': server_locked,
+            }
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                json.dump(report, stream, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Результаты записаны в {options["output"]}'))
@@ -0,0 +1,21 @@
+"""Команда полной пересборки дневных агрегатов транзакций."""
+
+from django.core.management.base import BaseCommand
+
+from transactions.models import TransactionDailyAggregate
+
+
+class Command(BaseCommand):
+    """Пересчитывает TransactionDailyAggregate по всей таблице транзакций.
+
+    Нужна после массовых изменений в обход модели (QuerySet.update(),
+    прямой SQL) или для первичного заполнения на существующих данных.
+
+    Использование:
+        python manage.py rebuild_daily_aggregates
+    """
+    help = 'Пересчитывает дневные агрегаты транзакций'
+
+    def handle(self, *args, **options):
+        created = TransactionDailyAggregate.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Агрегатов создано: {created}'))
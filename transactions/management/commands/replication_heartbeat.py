@@ -0,0 +1,31 @@
+"""Команда записи heartbeat репликации в основную БД."""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from cashflow.db.replica import write_heartbeat
+
+
+class Command(BaseCommand):
+    """Пишет текущее время в ReplicationHeartbeat основной БД.
+
+    По нему ReplicaRouter определяет отставание реплики. Нужна при
+    настоящей репликации; локально heartbeat пишет sync_replica.
+
+    Использование:
+        python manage.py replication_heartbeat [--interval 1]
+    """
+    help = 'Записывает heartbeat репликации в основную БД'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float,
+                            help='Повторять запись каждые N секунд (по умолчанию - один раз)')
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            write_heartbeat()
+            if not interval:
+                break
+            time.sleep(interval)
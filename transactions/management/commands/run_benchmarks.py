@@ -0,0 +1,111 @@
+"""Команда замеров страниц и API транзакций на нескольких объемах данных."""
+
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from transactions.benchmarks import benchmark_client, benchmark_urls, build_report, compare_results, run_benchmarks
+from transactions.ledger import GENERATE_BATCH_SIZE, analyze, generate_ledger
+from transactions.models import Transaction
+
+
+def parse_sizes(value):
+    """Разбирает список объемов данных ("1000,10000")."""
+    try:
+        sizes = sorted({int(item) for item in value.split(',') if item.strip()})
+    except ValueError:
+        raise CommandError(f"Некорректный список объемов '{value}'") from None
+    if not sizes or sizes[0] < 0:
+        raise CommandError('Объемы данных должны быть неотрицательными числами')
+    return sizes
+
+
+class Command(BaseCommand):
+    """Замеряет горячие представления при нескольких объемах синтетических данных.
+
+    Данные наращиваются генератором generate_ledger до каждого объема по
+    очереди (на шаге i - с начальным значением --seed + i, чтобы шаги не
+    повторяли одни и те же строки), после чего замеряется каждый URL из
+    transactions.benchmarks. Все изменения выполняются в одной транзакции
+    БД и откатываются в конце (если не указан --keep). Результаты
+    записываются в JSON; с --compare печатается изменение медиан
+    относительно прошлого отчета.
+
+    Использование:
+        python manage.py run_benchmarks --sizes 10000,100000,1000000 --repeat 5 \\
+            --output bench.json [--compare bench-main.json] [--only api_list,list]
+    """
+    help = 'Замеряет скорость страниц и API транзакций и сохраняет результаты в JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=parse_sizes, default=[1000, 10000, 100000],
+                            help='Объемы сгенерированных транзакций через запятую')
+        parser.add_argument('--repeat', type=int, default=5, help='Количество замеров каждого URL')
+        parser.add_argument('--years', type=int, default=3, help='Глубина генерируемого журнала в годах')
+        parser.add_argument('--seed', type=int, default=42, help='Начальное значение генератора')
+        parser.add_argument('--only', help='Названия замеров через запятую')
+        parser.add_argument('--output', help='JSON-файл для результатов')
+        parser.add_argument('--compare', help='JSON-файл прошлых результатов для сравнения')
+        parser.add_argument('--keep', action='store_true', help='Не откатывать сгенерированные данные')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat должно быть положительным')
+        only = [name.strip() for name in options['only'].split(',')] if options['only'] else None
+        previous = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as stream:
+                    previous = json.load(stream)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'Не удалось прочитать {options["compare"]}: {exc}') from exc
+
+        end = timezone.localdate()
+        start = end - timedelta(days=365 * options['years'])
+        results = []
+        with db_transaction.atomic():
+            existing = Transaction.objects.count()
+            if only:
+                unknown = set(only) - set(benchmark_urls())
+                if unknown:
+                    raise CommandError(f"Неизвестные замеры: {', '.join(sorted(unknown))}")
+            client = benchmark_client()
+            generated = 0
+            try:
+                for step, size in enumerate(options['sizes']):
+                    seed = options['seed'] + step
+                    for count in generate_ledger(size - generated, start, end, seed, GENERATE_BATCH_SIZE):
+                        generated += count
+                    analyze()
+                    self.stdout.write(f'Объем {size} (+{existing} существующих)')
+                    for result in run_benchmarks(client, size, options['repeat'], only):
+                        results.append(result)
+                        self.stdout.write(
+                            f'  {result.benchmark:20} {result.status} {result.queries:>3} запр.  '
+                            f'медиана {result.median_ms:8.1f} мс  мин {result.min_ms:8.1f} мс'
+                        )
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+            if not options['keep']:
+                db_transaction.set_rollback(True)
+
+        report = build_report(
+            results,
+            sizes=options['sizes'],
+            existing_rows=existing,
+            repeat=options['repeat'],
+            years=options['years'],
+            seed=options['seed'],
+        )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                json.dump(report, stream, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Результаты записаны в {options["output"]}'))
+
+        if previous is not None:
+            self.stdout.write(f'Сравнение с {previous["meta"].get("commit") or options["compare"]}:')
+            for size, name, old, new, change in compare_results(previous, report):
+                self.stdout.write(f'  {size:>8} {name:20} {old:8.1f} -> {new:8.1f} мс  {change:+6.1f}%')
@@ -0,0 +1,75 @@
+"""Команда сводки журнала медленных SQL-запросов."""
+
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from cashflow.db.slowlog import read_entries, summarize_entries
+
+SORT_KEYS = ('total_ms', 'count', 'max_ms', 'mean_ms')
+SQL_PREVIEW = 300
+
+
+def log_files(path):
+    """Текущий файл журнала и его ротированные копии (.1, .2, ...), если они есть."""
+    path = Path(path)
+    rotated = sorted(
+        (item for item in path.parent.glob(f'{path.name}.*') if item.suffix[1:].isdigit()),
+        key=lambda item: int(item.suffix[1:]),
+    )
+    return [item for item in [path, *rotated] if item.is_file()]
+
+
+class Command(BaseCommand):
+    """Печатает самые дорогие запросы из журнала SLOW_QUERY_LOG по fingerprint.
+
+    Запросы, отличающиеся только значениями параметров, объединяются.
+    Для каждой группы выводятся количество, суммарное, среднее и
+    максимальное время, представления и места вызова в коде.
+
+    Использование:
+        python manage.py slow_query_report [--top 10] [--sort total_ms|count|max_ms|mean_ms]
+            [--view transactions:list] [--log slow_queries.log] [--json]
+    """
+    help = 'Сводка журнала медленных SQL-запросов по fingerprint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=str(settings.SLOW_QUERY_LOG), help='Файл журнала')
+        parser.add_argument('--top', type=int, default=10, help='Количество групп в сводке')
+        parser.add_argument('--sort', choices=SORT_KEYS, default='total_ms', help='Порядок групп')
+        parser.add_argument('--view', help='Только запросы указанного представления (имя URL)')
+        parser.add_argument('--json', action='store_true', help='Вывести сводку в JSON')
+
+    def handle(self, *args, **options):
+        if options['top'] < 1:
+            raise CommandError('--top должно быть положительным')
+        paths = log_files(options['log'])
+        if not paths:
+            raise CommandError(f"Журнал {options['log']} не найден")
+
+        entries = read_entries(paths)
+        if options['view']:
+            entries = (entry for entry in entries if entry.get('view') == options['view'])
+        summary = summarize_entries(entries)
+        summary.sort(key=lambda group: group[options['sort']], reverse=True)
+        summary = summary[:options['top']]
+
+        if options['json']:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            return
+        if not summary:
+            self.stdout.write('Медленных запросов нет')
+            return
+        for index, group in enumerate(summary, 1):
+            self.stdout.write(self.style.WARNING(
+                f"{index}. {group['fingerprint']}: {group['count']} раз, всего {group['total_ms']:.1f} мс, "
+                f"среднее {group['mean_ms']:.1f} мс, макс. {group['max_ms']:.1f} мс"
+            ))
+            sql = group['sql']
+            self.stdout.write(f'   {sql[:SQL_PREVIEW]}{"..." if len(sql) > SQL_PREVIEW else ""}')
+            for view, count in group['views'].items():
+                self.stdout.write(f'   представление {view}: {count}')
+            for site, count in group['frames'].items():
+                self.stdout.write(f'   вызов {site}: {count}')
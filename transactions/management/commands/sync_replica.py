@@ -0,0 +1,58 @@
+"""Команда копирования основной БД SQLite в файл реплики."""
+
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from cashflow.db.replica import (
+    PRIMARY_DATABASE_ALIAS, REPLICA_DATABASE_ALIAS, reset_lag_check, write_heartbeat,
+)
+
+
+def sync_replica():
+    """Копирует основную БД в реплику через SQLite backup API.
+
+    Копия согласована (снимок на момент начала копирования), читатели
+    реплики во время копирования не видят промежуточного состояния.
+    """
+    primary = connections[PRIMARY_DATABASE_ALIAS]
+    replica = connections[REPLICA_DATABASE_ALIAS]
+    if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+        raise CommandError('sync_replica поддерживает только SQLite')
+    if str(primary.settings_dict['NAME']) == str(replica.settings_dict['NAME']):
+        raise CommandError('Реплика указывает на тот же файл, что и основная БД')
+
+    write_heartbeat(PRIMARY_DATABASE_ALIAS)
+    primary.ensure_connection()
+    target = sqlite3.connect(replica.settings_dict['NAME'])
+    try:
+        primary.connection.backup(target)
+    finally:
+        target.close()
+    replica.close()
+    reset_lag_check()
+
+
+class Command(BaseCommand):
+    """Обновляет реплику копией основной БД - замена репликации для локальной работы.
+
+    Использование:
+        CASHFLOW_REPLICA_DB=db.replica.sqlite3 python manage.py sync_replica [--interval 5]
+    """
+    help = 'Копирует основную БД SQLite в реплику'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float,
+                            help='Повторять копирование каждые N секунд (по умолчанию - один раз)')
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            started = time.monotonic()
+            sync_replica()
+            self.stdout.write(f'Реплика обновлена за {time.monotonic() - started:.2f} с')
+            if not interval:
+                break
+            time.sleep(interval)
@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-18 20:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('reference', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Transaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(default=django.utils.timezone.now, help_text='Дата проведения финансовой операции', verbose_name='Дата операции')),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Сумма операции с точностью до копеек', max_digits=12, verbose_name='Сумма')),
+                ('comment', models.TextField(blank=True, help_text='Дополнительная информация об операции', verbose_name='Комментарий')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Дата создания записи в системе', verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Дата последнего обновления записи', verbose_name='Дата обновления')),
+                ('category', models.ForeignKey(help_text='Основная категория операции', on_delete=django.db.models.deletion.PROTECT, to='reference.category', verbose_name='Категория')),
+                ('operation_type', models.ForeignKey(help_text='Тип операции - доход или расход', on_delete=django.db.models.deletion.PROTECT, to='reference.operationtype', verbose_name='Тип операции')),
+                ('status', models.ForeignKey(help_text='Текущий статус проведения операции', on_delete=django.db.models.deletion.PROTECT, to='reference.status', verbose_name='Статус')),
+                ('subcategory', models.ForeignKey(blank=True, help_text='Дополнительная детализация категории (необязательно)', null=True, on_delete=django.db.models.deletion.PROTECT, to='reference.subcategory', verbose_name='Подкатегория')),
+            ],
+            options={
+                'verbose_name': 'Транзакция',
+                'verbose_name_plural': 'Транзакции',
+                'ordering': ['-date'],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2 on 2026-10-18 20:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference', '0001_initial'),
+        ('transactions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transaction',
+            name='category',
+            field=models.ForeignKey(db_index=False, help_text='Основная категория операции', on_delete=django.db.models.deletion.PROTECT, to='reference.category', verbose_name='Категория'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='operation_type',
+            field=models.ForeignKey(db_index=False, help_text='Тип операции - доход или расход', on_delete=django.db.models.deletion.PROTECT, to='reference.operationtype', verbose_name='Тип операции'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='status',
+            field=models.ForeignKey(db_index=False, help_text='Текущий статус проведения операции', on_delete=django.db.models.deletion.PROTECT, to='reference.status', verbose_name='Статус'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='subcategory',
+            field=models.ForeignKey(blank=True, db_index=False, help_text='Дополнительная детализация категории (необязательно)', null=True, on_delete=django.db.models.deletion.PROTECT, to='reference.subcategory', verbose_name='Подкатегория'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['date', 'created_at'], name='txn_date_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['status', 'date', 'created_at'], name='txn_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['operation_type', 'date', 'created_at'], name='txn_optype_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['category', 'date', 'created_at'], name='txn_category_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['subcategory', 'date', 'created_at'], name='txn_subcategory_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['amount'], name='txn_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['created_at'], name='txn_created_at_idx'),
+        ),
+    ]
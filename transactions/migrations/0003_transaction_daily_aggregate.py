@@ -0,0 +1,61 @@
+# Generated by Django 4.2 on 2026-10-18 20:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_aggregates(apps, schema_editor):
+    Transaction = apps.get_model('transactions', 'Transaction')
+    TransactionDailyAggregate = apps.get_model('transactions', 'TransactionDailyAggregate')
+    grouped = Transaction.objects.order_by().values(
+        'date', 'status_id', 'operation_type_id', 'category_id', 'subcategory_id'
+    ).annotate(total=models.Sum('amount'), rows=models.Count('id'))
+    TransactionDailyAggregate.objects.bulk_create(
+        (
+            TransactionDailyAggregate(total_amount=row.pop('total'), count=row.pop('rows'), **row)
+            for row in grouped.iterator(chunk_size=2000)
+        ),
+        batch_size=2000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference', '0001_initial'),
+        ('transactions', '0002_transaction_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionDailyAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата операции')),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Сумма')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество операций')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reference.category', verbose_name='Категория')),
+                ('operation_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reference.operationtype', verbose_name='Тип операции')),
+                ('status', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reference.status', verbose_name='Статус')),
+                ('subcategory', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='reference.subcategory', verbose_name='Подкатегория')),
+            ],
+            options={
+                'verbose_name': 'Дневной агрегат',
+                'verbose_name_plural': 'Дневные агрегаты',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='transactiondailyaggregate',
+            index=models.Index(fields=['date'], name='txn_daily_agg_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='transactiondailyaggregate',
+            constraint=models.UniqueConstraint(condition=models.Q(('subcategory__isnull', False)), fields=('date', 'status', 'operation_type', 'category', 'subcategory'), name='txn_daily_agg_key_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='transactiondailyaggregate',
+            constraint=models.UniqueConstraint(condition=models.Q(('subcategory__isnull', True)), fields=('date', 'status', 'operation_type', 'category'), name='txn_daily_agg_key_nosub_uniq'),
+        ),
+        migrations.RunPython(populate_aggregates, migrations.RunPython.noop),
+    ]
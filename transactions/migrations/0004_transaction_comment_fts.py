@@ -0,0 +1,62 @@
+from django.db import migrations
+
+# Внешнее содержимое: текст хранится только в transactions_transaction,
+# FTS5 хранит индекс. Триггеры поддерживают его при любой записи,
+# включая bulk_create, QuerySet.update() и прямой SQL.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE transactions_transaction_fts USING fts5(
+        comment,
+        content='transactions_transaction',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_ai AFTER INSERT ON transactions_transaction BEGIN
+        INSERT INTO transactions_transaction_fts(rowid, comment) VALUES (new.id, new.comment);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_ad AFTER DELETE ON transactions_transaction BEGIN
+        INSERT INTO transactions_transaction_fts(transactions_transaction_fts, rowid, comment)
+        VALUES ('delete', old.id, old.comment);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_au AFTER UPDATE OF comment ON transactions_transaction BEGIN
+        INSERT INTO transactions_transaction_fts(transactions_transaction_fts, rowid, comment)
+        VALUES ('delete', old.id, old.comment);
+        INSERT INTO transactions_transaction_fts(rowid, comment) VALUES (new.id, new.comment);
+    END
+    """,
+    "INSERT INTO transactions_transaction_fts(transactions_transaction_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS transactions_transaction_fts_au",
+    "DROP TRIGGER IF EXISTS transactions_transaction_fts_ad",
+    "DROP TRIGGER IF EXISTS transactions_transaction_fts_ai",
+    "DROP TABLE IF EXISTS transactions_transaction_fts",
+]
+
+
+def run_sqlite(statements):
+    """Выполняет SQL только на SQLite: на других СУБД поиск работает через icontains."""
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0003_transaction_daily_aggregate'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sqlite(CREATE_SQL), run_sqlite(DROP_SQL)),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2 on 2026-10-18 20:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference', '0002_reference_version'),
+        ('transactions', '0004_transaction_comment_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archived_before', models.DateField(blank=True, null=True, verbose_name='Граница архива')),
+            ],
+            options={
+                'verbose_name': 'Состояние архива',
+                'verbose_name_plural': 'Состояние архива',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTransaction',
+            fields=[
+                ('date', models.DateField(default=django.utils.timezone.now, help_text='Дата проведения финансовой операции', verbose_name='Дата операции')),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Сумма операции с точностью до копеек', max_digits=12, verbose_name='Сумма')),
+                ('comment', models.TextField(blank=True, help_text='Дополнительная информация об операции', verbose_name='Комментарий')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(verbose_name='Дата обновления')),
+                ('category', models.ForeignKey(db_index=False, help_text='Основная категория операции', on_delete=django.db.models.deletion.PROTECT, to='reference.category', verbose_name='Категория')),
+                ('operation_type', models.ForeignKey(db_index=False, help_text='Тип операции - доход или расход', on_delete=django.db.models.deletion.PROTECT, to='reference.operationtype', verbose_name='Тип операции')),
+                ('status', models.ForeignKey(db_index=False, help_text='Текущий статус проведения операции', on_delete=django.db.models.deletion.PROTECT, to='reference.status', verbose_name='Статус')),
+                ('subcategory', models.ForeignKey(blank=True, db_index=False, help_text='Дополнительная детализация категории (необязательно)', null=True, on_delete=django.db.models.deletion.PROTECT, to='reference.subcategory', verbose_name='Подкатегория')),
+            ],
+            options={
+                'verbose_name': 'Архивная транзакция',
+                'verbose_name_plural': 'Архивные транзакции',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedtransaction',
+            index=models.Index(fields=['date', 'created_at'], name='txn_archive_date_idx'),
+        ),
+    ]
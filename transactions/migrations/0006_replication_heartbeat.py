@@ -0,0 +1,24 @@
+# Generated by Django 4.2 on 2026-10-18 21:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0005_transaction_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReplicationHeartbeat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('written_at', models.DateTimeField(verbose_name='Время записи')),
+            ],
+            options={
+                'verbose_name': 'Heartbeat репликации',
+                'verbose_name_plural': 'Heartbeat репликации',
+            },
+        ),
+    ]
@@ -1,15 +1,221 @@
-from django.db import models
+import copy
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, models, transaction as db_transaction
+from django.db.models import Count, F, Q, Sum
 from django.utils import timezone
 
+AGGREGATE_KEY_FIELDS = ('date', 'status_id', 'operation_type_id', 'category_id', 'subcategory_id')
 
-class Transaction(models.Model):
-    """Модель финансовой транзакции.
+# Справочники для вывода транзакций: __str__ категории и подкатегории
+# обращаются к типу операции, поэтому он тоже выбирается через JOIN
+REFERENCE_RELATED = (
+    'status',
+    'operation_type',
+    'category__operation_type',
+    'subcategory__category__operation_type',
+)
+
+
+def aggregate_key(obj):
+    """Ключ дневного агрегата для транзакции.
+
+    Args:
+        obj (Transaction): Транзакция (в том числе еще не сохраненная).
+
+    Returns:
+        tuple: Дата, status_id, operation_type_id, category_id, subcategory_id.
+    """
+    day = Transaction._meta.get_field('date').to_python(obj.date)
+    return (day, obj.status_id, obj.operation_type_id, obj.category_id, obj.subcategory_id)
+
+
+def collect_deltas(transactions, sign=1, deltas=None):
+    """Группирует транзакции по ключу агрегата в изменения суммы и количества.
+
+    Args:
+        transactions (iterable): Транзакции.
+        sign (int): 1 для добавления, -1 для вычитания.
+        deltas (dict, optional): Словарь для накопления изменений.
+
+    Returns:
+        dict: {ключ: [изменение суммы, изменение количества]}.
+    """
+    if deltas is None:
+        deltas = defaultdict(lambda: [Decimal('0'), 0])
+    for obj in transactions:
+        delta = deltas[aggregate_key(obj)]
+        delta[0] += sign * Transaction._meta.get_field('amount').to_python(obj.amount)
+        delta[1] += sign
+    return deltas
+
+
+class TransactionQuerySet(models.QuerySet):
+    """QuerySet транзакций, поддерживающий дневные агрегаты при массовых операциях.
+
+    bulk_create и bulk_update не вызывают save() и сигналы, поэтому
+    изменения агрегатов применяются здесь, в той же транзакции БД.
+    Массовый update() агрегаты не обновляет - после него нужна
+    команда rebuild_daily_aggregates. Ее же нужно выполнить после
+    bulk_create(..., update_aggregates=False) - так быстрее при
+    загрузке миллионов строк с разными ключами агрегатов.
+    """
+
+    def with_references(self):
+        """Транзакции со всеми справочниками, нужными для вывода, одним запросом."""
+        return self.select_related(*REFERENCE_RELATED)
+
+    def bulk_create(self, objs, *args, update_aggregates=True, **kwargs):
+        objs = list(objs)
+        with db_transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            if update_aggregates:
+                TransactionDailyAggregate.objects.apply_deltas(collect_deltas(created))
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        with db_transaction.atomic(using=self.db):
+            old_rows = self.model.objects.filter(
+                pk__in=[obj.pk for obj in objs]
+            ).only('amount', *AGGREGATE_KEY_FIELDS)
+            deltas = collect_deltas(old_rows, sign=-1)
+            updated = super().bulk_update(objs, fields, *args, **kwargs)
+            fresh_rows = self.model.objects.filter(
+                pk__in=[obj.pk for obj in objs]
+            ).only('amount', *AGGREGATE_KEY_FIELDS)
+            TransactionDailyAggregate.objects.apply_deltas(collect_deltas(fresh_rows, deltas=deltas))
+        return updated
 
-    Хранит информацию о финансовых операциях с привязкой к справочникам:
-    - Статус операции
-    - Тип операции (доход/расход)
-    - Категория и подкатегория
-    - Сумма и дата операции
+
+LEDGER_FIELDS = (
+    'id', 'date', 'status_id', 'operation_type_id', 'category_id', 'subcategory_id',
+    'amount', 'comment', 'created_at', 'updated_at',
+)
+
+
+class LedgerRange:
+    """Транзакции журнала за диапазон дат в виде, понятном коду для QuerySet.
+
+    Обертка над LedgerManager.in_range для курсорной пагинации API
+    (order_by, filter, срез) и выгрузки (values_list, iterator). Условия
+    filter() и refine применяются к каждой таблице до UNION: после
+    объединения Django фильтровать не позволяет.
+
+    Attributes:
+        model: Transaction.
+        manager (LedgerManager): Менеджер, которым читаются строки.
+        refine (callable): Обработка набора каждой таблицы (например,
+            фильтры TransactionFilterSet) или None.
+    """
+
+    def __init__(self, manager, date_from=None, date_to=None, refine=None):
+        self.manager = manager
+        self.model = manager.model
+        self.date_from = date_from
+        self.date_to = date_to
+        self.refine = refine
+        self.conditions = ()
+        self.ordering = ()
+        self.fields = LEDGER_FIELDS
+        self.tuples = False
+
+    def _clone(self, **changes):
+        clone = copy.copy(self)
+        clone.__dict__.update(changes)
+        return clone
+
+    def filter(self, *conditions, **lookups):
+        return self._clone(conditions=(*self.conditions, *conditions, Q(**lookups)))
+
+    def order_by(self, *ordering):
+        return self._clone(ordering=ordering)
+
+    def values(self, *fields):
+        return self._clone(fields=fields, tuples=False)
+
+    def values_list(self, *fields):
+        return self._clone(fields=fields, tuples=True)
+
+    @property
+    def query(self):
+        """Запрос к текущей таблице: по нему проверяются аннотации (их нет)."""
+        return self._restrict(self.manager.get_queryset()).query
+
+    def _restrict(self, queryset):
+        if self.refine is not None:
+            queryset = self.refine(queryset)
+        return queryset.filter(*self.conditions)
+
+    def _queryset(self):
+        return self.manager.in_range(
+            self.date_from, self.date_to, self.fields, refine=self._restrict, tuples=self.tuples
+        ).order_by(*self.ordering)
+
+    def __getitem__(self, key):
+        return self._queryset()[key]
+
+    def __iter__(self):
+        return iter(self._queryset())
+
+    def iterator(self, chunk_size=None):
+        return self._queryset().iterator(chunk_size=chunk_size)
+
+
+class LedgerManager(models.Manager):
+    """Единое чтение текущих и архивных транзакций.
+
+    Архивная таблица читается, только если диапазон дат начинается
+    раньше границы архива (ArchiveState); запросы по текущим периодам
+    идут только в Transaction.
+
+    Methods:
+        in_range: Транзакции за диапазон дат из обеих таблиц.
+        rows: То же для пагинации и выгрузки (LedgerRange).
+    """
+
+    def in_range(self, date_from=None, date_to=None, fields=LEDGER_FIELDS, refine=None, tuples=False, **filters):
+        """Транзакции за диапазон дат, включая архивные при необходимости.
+
+        Args:
+            date_from (date): Начало диапазона (None - без ограничения).
+            date_to (date): Конец диапазона (None - без ограничения).
+            fields (tuple): Поля для values().
+            refine (callable): Обработка набора каждой таблицы перед values().
+            tuples (bool): Кортежи (values_list) вместо словарей.
+            **filters: Дополнительные условия filter() для обеих таблиц.
+
+        Returns:
+            QuerySet: Строки полей fields (union двух таблиц, если нужен архив).
+        """
+        def restrict(queryset):
+            if date_from is not None:
+                queryset = queryset.filter(date__gte=date_from)
+            if date_to is not None:
+                queryset = queryset.filter(date__lte=date_to)
+            if refine is not None:
+                queryset = refine(queryset)
+            queryset = queryset.filter(**filters).order_by()
+            return queryset.values_list(*fields) if tuples else queryset.values(*fields)
+
+        current = restrict(self.get_queryset())
+        if not ArchiveState.objects.db_manager(self.db).covers(date_from):
+            return current
+        archived = restrict(ArchivedTransaction.objects.using(self.db).all())
+        return current.union(archived, all=True)
+
+    def rows(self, date_from=None, date_to=None, refine=None):
+        """Транзакции за диапазон дат из обеих таблиц для пагинации и выгрузки.
+
+        Returns:
+            LedgerRange: Набор с order_by, filter, values и срезами.
+        """
+        return LedgerRange(self, date_from, date_to, refine)
+
+
+class TransactionFields(models.Model):
+    """Поля транзакции, общие для текущих и архивных транзакций.
 
     Attributes:
         date (DateField): Дата проведения операции.
@@ -31,24 +237,28 @@ class Transaction(models.Model):
     status = models.ForeignKey(
         'reference.Status',
         on_delete=models.PROTECT,
+        db_index=False,
         verbose_name="Статус",
         help_text="Текущий статус проведения операции"
     )
     operation_type = models.ForeignKey(
         'reference.OperationType',
         on_delete=models.PROTECT,
+        db_index=False,
         verbose_name="Тип операции",
         help_text="Тип операции - доход или расход"
     )
     category = models.ForeignKey(
         'reference.Category',
         on_delete=models.PROTECT,
+        db_index=False,
         verbose_name="Категория",
         help_text="Основная категория операции"
     )
     subcategory = models.ForeignKey(
         'reference.SubCategory',
         on_delete=models.PROTECT,
+        db_index=False,
         null=True,
         blank=True,
         verbose_name="Подкатегория",
@@ -76,6 +286,30 @@ class Transaction(models.Model):
         help_text="Дата последнего обновления записи"
     )
 
+    class Meta:
+        abstract = True
+
+
+class Transaction(TransactionFields):
+    """Модель финансовой транзакции.
+
+    Хранит информацию о финансовых операциях с привязкой к справочникам:
+    - Статус операции
+    - Тип операции (доход/расход)
+    - Категория и подкатегория
+    - Сумма и дата операции
+
+    Поля описаны в TransactionFields. Транзакции закрытых периодов
+    переносятся в ArchivedTransaction командой archive_transactions;
+    Transaction.ledger читает обе таблицы.
+
+    Изменения суммы и количества переносятся в TransactionDailyAggregate
+    сигналами (см. signals.py) и TransactionQuerySet для массовых операций.
+    """
+
+    objects = TransactionQuerySet.as_manager()
+    ledger = LedgerManager()
+
     class Meta:
         """Мета-настройки модели Transaction.
 
@@ -83,10 +317,24 @@ class Transaction(models.Model):
             verbose_name (str): Человекочитаемое имя в единственном числе.
             verbose_name_plural (str): Человекочитаемое имя во множественном числе.
             ordering (list): Порядок сортировки по умолчанию (по дате в обратном порядке).
+            indexes (list): Составные индексы под фильтры и сортировки списка и API.
+                Каждый фильтр по справочнику начинается с его внешнего ключа и
+                заканчивается (date, created_at), поэтому диапазон дат и сортировка
+                (-date, -created_at) обслуживаются индексом без отдельной сортировки.
+                Отдельные индексы на внешние ключи не нужны - их покрывают составные.
         """
         verbose_name = "Транзакция"
         verbose_name_plural = "Транзакции"
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date', 'created_at'], name='txn_date_created_idx'),
+            models.Index(fields=['status', 'date', 'created_at'], name='txn_status_date_idx'),
+            models.Index(fields=['operation_type', 'date', 'created_at'], name='txn_optype_date_idx'),
+            models.Index(fields=['category', 'date', 'created_at'], name='txn_category_date_idx'),
+            models.Index(fields=['subcategory', 'date', 'created_at'], name='txn_subcategory_date_idx'),
+            models.Index(fields=['amount'], name='txn_amount_idx'),
+            models.Index(fields=['created_at'], name='txn_created_at_idx'),
+        ]
 
     def __str__(self):
         """Строковое представление транзакции.
@@ -118,4 +366,290 @@ class Transaction(models.Model):
                 f"категории '{self.category}'"
             )
 
-        super().save(*args, **kwargs)
\ No newline at end of file
+        # Сохранение и обновление агрегатов в сигналах выполняются атомарно
+        with db_transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """Удаление транзакции вместе с вычитанием ее из дневного агрегата.
+
+        Returns:
+            tuple: Результат Model.delete().
+        """
+        with db_transaction.atomic(using=kwargs.get('using')):
+            return super().delete(*args, **kwargs)
+
+
+class ArchivedTransaction(TransactionFields):
+    """Транзакция закрытого периода, перенесенная из Transaction.
+
+    Сохраняет id и даты создания и изменения исходной транзакции. Дневные
+    агрегаты при переносе не меняются: отчеты по-прежнему учитывают
+    архивные транзакции.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    created_at = models.DateTimeField(verbose_name="Дата создания")
+    updated_at = models.DateTimeField(verbose_name="Дата обновления")
+
+    class Meta:
+        """Мета-настройки модели ArchivedTransaction.
+
+        Attributes:
+            indexes (list): Индекс для выборок по диапазону дат.
+        """
+        verbose_name = "Архивная транзакция"
+        verbose_name_plural = "Архивные транзакции"
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date', 'created_at'], name='txn_archive_date_idx'),
+        ]
+
+    def __str__(self):
+        """Строковое представление архивной транзакции.
+
+        Returns:
+            str: Описание транзакции в формате "Дата - Сумма (Категория)".
+        """
+        return f"{self.date} - {self.amount} руб. ({self.category})"
+
+
+class ArchiveStateManager(models.Manager):
+    """Менеджер состояния архива."""
+
+    def archived_before(self):
+        """Граница архива: транзакции раньше этой даты могут быть в архиве.
+
+        Returns:
+            date: Граница или None, если архивирования еще не было.
+        """
+        return self.filter(pk=1).values_list('archived_before', flat=True).first()
+
+    def covers(self, date_from):
+        """Нужно ли читать архив для диапазона, начинающегося с date_from."""
+        return self.hidden_before(date_from) is not None
+
+    def hidden_before(self, date_from):
+        """Граница архива, если диапазон, начинающийся с date_from, ее захватывает.
+
+        Выгрузка и список API по этой дате решают, читать ли архив через
+        Transaction.ledger; HTML-список и поиск API читают только
+        Transaction и предупреждают, что раньше нее транзакции в архиве.
+
+        Returns:
+            date: Граница архива или None.
+        """
+        boundary = self.archived_before()
+        if boundary is not None and (date_from is None or date_from < boundary):
+            return boundary
+        return None
+
+    def advance(self, cutoff):
+        """Сдвигает границу архива вперед до cutoff (назад не сдвигает)."""
+        state, _ = self.get_or_create(pk=1)
+        if state.archived_before is None or state.archived_before < cutoff:
+            state.archived_before = cutoff
+            state.save(update_fields=['archived_before'])
+
+
+class ArchiveState(models.Model):
+    """Состояние архива транзакций (единственная строка).
+
+    Attributes:
+        archived_before (DateField): Транзакции раньше этой даты могут
+            находиться в ArchivedTransaction.
+    """
+
+    archived_before = models.DateField(
+        null=True,
+        blank=True,
+        verbose_name="Граница архива"
+    )
+
+    objects = ArchiveStateManager()
+
+    class Meta:
+        verbose_name = "Состояние архива"
+        verbose_name_plural = "Состояние архива"
+
+    def __str__(self):
+        """Строковое представление состояния архива.
+
+        Returns:
+            str: Граница архива.
+        """
+        return f"Архив до {self.archived_before}"
+
+
+class TransactionDailyAggregateManager(models.Manager):
+    """Менеджер дневных агрегатов с инкрементальным обновлением и пересборкой."""
+
+    def apply_deltas(self, deltas):
+        """Применяет изменения суммы и количества к агрегатам.
+
+        Строка агрегата создается при первом попадании ключа и удаляется,
+        когда количество транзакций в ней становится нулевым.
+
+        Args:
+            deltas (dict): {ключ агрегата: [изменение суммы, изменение количества]}.
+        """
+        for key, (amount, count) in deltas.items():
+            if not amount and not count:
+                continue
+            lookup = dict(zip(AGGREGATE_KEY_FIELDS, key))
+            rows = self.filter(**lookup)
+            updated = rows.update(total_amount=F('total_amount') + amount, count=F('count') + count)
+            if not updated:
+                try:
+                    with db_transaction.atomic(using=self.db):
+                        self.create(total_amount=amount, count=count, **lookup)
+                except IntegrityError:
+                    # Строку успел создать параллельный запрос
+                    rows.update(total_amount=F('total_amount') + amount, count=F('count') + count)
+            rows.filter(count__lte=0).delete()
+
+    def rebuild(self):
+        """Пересчитывает все агрегаты заново по текущим и архивным транзакциям.
+
+        Returns:
+            int: Количество созданных строк агрегатов.
+        """
+        totals = defaultdict(lambda: [Decimal('0'), 0])
+        for model in (Transaction, ArchivedTransaction):
+            grouped = model.objects.order_by().values(*AGGREGATE_KEY_FIELDS).annotate(
+                total=Sum('amount'),
+                rows=Count('id'),
+            )
+            for row in grouped.iterator(chunk_size=2000):
+                total = totals[tuple(row[field] for field in AGGREGATE_KEY_FIELDS)]
+                total[0] += row['total']
+                total[1] += row['rows']
+
+        with db_transaction.atomic(using=self.db):
+            self.all().delete()
+            created = self.bulk_create(
+                (
+                    self.model(
+                        total_amount=amount,
+                        count=count,
+                        **dict(zip(AGGREGATE_KEY_FIELDS, key))
+                    )
+                    for key, (amount, count) in totals.items()
+                ),
+                batch_size=2000
+            )
+        return len(created)
+
+
+class TransactionDailyAggregate(models.Model):
+    """Дневной агрегат транзакций.
+
+    Одна строка на сочетание даты, статуса, типа операции, категории и
+    подкатегории. Отчеты читают эти строки вместо исходных транзакций.
+
+    Attributes:
+        date (DateField): Дата операций.
+        status (ForeignKey): Статус операций.
+        operation_type (ForeignKey): Тип операций.
+        category (ForeignKey): Категория операций.
+        subcategory (ForeignKey): Подкатегория операций (может отсутствовать).
+        total_amount (DecimalField): Сумма операций за день.
+        count (PositiveIntegerField): Количество операций за день.
+    """
+
+    date = models.DateField(verbose_name="Дата операции")
+    status = models.ForeignKey(
+        'reference.Status',
+        on_delete=models.CASCADE,
+        verbose_name="Статус"
+    )
+    operation_type = models.ForeignKey(
+        'reference.OperationType',
+        on_delete=models.CASCADE,
+        verbose_name="Тип операции"
+    )
+    category = models.ForeignKey(
+        'reference.Category',
+        on_delete=models.CASCADE,
+        verbose_name="Категория"
+    )
+    subcategory = models.ForeignKey(
+        'reference.SubCategory',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name="Подкатегория"
+    )
+    total_amount = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=0,
+        verbose_name="Сумма"
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество операций"
+    )
+
+    objects = TransactionDailyAggregateManager()
+
+    class Meta:
+        """Мета-настройки модели TransactionDailyAggregate.
+
+        Attributes:
+            constraints (list): Уникальность ключа агрегата; для строк без
+                подкатегории - отдельное частичное ограничение, т.к. NULL
+                не участвует в обычной уникальности.
+            indexes (list): Индекс для выборок по диапазону дат.
+        """
+        verbose_name = "Дневной агрегат"
+        verbose_name_plural = "Дневные агрегаты"
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'status', 'operation_type', 'category', 'subcategory'],
+                condition=Q(subcategory__isnull=False),
+                name='txn_daily_agg_key_uniq'
+            ),
+            models.UniqueConstraint(
+                fields=['date', 'status', 'operation_type', 'category'],
+                condition=Q(subcategory__isnull=True),
+                name='txn_daily_agg_key_nosub_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['date'], name='txn_daily_agg_date_idx'),
+        ]
+
+    def __str__(self):
+        """Строковое представление агрегата.
+
+        Returns:
+            str: Дата, сумма и количество операций.
+        """
+        return f"{self.date} - {self.total_amount} руб. ({self.count})"
+
+
+class ReplicationHeartbeat(models.Model):
+    """Heartbeat репликации (единственная строка, см. cashflow/db/replica.py).
+
+    Время пишется на основной БД и доходит до реплики вместе с данными;
+    разница с текущим временем на реплике - ее отставание.
+
+    Attributes:
+        written_at (DateTimeField): Время последней записи на основной БД.
+    """
+
+    written_at = models.DateTimeField(verbose_name="Время записи")
+
+    class Meta:
+        verbose_name = "Heartbeat репликации"
+        verbose_name_plural = "Heartbeat репликации"
+
+    def __str__(self):
+        """Строковое представление heartbeat.
+
+        Returns:
+            str: Время последней записи.
+        """
+        return f"Heartbeat {self.written_at}"
@@ -0,0 +1,254 @@
+"""Курсорная (keyset) пагинация списка транзакций.
+
+Страница выбирается не через OFFSET, а условием "строго после последней
+показанной записи" по упорядочиванию (-date, -created_at, -id). Благодаря
+этому стоимость N-й страницы равна стоимости первой, а память на запрос
+не зависит от ширины диапазона дат.
+
+Курсор - это непрозрачная строка (urlsafe base64) с ключом последней
+записи страницы: дата, время создания и id.
+
+Для REST API используется TransactionCursorPagination на базе
+CursorPagination из DRF: позиция в ее курсоре - порядок и значения всех
+его полей с id в конце, поэтому страницы API тоже выбираются условием по
+ключу, без OFFSET, при любом ?ordering=.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+TRANSACTION_PAGE_SIZE = 50
+TRANSACTION_API_MAX_PAGE_SIZE = 500
+KEYSET_ORDERING = ('-date', '-created_at', '-id')
+# Чем дополняется порядок API после последнего поля: ключ должен быть
+# уникальным и совпадать с индексом (индексы SQLite заканчиваются rowid = id),
+# иначе хвост ORDER BY сортируется во временном B-дереве
+TIEBREAKERS = {'date': ('created_at', 'id')}
+
+
+class InvalidCursor(ValueError):
+    """Курсор не удалось разобрать."""
+
+
+def encode_cursor(transaction):
+    """Кодирует ключ транзакции в курсор.
+
+    Args:
+        transaction (Transaction): Последняя запись текущей страницы.
+
+    Returns:
+        str: Непрозрачный курсор для запроса следующей страницы.
+    """
+    raw = f"{transaction.date.isoformat()}|{transaction.created_at.isoformat()}|{transaction.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Декодирует курсор в ключ (date, created_at, id).
+
+    Args:
+        cursor (str): Курсор, полученный от encode_cursor.
+
+    Returns:
+        tuple: Дата, время создания и id последней показанной записи.
+
+    Raises:
+        InvalidCursor: Если курсор поврежден или подделан.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        date_part, created_part, pk_part = raw.split('|')
+        return (
+            date.fromisoformat(date_part),
+            datetime.fromisoformat(created_part),
+            int(pk_part),
+        )
+    except (ValueError, TypeError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def paginate_keyset(queryset, cursor=None, page_size=TRANSACTION_PAGE_SIZE):
+    """Возвращает одну страницу транзакций после курсора.
+
+    Запрашивается page_size + 1 запись: лишняя строка лишь сообщает,
+    что следующая страница существует, и в результат не попадает.
+
+    Args:
+        queryset (QuerySet): Отфильтрованный набор транзакций.
+        cursor (str, optional): Курсор предыдущей страницы.
+        page_size (int): Количество записей на странице.
+
+    Returns:
+        tuple: Список транзакций страницы и курсор следующей страницы
+        (None, если это последняя страница).
+
+    Raises:
+        InvalidCursor: Если курсор не удалось разобрать.
+    """
+    queryset = queryset.order_by(*KEYSET_ORDERING)
+    if cursor:
+        last_date, last_created_at, last_pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(date__lt=last_date)
+            | Q(date=last_date, created_at__lt=last_created_at)
+            | Q(date=last_date, created_at=last_created_at, pk__lt=last_pk)
+        )
+
+    rows = list(queryset[:page_size + 1])
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def keyset_filter(ordering, position, reverse=False):
+    """Условие "строго после position" для упорядочивания ordering.
+
+    Args:
+        ordering (tuple): Поля упорядочивания ('-date', 'amount', ...),
+            последнее - уникальное.
+        position (list): Значения этих полей у последней показанной записи.
+        reverse (bool): Выбрать записи перед position (предыдущая страница).
+
+    Returns:
+        Q: (f1 после v1) или (f1 = v1 и f2 после v2) или ...
+    """
+    conditions = []
+    for index, order in enumerate(ordering):
+        field = order.lstrip('-')
+        lookup = 'lt' if order.startswith('-') != reverse else 'gt'
+        equal = {previous.lstrip('-'): value for previous, value in zip(ordering[:index], position)}
+        conditions.append(Q(**equal, **{f'{field}__{lookup}': position[index]}))
+    return reduce(or_, conditions)
+
+
+class TransactionCursorPagination(CursorPagination):
+    """Курсорная пагинация для TransactionViewSet.
+
+    Порядок берется из OrderingFilter представления (date, amount,
+    created_at), по умолчанию - KEYSET_ORDERING; если id в нем нет, он
+    добавляется последним (после date - created_at и id, см. TIEBREAKERS)
+    в том же направлении, что и последнее поле, чтобы ключ был уникальным,
+    а индекс покрывал весь ORDER BY. Курсор хранит порядок и значения всех
+    его полей, и следующая страница выбирается
+    keyset_filter без OFFSET - даже когда тысячи записей приходятся на
+    одну дату. Клиент может уменьшить или увеличить страницу параметром
+    page_size, но не больше TRANSACTION_API_MAX_PAGE_SIZE, поэтому
+    выгрузить всю таблицу одним запросом нельзя.
+
+    Attributes:
+        page_size (int): Размер страницы по умолчанию.
+        page_size_query_param (str): GET-параметр размера страницы.
+        max_page_size (int): Максимально допустимый размер страницы.
+        ordering (tuple): Порядок сортировки по умолчанию.
+    """
+    page_size = TRANSACTION_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = TRANSACTION_API_MAX_PAGE_SIZE
+    ordering = KEYSET_ORDERING
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if {'id', '-id', 'pk', '-pk'} & set(ordering):
+            return ordering
+        last = ordering[-1]
+        present = {order.lstrip('-') for order in ordering}
+        tiebreakers = [field for field in TIEBREAKERS.get(last.lstrip('-'), ('id',)) if field not in present]
+        return ordering + tuple(f'-{field}' if last.startswith('-') else field for field in tiebreakers)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # Как в CursorPagination, но позиция - кортеж значений всех полей
+        # порядка и фильтр по ней - keyset_filter вместо ordering[0] + OFFSET
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model, self.annotations = queryset.model, set(queryset.query.annotations)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse, position = (self.cursor.reverse, self.cursor.position) if self.cursor else (False, None)
+
+        ordering = [order[1:] if order.startswith('-') else f'-{order}' for order in self.ordering] \
+            if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(keyset_filter(self.ordering, self._decode_position(position), reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following = self._get_position_from_instance(results[-1], self.ordering) \
+            if len(results) > self.page_size else None
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = position is not None, position
+            self.has_previous, self.previous_position = following is not None, following
+        else:
+            self.has_next, self.next_position = following is not None, following
+            self.has_previous, self.previous_position = position is not None, position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        # Следующая страница начинается после последней записи текущей
+        position = self._get_position_from_instance(self.page[-1], self.ordering) if self.page \
+            else self.next_position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering) if self.page \
+            else self.previous_position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is not None and (cursor.offset or cursor.position is None):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def _get_position_from_instance(self, instance, ordering):
+        fields = [order.lstrip('-') for order in ordering]
+        if isinstance(instance, dict):
+            values = [instance[field] for field in fields]
+        else:
+            values = [getattr(instance, field) for field in fields]
+        return json.dumps({'ordering': list(ordering), 'values': values}, default=str, separators=(',', ':'))
+
+    def _decode_position(self, position):
+        """Значения полей порядка из позиции курсора, приведенные к типам полей.
+
+        Raises:
+            NotFound: Курсор поврежден, выдан для другого ?ordering= или
+                содержит значения не того типа.
+        """
+        try:
+            data = json.loads(position)
+            # Курсор от другого ?ordering= к этому порядку не подходит
+            if data['ordering'] != list(self.ordering) or len(data['values']) != len(self.ordering):
+                raise NotFound(self.invalid_cursor_message)
+            return [self._to_python(order.lstrip('-'), value) for order, value in zip(self.ordering, data['values'])]
+        except (ValueError, TypeError, KeyError, ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _to_python(self, name, value):
+        if name in self.annotations:
+            # Аннотации (search_rank) - числа
+            return float(value)
+        field = self.model._meta.pk if name == 'pk' else self.model._meta.get_field(name)
+        return field.to_python(value)
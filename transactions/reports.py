@@ -0,0 +1,73 @@
+"""Отчеты по движению денежных средств.
+
+Суммы и количества считаются в БД по таблице дневных агрегатов
+TransactionDailyAggregate, поэтому стоимость отчета зависит от числа
+дней и сочетаний справочников, а не от числа транзакций.
+"""
+
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from .models import TransactionDailyAggregate
+
+PERIODS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+GROUP_BY_FIELDS = ('status', 'operation_type', 'category', 'subcategory')
+
+
+def cashflow_summary(period=None, group_by=(), date_from=None, date_to=None):
+    """Считает суммы и количества операций с группировкой.
+
+    Args:
+        period (str, optional): Период группировки: day, week или month.
+            Если не указан, данные не разбиваются по датам.
+        group_by (iterable): Справочники для группировки из GROUP_BY_FIELDS.
+        date_from (date, optional): Начало диапазона дат (включительно).
+        date_to (date, optional): Конец диапазона дат (включительно).
+
+    Returns:
+        list: Словари вида {'period': ..., 'status': id, ..., 'total': str, 'count': int}.
+
+    Raises:
+        ValueError: Если указан неизвестный период или поле группировки.
+    """
+    if period is not None and period not in PERIODS:
+        raise ValueError(f"Неизвестный период '{period}'")
+    unknown = set(group_by) - set(GROUP_BY_FIELDS)
+    if unknown:
+        raise ValueError(f"Недопустимые поля группировки: {', '.join(sorted(unknown))}")
+
+    rows = TransactionDailyAggregate.objects.order_by()
+    if date_from:
+        rows = rows.filter(date__gte=date_from)
+    if date_to:
+        rows = rows.filter(date__lte=date_to)
+
+    keys = [f'{field}_id' for field in GROUP_BY_FIELDS if field in group_by]
+    if period:
+        rows = rows.annotate(period=PERIODS[period]('date'))
+        keys.insert(0, 'period')
+
+    totals = {'total_sum': Sum('total_amount'), 'rows_count': Sum('count')}
+    if keys:
+        rows = rows.values(*keys).annotate(**totals).order_by(*keys)
+    else:
+        # Без группировки - одна итоговая строка
+        rows = [rows.aggregate(**totals)]
+
+    result = []
+    for row in rows:
+        item = {}
+        if period:
+            item['period'] = row['period'].isoformat()
+        for field in GROUP_BY_FIELDS:
+            if field in group_by:
+                item[field] = row[f'{field}_id']
+        item['total'] = f"{row['total_sum'] or 0:.2f}"
+        item['count'] = row['rows_count'] or 0
+        result.append(item)
+    return result
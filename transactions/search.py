@@ -0,0 +1,110 @@
+"""Полнотекстовый поиск по комментариям транзакций.
+
+На SQLite комментарии индексируются таблицей FTS5
+transactions_transaction_fts (миграция 0004), которую триггеры БД
+поддерживают в актуальном состоянии. Поиск идет по индексу вместо
+LIKE '%...%' по всей таблице, каждое слово запроса ищется как префикс,
+результаты ранжируются по bm25 (меньше - релевантнее).
+
+На других СУБД API и админка используют обычный поиск по search_fields.
+
+Миграции, пересоздающие таблицу транзакций на SQLite, удаляют триггеры:
+после них нужно повторить CREATE TRIGGER из миграции 0004 и
+rebuild_search_index().
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+FTS_TABLE = 'transactions_transaction_fts'
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def fts_enabled(queryset):
+    """Проверяет, есть ли FTS5-индекс в БД набора транзакций."""
+    return connections[queryset.db].vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """Строит выражение MATCH для FTS5 из пользовательского ввода.
+
+    Спецсимволы FTS5 отбрасываются, каждое слово берется в кавычки и
+    ищется как префикс; все слова должны встретиться в комментарии.
+
+    Args:
+        text (str): Строка поиска.
+
+    Returns:
+        str: Выражение MATCH или пустая строка, если слов нет.
+    """
+    return ' '.join(f'"{word}"*' for word in _WORD_RE.findall(text))
+
+
+def search_transactions(queryset, text):
+    """Фильтрует транзакции по комментарию и добавляет релевантность.
+
+    Требует FTS5-индекса (см. fts_enabled).
+
+    Args:
+        queryset (QuerySet): Набор транзакций.
+        text (str): Строка поиска.
+
+    Returns:
+        QuerySet: Найденные транзакции с аннотацией search_rank.
+    """
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    table = queryset.model._meta.db_table
+    return queryset.filter(
+        id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+    ).annotate(
+        search_rank=RawSQL(
+            f'SELECT bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = "{table}"."id"',
+            [match],
+            output_field=FloatField()
+        )
+    )
+
+
+def rebuild_search_index(using='default'):
+    """Перестраивает FTS5-индекс по текущему содержимому таблицы транзакций."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+class TransactionSearchFilter(filters.SearchFilter):
+    """SearchFilter для API: ?search= ищет по FTS5-индексу комментариев.
+
+    Без FTS5 работает как обычный SearchFilter по search_fields.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or not fts_enabled(queryset):
+            return super().filter_queryset(request, queryset, view)
+        return search_transactions(queryset, ' '.join(terms))
+
+
+class TransactionOrderingFilter(filters.OrderingFilter):
+    """OrderingFilter, сортирующий результаты поиска по релевантности.
+
+    Если задан ?search= и не задан ?ordering=, сначала идут наиболее
+    релевантные транзакции, затем - обычная сортировка.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        params = request.query_params.get(self.ordering_param)
+        if not params and 'search_rank' in queryset.query.annotations:
+            return ('search_rank', *ordering)
+        return ordering
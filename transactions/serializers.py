@@ -1,6 +1,12 @@
 from rest_framework import serializers
 from .models import Transaction
-from reference.serializers import StatusSerializer, OperationTypeSerializer, CategorySerializer, SubCategorySerializer
+from .balance import BALANCE_MAX_POINTS, BALANCE_PERIODS
+from .reports import GROUP_BY_FIELDS, PERIODS
+from reference.cache import get_reference_data
+from reference.models import Status, OperationType, Category, SubCategory
+from reference.serializers import (
+    CachedPrimaryKeyRelatedField, StatusSerializer, OperationTypeSerializer, CategorySerializer, SubCategorySerializer
+)
 
 
 class TransactionSerializer(serializers.ModelSerializer):
@@ -39,12 +45,130 @@ class TransactionCreateSerializer(serializers.ModelSerializer):
 
     Использует базовый функционал ModelSerializer без вложенных сериализаторов,
     что позволяет принимать ID связанных объектов вместо полных вложенных структур.
+    ID справочников проверяются по кэшу справочников без запросов к БД.
 
     Meta:
         model (Transaction): Связь с моделью Transaction.
         fields (str): Все поля модели.
     """
+    status = CachedPrimaryKeyRelatedField('status_by_id', queryset=Status.objects.all())
+    operation_type = CachedPrimaryKeyRelatedField('operation_type_by_id', queryset=OperationType.objects.all())
+    category = CachedPrimaryKeyRelatedField('category_by_id', queryset=Category.objects.all())
+    subcategory = CachedPrimaryKeyRelatedField(
+        'subcategory_by_id',
+        queryset=SubCategory.objects.all(),
+        required=False,
+        allow_null=True
+    )
 
     class Meta:
         model = Transaction
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+    def validate(self, attrs):
+        """Проверяет соответствие категории типу операции и подкатегории категории.
+
+        Те же проверки, что и в Transaction.save(), но до записи: массовые
+        операции (bulk_create/bulk_update) save() не вызывают. Для
+        частичного обновления недостающие значения берутся из instance.
+
+        Raises:
+            ValidationError: Если связи между справочниками не согласованы.
+        """
+        references = get_reference_data()
+        instance = self.instance
+
+        def current(name):
+            if name in attrs:
+                return attrs[name]
+            if instance is None:
+                return None
+            return getattr(references, f'{name}_by_id').get(getattr(instance, f'{name}_id'))
+
+        operation_type = current('operation_type')
+        category = current('category')
+        subcategory = current('subcategory')
+
+        if category is not None and operation_type is not None and category.operation_type_id != operation_type.id:
+            raise serializers.ValidationError({
+                'category': f"Категория '{category}' не соответствует типу операции '{operation_type}'"
+            })
+        if subcategory is not None and category is not None and subcategory.category_id != category.id:
+            raise serializers.ValidationError({
+                'subcategory': f"Подкатегория '{subcategory}' не соответствует категории '{category}'"
+            })
+        return attrs
+
+
+class TransactionReportQuerySerializer(serializers.Serializer):
+    """Сериализатор параметров запроса отчета по движению средств.
+
+    Attributes:
+        period (ChoiceField): Период группировки (day, week, month).
+        group_by (CharField): Список справочников для группировки через запятую.
+        date_from (DateField): Начало диапазона дат.
+        date_to (DateField): Конец диапазона дат.
+    """
+    period = serializers.ChoiceField(choices=list(PERIODS), required=False)
+    group_by = serializers.CharField(required=False, allow_blank=True)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate_group_by(self, value):
+        """Разбирает список полей группировки.
+
+        Returns:
+            list: Поля группировки.
+
+        Raises:
+            ValidationError: Если указано недопустимое поле.
+        """
+        fields = [field.strip() for field in value.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in GROUP_BY_FIELDS]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Недопустимые поля: {', '.join(unknown)}. "
+                f"Доступны: {', '.join(GROUP_BY_FIELDS)}"
+            )
+        return fields
+
+
+class BalanceQuerySerializer(serializers.Serializer):
+    """Сериализатор параметров запроса остатка по статусам.
+
+    Attributes:
+        period (ChoiceField): Период прореживания (по умолчанию - по длине диапазона).
+        date_from (DateField): Начало диапазона дат.
+        date_to (DateField): Конец диапазона дат.
+        status (CharField): id статусов через запятую.
+        points (IntegerField): Максимальное число точек на статус.
+    """
+    period = serializers.ChoiceField(choices=list(BALANCE_PERIODS), required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    status = serializers.CharField(required=False, allow_blank=True)
+    points = serializers.IntegerField(required=False, min_value=2, max_value=BALANCE_MAX_POINTS)
+
+    def validate_status(self, value):
+        """Разбирает список id статусов.
+
+        Returns:
+            list: id статусов.
+
+        Raises:
+            ValidationError: Если значение не является списком чисел.
+        """
+        try:
+            return [int(item) for item in value.split(',') if item.strip()]
+        except ValueError:
+            raise serializers.ValidationError("Ожидаются id статусов через запятую")
+
+    def validate(self, attrs):
+        """Проверяет, что диапазон дат не перевернут.
+
+        Raises:
+            ValidationError: Если date_from позже date_to.
+        """
+        if attrs.get('date_from') and attrs.get('date_to') and attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError({'date_to': "Конец диапазона раньше начала"})
+        return attrs
@@ -0,0 +1,39 @@
+"""Сигналы приложения транзакций.
+
+Поддерживают TransactionDailyAggregate в актуальном состоянии при
+сохранении и удалении отдельных транзакций (в том числе при удалении
+через QuerySet.delete(), которое отправляет post_delete для каждой записи).
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import AGGREGATE_KEY_FIELDS, Transaction, TransactionDailyAggregate, collect_deltas
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_state(sender, instance, raw=False, **kwargs):
+    """Запоминает сохраненное в БД состояние транзакции перед изменением."""
+    instance._aggregate_previous = None
+    if raw or instance.pk is None:
+        return
+    instance._aggregate_previous = sender.objects.filter(pk=instance.pk).only(
+        'amount', *AGGREGATE_KEY_FIELDS
+    ).first()
+
+
+@receiver(post_save, sender=Transaction)
+def update_aggregate_on_save(sender, instance, raw=False, **kwargs):
+    """Переносит разницу между старым и новым состоянием в агрегат."""
+    if raw:
+        return
+    previous = getattr(instance, '_aggregate_previous', None)
+    deltas = collect_deltas([previous] if previous else [], sign=-1)
+    collect_deltas([instance], deltas=deltas)
+    TransactionDailyAggregate.objects.apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_aggregate_on_delete(sender, instance, **kwargs):
+    """Вычитает удаленную транзакцию из агрегата."""
+    TransactionDailyAggregate.objects.apply_deltas(collect_deltas([instance], sign=-1))
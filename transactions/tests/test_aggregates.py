@@ -0,0 +1,90 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from reference.models import Status, OperationType, Category, SubCategory
+from transactions.models import Transaction, TransactionDailyAggregate
+
+
+class TransactionDailyAggregateTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.status = Status.objects.create(name='Бизнес')
+        cls.operation_type = OperationType.objects.create(name='Списание')
+        cls.category = Category.objects.create(name='Маркетинг', operation_type=cls.operation_type)
+        cls.subcategory = SubCategory.objects.create(name='Avito', category=cls.category)
+        cls.day = date(2024, 3, 1)
+
+    def make(self, amount, **kwargs):
+        fields = {
+            'date': self.day,
+            'status': self.status,
+            'operation_type': self.operation_type,
+            'category': self.category,
+            'amount': amount,
+        }
+        fields.update(kwargs)
+        return Transaction(**fields)
+
+    def aggregates(self):
+        return sorted(
+            (
+                (row.date, row.subcategory_id, row.total_amount, row.count)
+                for row in TransactionDailyAggregate.objects.all()
+            ),
+            key=lambda row: (row[0], row[1] or 0)
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = self.aggregates()
+        TransactionDailyAggregate.objects.rebuild()
+        self.assertEqual(incremental, self.aggregates())
+
+    def test_save_update_and_delete(self):
+        first = self.make(100)
+        first.save()
+        self.make(50, subcategory=self.subcategory).save()
+        self.assertEqual(self.aggregates(), [
+            (self.day, None, Decimal('100.00'), 1),
+            (self.day, self.subcategory.id, Decimal('50.00'), 1),
+        ])
+
+        first.amount = 70
+        first.subcategory = self.subcategory
+        first.save()
+        self.assertEqual(self.aggregates(), [(self.day, self.subcategory.id, Decimal('120.00'), 2)])
+
+        first.delete()
+        self.assertEqual(self.aggregates(), [(self.day, self.subcategory.id, Decimal('50.00'), 1)])
+        self.assertMatchesRebuild()
+
+    def test_queryset_delete(self):
+        self.make(10).save()
+        self.make(20).save()
+        Transaction.objects.all().delete()
+        self.assertEqual(self.aggregates(), [])
+
+    def test_bulk_create_and_bulk_update(self):
+        created = Transaction.objects.bulk_create([self.make(10), self.make(20), self.make(30, date=date(2024, 3, 2))])
+        self.assertEqual(self.aggregates(), [
+            (self.day, None, Decimal('30.00'), 2),
+            (date(2024, 3, 2), None, Decimal('30.00'), 1),
+        ])
+
+        for obj in created:
+            obj.date = self.day
+            obj.amount = 5
+        Transaction.objects.bulk_update(created, ['date', 'amount'])
+        self.assertEqual(self.aggregates(), [(self.day, None, Decimal('15.00'), 3)])
+        self.assertMatchesRebuild()
+
+    def test_rebuild_command(self):
+        self.make(10).save()
+        TransactionDailyAggregate.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_daily_aggregates', stdout=out)
+        self.assertIn('1', out.getvalue())
+        self.assertEqual(self.aggregates(), [(self.day, None, Decimal('10.00'), 1)])
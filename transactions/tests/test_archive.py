@@ -0,0 +1,163 @@
+import json
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from reference.cache import invalidate
+from reference.models import Status, OperationType, Category
+from transactions.archive import ARCHIVED_BEFORE_HEADER, archive_batches
+from transactions.management.commands.archive_transactions import months_ago
+from transactions.models import ArchiveState, ArchivedTransaction, Transaction, TransactionDailyAggregate
+from transactions.search import search_transactions
+
+ARCHIVE_TABLE = ArchivedTransaction._meta.db_table
+
+
+class TransactionArchiveTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.status = Status.objects.create(name='Бизнес')
+        cls.operation_type = OperationType.objects.create(name='Списание')
+        cls.category = Category.objects.create(name='Маркетинг', operation_type=cls.operation_type)
+        Transaction.objects.bulk_create([
+            Transaction(
+                date=day,
+                status=cls.status,
+                operation_type=cls.operation_type,
+                category=cls.category,
+                amount=amount,
+                comment=f'Реклама {day:%m}'
+            )
+            for day, amount in (
+                (date(2023, 1, 10), 100),
+                (date(2023, 1, 20), 200),
+                (date(2023, 6, 1), 300),
+                (date(2024, 2, 1), 400),
+            )
+        ])
+
+    def aggregates(self):
+        return sorted(TransactionDailyAggregate.objects.values_list('date', 'total_amount', 'count'))
+
+    def test_moves_old_rows_and_keeps_aggregates(self):
+        before = self.aggregates()
+        original = {t.id: t.created_at for t in Transaction.objects.filter(date__lt=date(2024, 1, 1))}
+
+        moved = sum(archive_batches(date(2024, 1, 1), batch_size=2))
+
+        self.assertEqual(moved, 3)
+        self.assertEqual(list(Transaction.objects.values_list('amount', flat=True)), [400])
+        self.assertEqual({t.id: t.created_at for t in ArchivedTransaction.objects.all()}, original)
+        self.assertEqual(self.aggregates(), before)
+        self.assertEqual(ArchiveState.objects.archived_before(), date(2024, 1, 1))
+
+        TransactionDailyAggregate.objects.rebuild()
+        self.assertEqual(self.aggregates(), before)
+
+    def test_archive_is_incremental(self):
+        self.assertEqual(sum(archive_batches(date(2024, 1, 1), batch_size=1, limit=2)), 2)
+        self.assertEqual(Transaction.objects.filter(date__lt=date(2024, 1, 1)).count(), 1)
+        self.assertEqual(sum(archive_batches(date(2024, 1, 1))), 1)
+        self.assertEqual(sum(archive_batches(date(2024, 1, 1))), 0)
+
+    def test_ledger_touches_archive_only_when_needed(self):
+        list(archive_batches(date(2024, 1, 1)))
+
+        with CaptureQueriesContext(connection) as queries:
+            current = list(Transaction.ledger.in_range(date(2024, 1, 1), date(2024, 12, 31)))
+        self.assertEqual([row['amount'] for row in current], [400])
+        self.assertFalse([q for q in queries.captured_queries if ARCHIVE_TABLE in q['sql']])
+
+        rows = Transaction.ledger.in_range(date(2023, 1, 15), date(2024, 12, 31), fields=('amount',))
+        self.assertEqual(sorted(row['amount'] for row in rows), [200, 300, 400])
+
+        rows = Transaction.ledger.in_range(fields=('amount',), status=self.status)
+        self.assertEqual(len(rows), 4)
+
+    def test_archived_rows_leave_search_index(self):
+        list(archive_batches(date(2024, 1, 1)))
+        self.assertEqual(
+            list(search_transactions(Transaction.objects.all(), 'реклама').values_list('amount', flat=True)),
+            [400]
+        )
+
+    def test_command(self):
+        out = StringIO()
+        call_command('archive_transactions', before='2023-06-01', stdout=out)
+        self.assertIn('2023-06-01: 2', out.getvalue())
+        self.assertEqual(ArchivedTransaction.objects.count(), 2)
+
+    def test_views_mark_archived_ranges(self):
+        list(archive_batches(date(2024, 1, 1)))
+        self.addCleanup(invalidate)
+        self.client.force_login(User.objects.create_user(username='user', password='userpass123'))
+
+        response = self.client.get(reverse('transactions:list'), {'date_from': '2023-01-01', 'date_to': '2024-12-31'})
+        self.assertContains(response, 'id="archive-notice"')
+        self.assertContains(response, '01.01.2024')
+        self.assertEqual([t.amount for t in response.context['transactions']], [400])
+        response = self.client.get(reverse('transactions:list'), {'date_from': '2024-01-01', 'date_to': '2024-12-31'})
+        self.assertNotContains(response, 'id="archive-notice"')
+
+        # Поиск идет по FTS-индексу без архива: граница - в заголовке
+        response = self.client.get(reverse('transaction-list'), {'search': 'реклама'})
+        self.assertEqual(response[ARCHIVED_BEFORE_HEADER], '2024-01-01')
+        self.assertEqual([row['amount'] for row in response.data['results']], ['400.00'])
+
+    def test_export_and_api_read_archived_ranges(self):
+        list(archive_batches(date(2024, 1, 1)))
+        self.addCleanup(invalidate)
+        self.client.force_login(User.objects.create_user(username='user', password='userpass123'))
+
+        response = self.client.get(reverse('transactions:export'),
+                                   {'date_from': '2023-01-01', 'date_to': '2024-12-31', 'format': 'ndjson'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['amount'] for row in rows], ['400.00', '300.00', '200.00', '100.00'])
+        self.assertEqual(rows[-1]['category'], 'Маркетинг')
+        self.assertNotIn(ARCHIVED_BEFORE_HEADER, response)
+
+        url = reverse('transaction-list')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'date_from': '2024-01-01'})
+        self.assertEqual([row['amount'] for row in response.data['results']], ['400.00'])
+        self.assertFalse([q for q in queries.captured_queries if ARCHIVE_TABLE in q['sql']])
+
+        # Страницы по курсору проходят обе таблицы, фильтры применяются к каждой
+        response = self.client.get(url, {'date_from': '2023-01-01', 'amount_min': 150, 'page_size': 1})
+        amounts = [row['amount'] for row in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            amounts.extend(row['amount'] for row in response.data['results'])
+        self.assertEqual(amounts, ['400.00', '300.00', '200.00'])
+        self.assertNotIn(ARCHIVED_BEFORE_HEADER, response)
+
+        response = self.client.get(url, {'date_from': '2023-01-01', 'ordering': 'amount', 'expand': 'category'})
+        self.assertEqual([row['amount'] for row in response.data['results']], ['100.00', '200.00', '300.00', '400.00'])
+        self.assertEqual(response.data['results'][0]['category']['name'], 'Маркетинг')
+
+    def test_months_ago(self):
+        self.assertEqual(months_ago(date(2024, 3, 15), 0), date(2024, 3, 1))
+        self.assertEqual(months_ago(date(2024, 3, 15), 12), date(2023, 3, 1))
+        self.assertEqual(months_ago(date(2024, 1, 31), 1), date(2023, 12, 1))
+
+
+class ArchiveVacuumTestCase(TransactionTestCase):
+    def test_command_vacuums_after_archiving(self):
+        operation_type = OperationType.objects.create(name='Списание')
+        Transaction.objects.create(
+            date=date(2020, 1, 1),
+            status=Status.objects.create(name='Бизнес'),
+            operation_type=operation_type,
+            category=Category.objects.create(name='Маркетинг', operation_type=operation_type),
+            amount=1
+        )
+        out = StringIO()
+        call_command('archive_transactions', keep_months=1, stdout=out)
+        self.assertIn('VACUUM', out.getvalue())
+        self.assertEqual(ArchivedTransaction.objects.count(), 1)
@@ -0,0 +1,111 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from reference.models import EXPENSE, INCOME, Status, OperationType, Category
+from transactions.balance import balance_timeline, choose_period, period_buckets
+from transactions.models import Transaction
+
+
+class BalanceTimelineTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpass123')
+        cls.business = Status.objects.create(name='Бизнес')
+        cls.personal = Status.objects.create(name='Личное')
+        cls.income = OperationType.objects.create(name='Пополнение', sign=INCOME)
+        cls.expense = OperationType.objects.create(name='Списание', sign=EXPENSE)
+        cls.sales = Category.objects.create(name='Продажи', operation_type=cls.income)
+        cls.marketing = Category.objects.create(name='Маркетинг', operation_type=cls.expense)
+
+        for day, status_obj, category, amount in [
+            (date(2023, 12, 20), cls.business, cls.sales, 50),
+            (date(2024, 1, 10), cls.business, cls.sales, 1000),
+            (date(2024, 1, 20), cls.business, cls.marketing, 300),
+            (date(2024, 1, 20), cls.business, cls.marketing, 100),
+            (date(2024, 2, 5), cls.personal, cls.sales, 500),
+            (date(2024, 2, 6), cls.business, cls.marketing, 200),
+        ]:
+            Transaction.objects.create(
+                date=day,
+                status=status_obj,
+                operation_type=category.operation_type,
+                category=category,
+                amount=amount
+            )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('transaction-balance')
+
+    def test_monthly_running_balance(self):
+        response = self.client.get(self.url, {'period': 'month'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['date_from'], '2023-12-20')
+        self.assertEqual(response.data['results'], [
+            {'status': self.business.id, 'opening': '0.00', 'points': [
+                {'date': '2023-12-01', 'change': '50.00', 'balance': '50.00'},
+                {'date': '2024-01-01', 'change': '600.00', 'balance': '650.00'},
+                {'date': '2024-02-01', 'change': '-200.00', 'balance': '450.00'},
+            ]},
+            {'status': self.personal.id, 'opening': '0.00', 'points': [
+                {'date': '2024-02-01', 'change': '500.00', 'balance': '500.00'},
+            ]},
+        ])
+
+    def test_opening_balance_and_status_filter(self):
+        response = self.client.get(self.url, {
+            'date_from': '2024-01-15',
+            'date_to': '2024-02-29',
+            'status': str(self.business.id),
+            'period': 'day',
+        })
+        self.assertEqual(response.data['results'], [
+            {'status': self.business.id, 'opening': '1050.00', 'points': [
+                {'date': '2024-01-20', 'change': '-400.00', 'balance': '650.00'},
+                {'date': '2024-02-06', 'change': '-200.00', 'balance': '450.00'},
+            ]},
+        ])
+
+    def test_period_is_chosen_by_range_length(self):
+        self.assertEqual(choose_period(date(2024, 1, 1), date(2024, 1, 31), max_points=31), 'day')
+        self.assertEqual(choose_period(date(2024, 1, 1), date(2024, 12, 31), max_points=60), 'week')
+        self.assertEqual(choose_period(date(2000, 1, 1), date(2024, 12, 31), max_points=10), 'year')
+
+        response = self.client.get(self.url, {'date_from': '2024-01-01', 'date_to': '2024-02-29', 'points': 10})
+        self.assertEqual(response.data['period'], 'week')
+        self.assertLessEqual(len(response.data['results'][0]['points']), 10)
+
+    def test_period_counts_calendar_buckets(self):
+        # 62 дня, но 4 месяца (январь - апрель) и 2 квартала
+        self.assertEqual(period_buckets('month', date(2024, 1, 31), date(2024, 4, 1)), 4)
+        self.assertEqual(choose_period(date(2024, 1, 31), date(2024, 4, 1), max_points=2), 'quarter')
+        response = self.client.get(self.url, {'date_from': '2024-01-31', 'date_to': '2024-04-01', 'points': 2})
+        self.assertEqual(response.data['period'], 'quarter')
+        self.assertLessEqual(len(response.data['results'][0]['points']), 2)
+
+        # 2024-01-01 - понедельник: с воскресенья 2023-12-31 это две недели
+        self.assertEqual(period_buckets('week', date(2023, 12, 31), date(2024, 1, 1)), 2)
+
+    def test_long_range_stays_within_points(self):
+        for points in (5, 20, 60, 300):
+            response = self.client.get(self.url, {'date_from': '2020-01-01', 'date_to': '2024-12-31', 'points': points})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            period = response.data['period']
+            self.assertLessEqual(period_buckets(period, date(2020, 1, 1), date(2024, 12, 31)), points, period)
+
+        response = self.client.get(self.url, {'date_from': '2020-01-01', 'date_to': '2024-12-31', 'points': 4})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bounded_range_takes_two_queries(self):
+        with self.assertNumQueries(2):
+            balance_timeline(date(2024, 1, 1), date(2024, 12, 31))
+
+    def test_invalid_parameters(self):
+        for params in ({'period': 'decade'}, {'status': 'abc'}, {'points': 1},
+                       {'date_from': '2024-02-01', 'date_to': '2024-01-01'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
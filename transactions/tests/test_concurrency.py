@@ -0,0 +1,102 @@
+import threading
+import time
+from datetime import date
+
+from django.db import connection, connections, transaction as db_transaction
+from django.test import TransactionTestCase
+
+from reference.models import Status, OperationType, Category
+from transactions.models import Transaction
+
+
+class SQLiteConcurrencyTestCase(TransactionTestCase):
+    """Читатели и писатели в разных соединениях не блокируют друг друга."""
+
+    def setUp(self):
+        self.status = Status.objects.create(name='Бизнес')
+        self.operation_type = OperationType.objects.create(name='Списание')
+        self.category = Category.objects.create(name='Маркетинг', operation_type=self.operation_type)
+        Transaction.objects.bulk_create([self.build(i) for i in range(500)])
+
+    def build(self, amount):
+        return Transaction(
+            date=date(2024, 1, 1),
+            status=self.status,
+            operation_type=self.operation_type,
+            category=self.category,
+            amount=amount
+        )
+
+    def run_threads(self, target, count):
+        errors = []
+
+        def run(*args):
+            try:
+                target(*args)
+            except Exception as exc:  # noqa: BLE001 - ошибки потока проверяются в тесте
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+        return errors
+
+    def test_wal_enabled(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+
+    def test_writer_commits_while_reader_streams(self):
+        reading = threading.Event()
+        written = threading.Event()
+        rows = []
+
+        def reader(_):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT id FROM transactions_transaction')
+                rows.extend(cursor.fetchmany(10))
+                reading.set()
+                written.wait(timeout=10)
+                rows.extend(cursor.fetchall())
+
+        def writer(_):
+            reading.wait(timeout=10)
+            started = time.monotonic()
+            with db_transaction.atomic():
+                Transaction.objects.create(
+                    date=date(2024, 1, 2),
+                    status=self.status,
+                    operation_type=self.operation_type,
+                    category=self.category,
+                    amount=1
+                )
+            elapsed.append(time.monotonic() - started)
+            written.set()
+
+        elapsed = []
+        errors = self.run_threads(lambda i: (reader, writer)[i](i), 2)
+
+        self.assertEqual(errors, [])
+        # Коммит не ждал окончания чтения (busy timeout - 5 секунд)
+        self.assertLess(elapsed[0], 1)
+        # Читатель дочитал свой снимок без новой строки
+        self.assertEqual(len(rows), 500)
+        self.assertEqual(Transaction.objects.count(), 501)
+
+    def test_concurrent_read_then_write_transactions(self):
+        def worker(_):
+            for i in range(10):
+                with db_transaction.atomic():
+                    # Чтение перед записью: в режиме BEGIN DEFERRED повышение
+                    # блокировки сразу завершалось бы "database is locked"
+                    Transaction.objects.filter(amount__gte=i).count()
+                    self.build(i).save()
+
+        errors = self.run_threads(worker, 4)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(Transaction.objects.count(), 540)
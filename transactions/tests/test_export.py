@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from reference.models import Status, OperationType, Category, SubCategory
+from transactions.models import Transaction
+
+
+class TransactionExportTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.status = Status.objects.create(name='Бизнес')
+        cls.operation_type = OperationType.objects.create(name='Списание')
+        cls.category = Category.objects.create(name='Маркетинг', operation_type=cls.operation_type)
+        cls.subcategory = SubCategory.objects.create(name='Avito', category=cls.category)
+        cls.other_status = Status.objects.create(name='Личное')
+        for day, status_obj, amount in [
+            (date(2024, 1, 10), cls.status, 100),
+            (date(2024, 1, 20), cls.other_status, 200),
+            (date(2024, 2, 1), cls.status, 300),
+        ]:
+            Transaction.objects.create(
+                date=day,
+                status=status_obj,
+                operation_type=cls.operation_type,
+                category=cls.category,
+                subcategory=cls.subcategory,
+                amount=amount,
+                comment='Реклама, "Avito"'
+            )
+
+    def params(self, **extra):
+        return {'date_from': '2024-01-01', 'date_to': '2024-01-31', **extra}
+
+    def test_csv_export_is_streamed_and_filtered(self):
+        response = self.client.get(reverse('transactions:export'), self.params())
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('transactions_20240101_20240131.csv', response['Content-Disposition'])
+
+        body = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual([row['amount'] for row in rows], ['200.00', '100.00'])
+        self.assertEqual(rows[0]['subcategory'], 'Avito')
+        self.assertEqual(rows[0]['comment'], 'Реклама, "Avito"')
+
+    def test_ndjson_export(self):
+        response = self.client.get(reverse('transactions:export'), self.params(format='ndjson', status=self.status.id))
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual(row['date'], '2024-01-10')
+        self.assertEqual(row['status'], 'Бизнес')
+        self.assertEqual(row['amount'], '100.00')
+
+    def test_unknown_format(self):
+        response = self.client.get(reverse('transactions:export'), self.params(format='xml'))
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'export.ndjson')
+            call_command(
+                'export_transactions', format='ndjson', output=path, chunk_size=1,
+                date_from='2024-01-01', date_to='2024-12-31'
+            )
+            with open(path, encoding='utf-8') as exported:
+                amounts = [json.loads(line)['amount'] for line in exported]
+        self.assertEqual(amounts, ['300.00', '200.00', '100.00'])
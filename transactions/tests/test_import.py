@@ -0,0 +1,84 @@
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from reference.models import Status, OperationType, Category, SubCategory
+from transactions.importer import TransactionImporter, read_csv, read_json_array, read_ndjson
+from transactions.models import Transaction, TransactionDailyAggregate
+
+CSV_DATA = '''date,status,operation_type,category,subcategory,amount,comment
+2024-01-10,Бизнес,Списание,Маркетинг,Avito,100.50,Реклама
+2024-01-11,Бизнес,Списание,Маркетинг,,200,
+2024-01-12,Нет такого,Списание,Маркетинг,,300,
+2024-01-13,Бизнес,Пополнение,Маркетинг,,400,
+2024-01-14,Бизнес,Списание,Маркетинг,Avito,1.234,
+not-a-date,Бизнес,Списание,Маркетинг,,1,
+'''
+
+
+class TransactionImportTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Status.objects.create(name='Бизнес')
+        expense = OperationType.objects.create(name='Списание')
+        OperationType.objects.create(name='Пополнение')
+        marketing = Category.objects.create(name='Маркетинг', operation_type=expense)
+        SubCategory.objects.create(name='Avito', category=marketing)
+
+    def test_csv_rows_are_validated_and_bulk_created(self):
+        report = TransactionImporter(batch_size=1).run(read_csv(io.StringIO(CSV_DATA)))
+
+        self.assertEqual(report.total, 6)
+        self.assertEqual(report.imported, 2)
+        self.assertEqual([line for line, _ in report.errors], [4, 5, 6, 7])
+        self.assertIn('Нет такого', report.errors[0][1])
+        self.assertEqual(
+            sorted(Transaction.objects.values_list('amount', flat=True)),
+            [Decimal('100.50'), Decimal('200.00')]
+        )
+        self.assertEqual(TransactionDailyAggregate.objects.count(), 2)
+
+    def test_dry_run_writes_nothing(self):
+        report = TransactionImporter(dry_run=True).run(read_csv(io.StringIO(CSV_DATA)))
+        self.assertEqual(report.imported, 2)
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_json_readers(self):
+        rows = [
+            {'date': '2024-01-10', 'status': 'Бизнес', 'operation_type': 'Списание',
+             'category': 'Маркетинг', 'amount': 10},
+            {'date': '2024-01-11', 'status': 'Бизнес', 'operation_type': 'Списание',
+             'category': 'Маркетинг', 'amount': '20.00', 'comment': 'x' * 100},
+        ]
+        array = io.StringIO(json.dumps(rows, ensure_ascii=False, indent=2))
+        self.assertEqual([row for _, row in read_json_array(array)], rows)
+
+        ndjson = io.StringIO('\n'.join(json.dumps(row) for row in rows) + '\n{broken\n')
+        parsed = list(read_ndjson(ndjson))
+        self.assertEqual([row for _, row in parsed[:2]], rows)
+        self.assertIsInstance(parsed[2][1], ValueError)
+
+        with self.assertRaises(ValueError):
+            list(read_json_array(io.StringIO('{"date": "2024-01-10"}')))
+
+    def test_import_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'statement.csv')
+            errors_path = os.path.join(tmp, 'errors.csv')
+            with open(path, 'w', encoding='utf-8') as statement:
+                statement.write(CSV_DATA)
+            out, err = io.StringIO(), io.StringIO()
+            call_command('import_transactions', path, errors=errors_path, stdout=out, stderr=err)
+            with open(errors_path, encoding='utf-8') as errors_file:
+                error_lines = errors_file.read().splitlines()
+
+        self.assertIn('Импортировано: 2 из 6, ошибок: 4', out.getvalue())
+        self.assertIn('строк/с', out.getvalue())
+        self.assertIn('Строка 4', err.getvalue())
+        self.assertEqual(len(error_lines), 5)
+        self.assertEqual(Transaction.objects.count(), 2)
@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+from datetime import date
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
+from django.test import TestCase
+
+from reference.cache import invalidate
+from reference.models import EXPENSE, INCOME, Status, OperationType, Category, SubCategory
+from transactions.ledger import LedgerGenerator, generate_ledger
+from transactions.models import Transaction, TransactionDailyAggregate
+
+
+class LedgerTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ('Бизнес', 'Личное', 'Налог'):
+            Status.objects.create(name=name)
+        income = OperationType.objects.create(name='Пополнение', sign=INCOME)
+        expense = OperationType.objects.create(name='Списание', sign=EXPENSE)
+        Category.objects.create(name='Продажи', operation_type=income)
+        marketing = Category.objects.create(name='Маркетинг', operation_type=expense)
+        SubCategory.objects.create(name='Avito', category=marketing)
+        SubCategory.objects.create(name='Farpost', category=marketing)
+
+    def snapshot(self, generator, count):
+        return [
+            (t.date, t.status_id, t.category_id, t.subcategory_id, t.amount, t.comment)
+            for t in (generator.build() for _ in range(count))
+        ]
+
+    def test_generator_is_deterministic(self):
+        start, end = date(2022, 1, 1), date(2024, 12, 31)
+        first = self.snapshot(LedgerGenerator(start, end, seed=7), 50)
+        self.assertEqual(first, self.snapshot(LedgerGenerator(start, end, seed=7), 50))
+        self.assertNotEqual(first, self.snapshot(LedgerGenerator(start, end, seed=8), 50))
+
+    def test_generate_ledger(self):
+        start, end = date(2023, 1, 1), date(2023, 12, 31)
+        self.assertEqual(list(generate_ledger(250, start, end, seed=1, batch_size=100)), [100, 100, 50])
+
+        self.assertEqual(Transaction.objects.count(), 250)
+        for transaction in Transaction.objects.select_related('category', 'subcategory'):
+            self.assertTrue(start <= transaction.date <= end)
+            self.assertEqual(transaction.operation_type_id, transaction.category.operation_type_id)
+            if transaction.subcategory:
+                self.assertEqual(transaction.subcategory.category_id, transaction.category_id)
+            self.assertGreater(transaction.amount, 0)
+        self.assertEqual(
+            TransactionDailyAggregate.objects.aggregate(total=Sum('total_amount'))['total'],
+            Transaction.objects.aggregate(total=Sum('amount'))['total']
+        )
+
+    def test_command_requires_references(self):
+        # Снимок без категорий не должен пережить откат теста
+        self.addCleanup(invalidate)
+        Category.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command('generate_ledger', rows=10, stdout=StringIO())
+
+    def test_benchmarks_write_comparable_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'bench.json')
+            call_command('run_benchmarks', sizes=[20, 40], repeat=1, output=output, stdout=StringIO())
+            with open(output, encoding='utf-8') as stream:
+                report = json.load(stream)
+
+            self.assertEqual(report['meta']['sizes'], [20, 40])
+            self.assertEqual({row['size'] for row in report['results']}, {20, 40})
+            self.assertEqual({row['status'] for row in report['results']}, {200})
+            # Сгенерированные данные откатываются
+            self.assertEqual(Transaction.objects.count(), 0)
+
+            out = StringIO()
+            call_command('run_benchmarks', sizes=[20], repeat=1, only='api_list,list', compare=output, stdout=out)
+            self.assertIn('api_list', out.getvalue().split('Сравнение')[1])
+
+    def test_benchmark_steps_generate_different_rows(self):
+        self.addCleanup(invalidate)
+        call_command('run_benchmarks', sizes=[20, 40], repeat=1, only='api_list', keep=True, stdout=StringIO())
+        rows = list(Transaction.objects.order_by('id').values_list('date', 'amount', 'comment'))
+        self.assertEqual(len(rows), 40)
+        self.assertNotEqual(rows[:20], rows[20:])
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import LiveServerTestCase, SimpleTestCase
+
+from apikeys.models import ApiKey
+from reference.cache import invalidate
+from reference.models import INCOME, Status, OperationType, Category
+from transactions.loadtest import Sample, cleanup_load_test, parse_mix, percentile, prepare_load_test, summarize
+from transactions.models import Transaction
+
+
+class LoadStatisticsTestCase(SimpleTestCase):
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix('list=3, api_write=1,create=0'), {'list': 3, 'api_write': 1})
+        self.assertEqual(parse_mix('api_read'), {'api_read': 1})
+        for value in ('unknown=1', 'list=x', 'list=0', 'list=-1'):
+            with self.assertRaises(ValueError):
+                parse_mix(value)
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_summarize(self):
+        samples = [Sample('list', 200, i / 1000) for i in range(1, 10)]
+        samples += [Sample('api_write', 500, 0.5, 'sqlite_locked'), Sample('api_write', 201, 0.1)]
+        summary = summarize(samples, elapsed=2)
+
+        self.assertEqual(list(summary), ['api_write', 'list', 'total'])
+        self.assertEqual(summary['list']['p50_ms'], 5.0)
+        self.assertEqual(summary['list']['errors'], 0)
+        self.assertEqual(summary['api_write']['error_kinds'], {'sqlite_locked': 1})
+        self.assertEqual(summary['api_write']['error_rate'], 0.5)
+        self.assertEqual(summary['total']['requests'], 11)
+        self.assertEqual(summary['total']['rps'], 5.5)
+        self.assertEqual(summary['total']['max_ms'], 500.0)
+
+
+class LoadTestCommandTestCase(LiveServerTestCase):
+    def setUp(self):
+        self.addCleanup(invalidate)
+        Status.objects.create(name='Бизнес')
+        income = OperationType.objects.create(name='Пополнение', sign=INCOME)
+        Category.objects.create(name='Продажи', operation_type=income)
+        invalidate()
+
+    def test_all_scenarios_succeed_and_are_cleaned_up(self):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        call_command(
+            'load_test', url=self.live_server_url, requests=24, concurrency=3,
+            mix=parse_mix('list=1,create=1,api_read=1,api_write=1'), output=path, stdout=StringIO()
+        )
+
+        with open(path, encoding='utf-8') as stream:
+            summary = json.load(stream)['summary']
+        self.assertEqual(summary['total']['requests'], 24)
+        self.assertEqual(summary['total']['errors'], 0, summary)
+        self.assertEqual(set(summary) - {'total'}, {'list', 'create', 'api_read', 'api_write'})
+        # Транзакции, API-ключ и пользователь прогона удалены
+        self.assertFalse(Transaction.objects.exists())
+        self.assertFalse(ApiKey.objects.exists())
+        self.assertFalse(User.objects.exists())
+
+    def test_keep_leaves_transactions(self):
+        call_command(
+            'load_test', url=self.live_server_url, requests=4, concurrency=1,
+            mix=parse_mix('api_write=1'), keep=True, stdout=StringIO()
+        )
+        self.assertEqual(Transaction.objects.count(), 4)
+        self.assertFalse(User.objects.exists())
+
+    def test_run_user_is_not_staff(self):
+        context = prepare_load_test('abc')
+        user = User.objects.get()
+        self.assertEqual(user.username, context.username)
+        self.assertFalse(user.is_staff or user.is_superuser or user.has_usable_password())
+        cleanup_load_test(context)
+        self.assertFalse(User.objects.exists())
+
+    def test_requires_references(self):
+        Category.objects.all().delete()
+        invalidate()
+        with self.assertRaises(CommandError):
+            call_command('load_test', url=self.live_server_url, requests=1, stdout=StringIO())
@@ -0,0 +1,148 @@
+import multiprocessing
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from datetime import date
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from cashflow.metrics import MetricsRegistry, collect, registry, render_metrics, statement_kind
+from reference.cache import invalidate
+from reference.models import Status, OperationType, Category
+from transactions.models import Transaction
+
+
+def _flush_from_process(path, count):
+    with override_settings(METRICS_DB=path):
+        child = MetricsRegistry()
+        for _ in range(count):
+            child.inc('cashflow_http_requests_total', {'view': 'transactions:list', 'method': 'GET', 'status': '200'})
+            child.observe('cashflow_http_request_duration_seconds', {'view': 'transactions:list', 'method': 'GET'},
+                          0.02, (0.01, 0.1))
+        child.flush()
+
+
+class MetricsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='user', password='userpass123')
+        status = Status.objects.create(name='Бизнес')
+        operation_type = OperationType.objects.create(name='Списание')
+        category = Category.objects.create(name='Маркетинг', operation_type=operation_type)
+        Transaction.objects.create(date=date(2024, 1, 10), status=status, operation_type=operation_type,
+                                   category=category, amount=100)
+
+    def setUp(self):
+        self.addCleanup(invalidate)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'metrics.sqlite3'
+        # Приращения других тестов не должны попасть во временную базу
+        registry.pending.clear()
+        settings = override_settings(METRICS_DB=self.path, METRICS_FLUSH_INTERVAL=0.05)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def metrics(self, **extra):
+        response = self.client.get(reverse('metrics'), **extra)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_request_latency_queries_and_cache(self):
+        self.client.force_login(self.user)
+        url = reverse('transactions:list') + '?date_from=2024-01-01&date_to=2024-01-31'
+        for _ in range(2):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        text = self.metrics()
+        self.assertIn('cashflow_http_requests_total{method="GET",status="200",view="transactions:list"} 2', text)
+        self.assertIn('# TYPE cashflow_http_request_duration_seconds histogram', text)
+        self.assertIn(
+            'cashflow_http_request_duration_seconds_bucket{le="+Inf",method="GET",view="transactions:list"} 2', text
+        )
+        self.assertIn('cashflow_http_request_duration_seconds_count{method="GET",view="transactions:list"} 2', text)
+        self.assertRegex(
+            text, r'cashflow_db_query_duration_seconds_count'
+                  r'\{alias="default",statement="SELECT",view="transactions:list"\} \d+'
+        )
+        self.assertNotIn('statement="INSERT",view="transactions:list"', text)
+        self.assertIn('cashflow_db_queries_per_request_count{view="transactions:list"} 2', text)
+        self.assertRegex(text, r'cashflow_cache_requests_total\{cache="reference",result="hit"\} \d+')
+
+    def test_statement_kind(self):
+        self.assertEqual(statement_kind('SELECT 1'), 'SELECT')
+        self.assertEqual(statement_kind('  with t AS (SELECT 1) SELECT * FROM t'), 'SELECT')
+        self.assertEqual(statement_kind('INSERT INTO t VALUES (1)'), 'INSERT')
+        self.assertEqual(statement_kind('SAVEPOINT "s1"'), 'OTHER')
+        self.assertEqual(statement_kind(''), 'OTHER')
+
+    def test_buckets_are_cumulative_and_ordered(self):
+        observer = MetricsRegistry()
+        for value in (0.003, 0.2, 7):
+            observer.observe('cashflow_http_request_duration_seconds', {'view': 'v', 'method': 'GET'},
+                             value, (0.005, 0.5, 10))
+        observer.flush()
+
+        lines = [line for line in render_metrics(collect()).splitlines()
+                 if line.startswith('cashflow_http_request_duration_seconds')]
+        self.assertEqual(lines, [
+            'cashflow_http_request_duration_seconds_bucket{le="0.005",method="GET",view="v"} 1',
+            'cashflow_http_request_duration_seconds_bucket{le="0.5",method="GET",view="v"} 2',
+            'cashflow_http_request_duration_seconds_bucket{le="10",method="GET",view="v"} 3',
+            'cashflow_http_request_duration_seconds_bucket{le="+Inf",method="GET",view="v"} 3',
+            'cashflow_http_request_duration_seconds_sum{method="GET",view="v"} 7.203',
+            'cashflow_http_request_duration_seconds_count{method="GET",view="v"} 3',
+        ])
+
+    def test_processes_are_aggregated(self):
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=_flush_from_process, args=(self.path, 250)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=30)
+            self.assertEqual(process.exitcode, 0)
+
+        text = render_metrics(collect())
+        self.assertIn('cashflow_http_requests_total{method="GET",status="200",view="transactions:list"} 1000', text)
+        self.assertIn(
+            'cashflow_http_request_duration_seconds_bucket{le="0.1",method="GET",view="transactions:list"} 1000', text
+        )
+        self.assertIn(
+            'cashflow_http_request_duration_seconds_bucket{le="0.01",method="GET",view="transactions:list"} 0', text
+        )
+
+    def test_flushed_in_background(self):
+        self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.5')
+
+        # Без обращения к /metrics: приращения записывает поток сброса
+        deadline = time.monotonic() + 10
+        rows = []
+        while not rows and time.monotonic() < deadline:
+            time.sleep(0.05)
+            try:
+                with closing(sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)) as db:
+                    rows = db.execute(
+                        "SELECT value FROM metric_samples WHERE name = 'cashflow_http_requests_total'"
+                    ).fetchall()
+            except sqlite3.OperationalError:
+                # Файла или таблицы еще нет: поток сброса не успел их создать
+                continue
+        self.assertEqual(rows, [(1.0,)])
+
+    def test_only_local_addresses(self):
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.5')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_required_when_configured(self):
+        # За прокси адрес клиента - адрес прокси, поэтому при токене адрес не учитывается
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 404)
+        self.metrics(HTTP_AUTHORIZATION='Bearer secret', REMOTE_ADDR='10.0.0.5')
@@ -0,0 +1,101 @@
+import cProfile
+import json
+import pstats
+import tempfile
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from cashflow.profiling import REPORT_HEADER, list_reports
+from reference.cache import invalidate
+from reference.models import Status, OperationType, Category
+from transactions.models import Transaction
+
+
+class ProfilingTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        cls.user = User.objects.create_user(username='user', password='userpass123')
+        status = Status.objects.create(name='Бизнес')
+        operation_type = OperationType.objects.create(name='Списание')
+        category = Category.objects.create(name='Маркетинг', operation_type=operation_type)
+        Transaction.objects.bulk_create([
+            Transaction(date=date(2024, 1, 10), status=status, operation_type=operation_type,
+                        category=category, amount=i + 1)
+            for i in range(5)
+        ])
+
+    def setUp(self):
+        self.addCleanup(invalidate)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings = override_settings(PROFILING_DIR=self.directory, PROFILING_SAMPLE_RATE=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.url = reverse('transactions:list') + '?date_from=2024-01-01&date_to=2024-01-31'
+
+    def test_staff_header_profiles_request(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, HTTP_X_PROFILE='1')
+
+        name = response[REPORT_HEADER]
+        stats = pstats.Stats(str(self.directory / f'{name}.prof'))
+        self.assertGreater(stats.total_calls, 0)
+        with open(self.directory / f'{name}.json', encoding='utf-8') as stream:
+            summary = json.load(stream)
+        self.assertEqual(summary['view_name'], 'transactions:list')
+        self.assertEqual(summary['trigger'], 'header')
+        self.assertEqual(summary['status'], 200)
+        self.assertGreater(summary['sql']['queries'], 0)
+        self.assertEqual(len(summary['sql']['slowest']), min(summary['sql']['queries'], 20))
+        self.assertIn('transactions_transaction', ' '.join(q['sql'] for q in summary['sql']['slowest']))
+        self.assertGreater(summary['template_ms'], 0)
+        self.assertLessEqual(summary['template_ms'], summary['total_ms'])
+        self.assertTrue(summary['functions'])
+
+    def test_request_served_when_other_profiler_is_active(self):
+        self.client.force_login(self.staff)
+        error = ValueError('Another profiling tool is already active')
+        with patch.object(cProfile.Profile, 'enable', side_effect=error), \
+                self.assertLogs('cashflow.profiling', 'WARNING'):
+            response = self.client.get(self.url, HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(REPORT_HEADER, response)
+        self.assertEqual(list_reports(), [])
+
+    def test_header_ignored_for_non_staff_and_without_header(self):
+        self.client.force_login(self.user)
+        self.assertNotIn(REPORT_HEADER, self.client.get(self.url, HTTP_X_PROFILE='1'))
+        self.client.force_login(self.staff)
+        self.assertNotIn(REPORT_HEADER, self.client.get(self.url))
+        self.assertEqual(list_reports(), [])
+
+    def test_sampling_and_retention(self):
+        with override_settings(PROFILING_SAMPLE_RATE=1, PROFILING_MAX_REPORTS=2):
+            names = [self.client.get(self.url)[REPORT_HEADER] for _ in range(3)]
+
+        self.assertEqual([report['name'] for report in list_reports()], names[:0:-1])
+        self.assertEqual(len(list(self.directory.glob('*.prof'))), 2)
+        self.assertEqual(list_reports()[0]['trigger'], 'sample')
+
+    def test_admin_page_lists_and_downloads_reports(self):
+        self.client.force_login(self.staff)
+        name = self.client.get(self.url, HTTP_X_PROFILE='1')[REPORT_HEADER]
+
+        response = self.client.get(reverse('profiling_reports'))
+        self.assertContains(response, 'transactions:list')
+        self.assertContains(response, reverse('profiling_report_download', args=[name, 'prof']))
+
+        response = self.client.get(reverse('profiling_report_download', args=[name, 'json']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(b''.join(response.streaming_content))['view_name'], 'transactions:list')
+        self.assertEqual(self.client.get('/admin/profiles/missing.prof').status_code, 404)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('profiling_reports')).status_code, 302)
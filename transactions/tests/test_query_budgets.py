@@ -0,0 +1,101 @@
+from datetime import date
+from urllib.parse import urlencode
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cashflow.db.budget import QueryBudgetExceeded, QueryBudgetTestMixin
+from reference.models import Status, OperationType, Category, SubCategory
+from transactions.models import Transaction
+
+
+class QueryBudgetTestCase(QueryBudgetTestMixin, TestCase):
+    """Число запросов страниц не растет с числом строк и справочников."""
+
+    rows = 40
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        status = Status.objects.create(name='Бизнес')
+        transactions = []
+        # Свои справочники у каждой строки: любое обращение к ним по строке даст N+1
+        for i in range(cls.rows):
+            operation_type = OperationType.objects.create(name=f'Тип {i}')
+            category = Category.objects.create(name=f'Категория {i}', operation_type=operation_type)
+            subcategory = SubCategory.objects.create(name=f'Подкатегория {i}', category=category)
+            transactions.append(Transaction(
+                date=date.today(),
+                status=status,
+                operation_type=operation_type,
+                category=category,
+                subcategory=subcategory,
+                amount=i + 1
+            ))
+        Transaction.objects.bulk_create(transactions)
+        cls.transaction = Transaction.objects.first()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.period = {'date_from': date.today().isoformat(), 'date_to': date.today().isoformat()}
+
+    def test_pages_within_budget(self):
+        pk = self.transaction.pk
+        urls = [
+            f"{reverse('transactions:list')}?{urlencode(self.period)}",
+            f"{reverse('transactions:list_rows')}?{urlencode(self.period)}",
+            reverse('transactions:create'),
+            reverse('transactions:update', args=[pk]),
+            reverse('transactions:delete', args=[pk]),
+            reverse('transactions:transaction-list'),
+            f"{reverse('transactions:transaction-list')}?status={self.transaction.status_id}"
+            f"&category={self.transaction.category_id}&subcategory={self.transaction.subcategory_id}"
+            f"&operation_type={self.transaction.operation_type_id}",
+            reverse('transactions:transaction-detail', args=[pk]),
+            reverse('transactions:transaction-report'),
+            reverse('transactions:transaction-balance'),
+            reverse('reference:index'),
+            reverse('reference:tree'),
+            reverse('admin:transactions_transaction_changelist'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertWithinQueryBudget(response)
+
+    def test_reference_filters_do_not_query_references(self):
+        filters = {'status': self.transaction.status_id, 'operation_type': self.transaction.operation_type_id,
+                   'category': self.transaction.category_id, 'subcategory': self.transaction.subcategory_id}
+        response = self.client.get(reverse('transactions:transaction-list'), filters)
+        self.assertEqual(len(response.data['results']), 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('transactions:transaction-list'), filters)
+        self.assertFalse([q['sql'] for q in queries.captured_queries if 'FROM "reference_' in q['sql']])
+
+    def test_list_renders_all_rows_without_extra_queries(self):
+        response = self.client.get(reverse('transactions:list'), self.period)
+        self.assertContains(response, f'<small>Подкатегория {self.rows - 1} (Категория {self.rows - 1} (Тип {self.rows - 1}))</small>')
+        self.assertLessEqual(response.wsgi_request.query_usage.queries, 8)
+
+    @override_settings(QUERY_BUDGETS={'transactions:list': {'queries': 1}}, QUERY_BUDGET_STRICT=False)
+    def test_exceeded_budget_logs_warning(self):
+        with self.assertLogs('cashflow.querybudget', 'WARNING') as logs:
+            response = self.client.get(reverse('transactions:list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('transactions:list', logs.output[0])
+
+    @override_settings(QUERY_BUDGETS={'transactions:list': {'queries': 1}}, QUERY_BUDGET_STRICT=True)
+    def test_exceeded_budget_fails_in_strict_mode(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('transactions:list'))
+
+    @override_settings(QUERY_BUDGETS={'transactions:list': {'queries': 1}}, QUERY_BUDGET_STRICT=True)
+    def test_budget_checks_only_listed_methods(self):
+        # По умолчанию бюджет относится только к чтению
+        response = self.client.post(reverse('transactions:list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.wsgi_request.query_usage.queries, 1)
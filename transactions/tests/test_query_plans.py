@@ -0,0 +1,138 @@
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from reference.cache import invalidate
+from reference.models import Status, OperationType, Category
+from transactions.models import Transaction
+from transactions.pagination import KEYSET_ORDERING, TransactionCursorPagination
+from transactions.filters import TransactionFilterSet, filter_transactions
+from transactions.views_api import TransactionViewSet
+
+TABLE = Transaction._meta.db_table
+
+
+def explain(queryset):
+    """Возвращает строки EXPLAIN QUERY PLAN для queryset."""
+    sql, params = queryset.query.get_compiler(connection=connection).as_sql()
+    return explain_sql(sql, params)
+
+
+def explain_sql(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class TransactionQueryPlanTestCase(TestCase):
+    """Горячие запросы списка и API не должны сканировать таблицу целиком."""
+
+    def assertUsesIndex(self, queryset):
+        plan = explain(queryset)
+        table_steps = [step for step in plan if f' {TABLE}' in step]
+        self.assertTrue(table_steps, plan)
+        for step in table_steps:
+            self.assertIn('INDEX', step, f'Полный скан таблицы: {plan}')
+        self.assertFalse(
+            any('TEMP B-TREE' in step for step in plan),
+            f'Сортировка без индекса: {plan}'
+        )
+
+    def assertPlanUsesIndex(self, plan):
+        table_steps = [step for step in plan if f' {TABLE}' in step]
+        self.assertTrue(table_steps, plan)
+        for step in table_steps:
+            self.assertIn('INDEX', step, f'Полный скан таблицы: {plan}')
+        self.assertFalse(any('TEMP B-TREE' in step for step in plan), f'Сортировка без индекса: {plan}')
+
+    def assertSearchesIndex(self, queryset, index):
+        """Таблица читается поиском по указанному индексу.
+
+        Для диапазона сумм и списков значений допускается сортировка
+        найденных строк во временном B-дереве.
+        """
+        plan = explain(queryset)
+        table_steps = [step for step in plan if f' {TABLE} ' in step]
+        self.assertEqual(len(table_steps), 1, plan)
+        self.assertTrue(table_steps[0].startswith(f'SEARCH {TABLE} USING INDEX {index} '), plan)
+
+    def api_queryset(self, **params):
+        query = QueryDict(mutable=True)
+        query.update(params)
+        filterset = TransactionFilterSet(query, queryset=Transaction.objects.all())
+        self.assertTrue(filterset.is_valid(), filterset.errors)
+        return filterset.qs.order_by(*KEYSET_ORDERING)[:51]
+
+    def list_queryset(self, **params):
+        query = QueryDict(mutable=True)
+        query.update({'date_from': '2024-01-01', 'date_to': '2024-12-31', **params})
+        queryset, _ = filter_transactions(query)
+        return queryset.order_by(*KEYSET_ORDERING)[:51]
+
+    def test_list_date_range(self):
+        self.assertUsesIndex(self.list_queryset())
+
+    def test_list_filtered_by_reference(self):
+        for param in ('status', 'operation_type', 'category', 'subcategory'):
+            with self.subTest(param=param):
+                self.assertUsesIndex(self.list_queryset(**{param: '1'}))
+
+    def api_page_sql(self, ordering, cursor=None):
+        """SQL, которым TransactionCursorPagination выбирает страницу API."""
+        params = {'ordering': ordering, 'page_size': 1, **({'cursor': cursor} if cursor else {})}
+        request = APIRequestFactory().get('/api/transactions/', params)
+        force_authenticate(request, self.user)
+        view = TransactionViewSet(action='list', format_kwarg=None, kwargs={})
+        view.request = Request(request)
+        paginator = TransactionCursorPagination()
+        with CaptureQueriesContext(connection) as queries:
+            paginator.paginate_queryset(view.filter_queryset(view.get_queryset()), view.request, view)
+        sql = [query['sql'] for query in queries.captured_queries if f'FROM "{TABLE}"' in query['sql']]
+        self.assertEqual(len(sql), 1, sql)
+        return sql[0], paginator.get_next_link()
+
+    def test_api_orderings(self):
+        self.user = User.objects.create_user(username='user', password='userpass123')
+        self.addCleanup(invalidate)
+        status = Status.objects.create(name='Бизнес')
+        operation_type = OperationType.objects.create(name='Списание')
+        category = Category.objects.create(name='Маркетинг', operation_type=operation_type)
+        for amount in (100, 200, 300):
+            Transaction.objects.create(date=date(2024, 1, 10), status=status, operation_type=operation_type,
+                                       category=category, amount=amount)
+
+        for ordering in ('date', '-date', 'amount', '-amount', 'created_at', '-created_at'):
+            with self.subTest(ordering=ordering):
+                sql, next_link = self.api_page_sql(ordering)
+                self.assertPlanUsesIndex(explain_sql(sql))
+                # Вторая страница - с условием по ключу из курсора
+                sql, _ = self.api_page_sql(ordering, parse_qs(urlsplit(next_link).query)['cursor'][0])
+                self.assertIn('WHERE', sql)
+                self.assertNotIn('OFFSET', sql)
+                self.assertPlanUsesIndex(explain_sql(sql))
+
+    def test_api_exact_date_filter(self):
+        queryset = Transaction.objects.filter(date=date(2024, 1, 1)).order_by(*KEYSET_ORDERING)
+        self.assertUsesIndex(queryset[:51])
+
+    def test_api_filterset_ranges(self):
+        self.assertUsesIndex(self.api_queryset(date_from='2024-01-01', date_to='2024-01-31'))
+        self.assertSearchesIndex(self.api_queryset(amount_min='100', amount_max='200'), 'txn_amount_idx')
+
+    def test_api_filterset_multi_value(self):
+        self.assertSearchesIndex(self.api_queryset(category__in='1,2,3'), 'txn_category_date_idx')
+        self.assertSearchesIndex(self.api_queryset(status__in='1,2'), 'txn_status_date_idx')
+
+    def test_list_multi_value_filters(self):
+        self.assertSearchesIndex(self.list_queryset(category__in='1,2'), 'txn_category_date_idx')
+        self.assertSearchesIndex(self.list_queryset(status__in='1,2'), 'txn_status_date_idx')
+
+    def test_list_amount_range_keeps_index(self):
+        self.assertUsesIndex(self.list_queryset(amount_min='100', amount_max='200'))
@@ -0,0 +1,118 @@
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cashflow.db.replica import PIN_COOKIE, reset_lag_check
+from reference.models import Status, OperationType, Category
+from transactions.models import ReplicationHeartbeat, Transaction
+
+
+@override_settings(REPLICA_ENABLED=True, REPLICA_LAG_CHECK_INTERVAL=0)
+class ReplicaRoutingTestCase(TransactionTestCase):
+    """Чтения списков идут на реплику - отдельный файл SQLite, обновляемый sync_replica."""
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        replica = connections['replica']
+        replica.close()
+        original_name = replica.settings_dict['NAME']
+        directory = tempfile.TemporaryDirectory()
+        replica.settings_dict['NAME'] = str(Path(directory.name) / 'replica.sqlite3')
+
+        def restore():
+            replica.close()
+            replica.settings_dict['NAME'] = original_name
+            directory.cleanup()
+            reset_lag_check()
+
+        self.addCleanup(restore)
+        reset_lag_check()
+
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='reader', password='readerpass123'))
+        self.status = Status.objects.create(name='Бизнес')
+        self.operation_type = OperationType.objects.create(name='Списание')
+        self.category = Category.objects.create(name='Маркетинг', operation_type=self.operation_type)
+        self.create(100)
+
+    def create(self, amount):
+        return Transaction.objects.create(
+            date=date.today(),
+            status=self.status,
+            operation_type=self.operation_type,
+            category=self.category,
+            amount=amount
+        )
+
+    def sync(self):
+        call_command('sync_replica', stdout=StringIO())
+
+    def api_amounts(self):
+        response = self.client.get(reverse('transaction-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(row['amount'] for row in response.data['results'])
+
+    def test_reads_come_from_replica(self):
+        self.sync()
+        self.create(200)  # еще не реплицирована
+        self.assertEqual(self.api_amounts(), ['100.00'])
+
+        params = {'date_from': date.today().isoformat(), 'date_to': date.today().isoformat()}
+        response = self.client.get(reverse('transactions:list'), params)
+        self.assertEqual([t.amount for t in response.context['transactions']], [100])
+
+        response = self.client.get(reverse('transactions:export'), params)
+        self.assertEqual(len(b''.join(response.streaming_content).decode().splitlines()), 2)
+
+    def test_unsynced_replica_falls_back_to_primary(self):
+        self.assertEqual(self.api_amounts(), ['100.00'])
+        self.create(200)
+        self.assertEqual(self.api_amounts(), ['100.00', '200.00'])
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        self.sync()
+        self.create(200)
+        ReplicationHeartbeat.objects.using('replica').update(written_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(self.api_amounts(), ['100.00', '200.00'])
+
+    def test_client_reads_own_writes(self):
+        self.sync()
+        response = self.client.post(reverse('transaction-list'), {
+            'date': date.today().isoformat(),
+            'status': self.status.id,
+            'operation_type': self.operation_type.id,
+            'category': self.category.id,
+            'amount': '300.00',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(self.api_amounts(), ['100.00', '300.00'])
+
+        self.client.cookies.pop(PIN_COOKIE)
+        self.assertEqual(self.api_amounts(), ['100.00'])
+
+    def test_references_are_read_from_primary(self):
+        self.sync()
+        Status.objects.create(name='Личное')  # на реплике ее еще нет
+        params = {'date_from': date.today().isoformat(), 'date_to': date.today().isoformat()}
+        response = self.client.get(reverse('transactions:list'), params)
+        self.assertEqual([t.amount for t in response.context['transactions']], [100])
+        self.assertEqual([s.name for s in response.context['statuses']], ['Бизнес', 'Личное'])
+
+    def test_heartbeat_command(self):
+        call_command('replication_heartbeat')
+        call_command('replication_heartbeat')
+        heartbeat = ReplicationHeartbeat.objects.using('default').get()
+        self.assertEqual(heartbeat.pk, 1)
+        self.assertAlmostEqual(heartbeat.written_at, timezone.now(), delta=timedelta(minutes=1))
@@ -0,0 +1,71 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from reference.models import Status, OperationType, Category
+from transactions.models import Transaction
+
+
+class TransactionReportAPITestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpass123')
+        cls.business = Status.objects.create(name='Бизнес')
+        cls.personal = Status.objects.create(name='Личное')
+        cls.income = OperationType.objects.create(name='Пополнение')
+        cls.expense = OperationType.objects.create(name='Списание')
+        cls.sales = Category.objects.create(name='Продажи', operation_type=cls.income)
+        cls.marketing = Category.objects.create(name='Маркетинг', operation_type=cls.expense)
+
+        for day, status_obj, category, amount in [
+            (date(2024, 1, 10), cls.business, cls.sales, 1000),
+            (date(2024, 1, 20), cls.business, cls.marketing, 300),
+            (date(2024, 2, 5), cls.personal, cls.sales, 500),
+            (date(2024, 2, 6), cls.business, cls.marketing, 200),
+        ]:
+            Transaction.objects.create(
+                date=day,
+                status=status_obj,
+                operation_type=category.operation_type,
+                category=category,
+                amount=amount
+            )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('transaction-report')
+
+    def test_total_without_grouping(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{'total': '2000.00', 'count': 4}])
+
+    def test_group_by_month_and_operation_type(self):
+        response = self.client.get(self.url, {'period': 'month', 'group_by': 'operation_type'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [
+            {'period': '2024-01-01', 'operation_type': self.income.id, 'total': '1000.00', 'count': 1},
+            {'period': '2024-01-01', 'operation_type': self.expense.id, 'total': '300.00', 'count': 1},
+            {'period': '2024-02-01', 'operation_type': self.income.id, 'total': '500.00', 'count': 1},
+            {'period': '2024-02-01', 'operation_type': self.expense.id, 'total': '200.00', 'count': 1},
+        ])
+
+    def test_date_range_and_status(self):
+        response = self.client.get(self.url, {
+            'group_by': 'status',
+            'date_from': '2024-02-01',
+            'date_to': '2024-02-28',
+        })
+        self.assertEqual(response.data['results'], [
+            {'status': self.business.id, 'total': '200.00', 'count': 1},
+            {'status': self.personal.id, 'total': '500.00', 'count': 1},
+        ])
+
+    def test_invalid_parameters(self):
+        response = self.client.get(self.url, {'period': 'year'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'group_by': 'comment'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
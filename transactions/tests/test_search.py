@@ -0,0 +1,107 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from reference.models import Status, OperationType, Category
+from transactions.models import Transaction
+from transactions.search import build_match_query, search_transactions
+from transactions.tests.test_query_plans import explain
+
+
+class TransactionSearchTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(username='admin', password='adminpass123')
+        cls.status = Status.objects.create(name='Личное')
+        cls.operation_type = OperationType.objects.create(name='Списание')
+        cls.category = Category.objects.create(name='Еда', operation_type=cls.operation_type)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def create(self, comment):
+        return Transaction.objects.create(
+            date=date(2024, 5, 1),
+            status=self.status,
+            operation_type=self.operation_type,
+            category=self.category,
+            amount=100,
+            comment=comment
+        )
+
+    def search(self, text):
+        return list(search_transactions(Transaction.objects.all(), text).values_list('comment', flat=True))
+
+    def test_build_match_query_escapes_syntax(self):
+        self.assertEqual(build_match_query('обед OR "кафе*'), '"обед"* "OR"* "кафе"*')
+        self.assertEqual(build_match_query('  --  '), '')
+
+    def test_prefix_and_case_insensitive(self):
+        self.create('Обед в ресторане')
+        self.create('Такси домой')
+        self.assertEqual(self.search('рест'), ['Обед в ресторане'])
+        self.assertEqual(self.search('ОБЕД рест'), ['Обед в ресторане'])
+        self.assertEqual(self.search('обед такси'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        transaction = self.create('Обед')
+        transaction.comment = 'Ужин'
+        transaction.save()
+        self.assertEqual(self.search('обед'), [])
+        self.assertEqual(self.search('ужин'), ['Ужин'])
+
+        Transaction.objects.filter(pk=transaction.pk).update(comment='Завтрак')
+        self.assertEqual(self.search('завтрак'), ['Завтрак'])
+
+        transaction.delete()
+        self.assertEqual(self.search('завтрак'), [])
+
+    def test_bulk_create_is_indexed(self):
+        Transaction.objects.bulk_create([
+            Transaction(
+                date=date(2024, 5, 1), status=self.status, operation_type=self.operation_type,
+                category=self.category, amount=1, comment=f'Импорт {i}'
+            )
+            for i in range(3)
+        ])
+        self.assertEqual(len(self.search('импорт')), 3)
+
+    def test_search_uses_fts_index(self):
+        plan = explain(search_transactions(Transaction.objects.all(), 'обед'))
+        self.assertTrue(any('VIRTUAL TABLE' in step for step in plan), plan)
+        self.assertNotIn('SCAN transactions_transaction', plan)
+
+    def test_api_search_ranks_results(self):
+        self.create('Кафе, кафе')
+        self.create('Кафе у дома с друзьями вечером')
+        for _ in range(5):
+            self.create('Такси')
+        response = self.client.get(reverse('transaction-list'), {'search': 'кафе'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row['comment'] for row in response.data['results']],
+            ['Кафе, кафе', 'Кафе у дома с друзьями вечером']
+        )
+
+    def test_api_search_paginates_by_rank(self):
+        for i in range(5):
+            self.create('кафе ' * (i + 1))
+        url = reverse('transaction-list')
+        response = self.client.get(url, {'search': 'кафе', 'page_size': 2})
+        seen = [row['id'] for row in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen.extend(row['id'] for row in response.data['results'])
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_admin_search(self):
+        self.create('Обед в ресторане')
+        self.create('Такси')
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('admin:transactions_transaction_changelist'), {'q': 'ресторан'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.context['cl'].result_count, 1)
@@ -0,0 +1,148 @@
+import json
+import logging
+import tempfile
+from datetime import date
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from cashflow.db.slowlog import REDACTED, JsonFormatter, fingerprint, normalize_sql, track_slow_queries
+from reference.cache import invalidate
+from reference.models import Status, OperationType, Category
+from transactions.models import Transaction
+
+
+class SlowQueryLogTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='user', password='userpass123')
+        status = Status.objects.create(name='Бизнес')
+        operation_type = OperationType.objects.create(name='Списание')
+        category = Category.objects.create(name='Маркетинг', operation_type=operation_type)
+        Transaction.objects.create(date=date(2024, 1, 10), status=status, operation_type=operation_type,
+                                   category=category, amount=100)
+
+    def setUp(self):
+        self.addCleanup(invalidate)
+        self.client.force_login(self.user)
+        self.url = reverse('transactions:list') + '?date_from=2024-01-01&date_to=2024-01-31'
+
+    def slow_entries(self, logs):
+        return [record.slow_query for record in logs.records]
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_logs_view_and_call_site(self):
+        with self.assertLogs('cashflow.slowquery', level='WARNING') as logs:
+            self.client.get(self.url)
+
+        entries = self.slow_entries(logs)
+        list_entries = [entry for entry in entries if 'transactions_transaction' in entry['sql']]
+        self.assertTrue(list_entries)
+        entry = list_entries[0]
+        self.assertEqual(entry['view'], 'transactions:list')
+        self.assertEqual(entry['view_func'], 'transactions.views.transaction_list')
+        self.assertEqual(entry['method'], 'GET')
+        self.assertEqual(entry['alias'], 'default')
+        self.assertEqual(entry['fingerprint'], fingerprint(entry['sql']))
+        self.assertIsInstance(entry['params'], list)
+        self.assertGreaterEqual(entry['duration_ms'], 0)
+        # Место вызова - код приложения, а не Django или инфраструктура cashflow/
+        self.assertTrue(entry['frame']['file'].startswith('transactions/'), entry['frame'])
+        self.assertEqual(entry['stack'][-1], f"{entry['frame']['file']}:{entry['frame']['line']} "
+                                             f"in {entry['frame']['function']}")
+
+        line = json.loads(JsonFormatter().format(logs.records[0]))
+        self.assertEqual(line['sql'], entries[0]['sql'])
+        self.assertIn('time', line)
+
+    def test_fast_queries_not_logged(self):
+        logger = logging.getLogger('cashflow.slowquery')
+        with override_settings(SLOW_QUERY_THRESHOLD_MS=10 ** 6), self.assertNoLogs(logger, level='WARNING'):
+            self.client.get(self.url)
+
+    def test_outside_requests(self):
+        with self.assertLogs('cashflow.slowquery', level='WARNING') as logs, track_slow_queries(threshold=0):
+            list(Transaction.objects.filter(amount__gt=50))
+
+        entry = self.slow_entries(logs)[0]
+        self.assertIsNone(entry['view'])
+        self.assertEqual(entry['frame']['file'], 'transactions/tests/test_slow_queries.py')
+        self.assertEqual(entry['frame']['function'], 'test_outside_requests')
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_sensitive_params_redacted(self):
+        with self.assertLogs('cashflow.slowquery', level='WARNING') as logs:
+            self.client.get(self.url)
+            with track_slow_queries(threshold=0):
+                User.objects.filter(username='user', password__startswith='pbkdf2').exists()
+
+        entries = self.slow_entries(logs)
+        sensitive = [entry for entry in entries
+                     if 'django_session' in entry['sql'] or '"auth_user"' in entry['sql']]
+        self.assertTrue(sensitive)
+        for entry in sensitive:
+            self.assertEqual(entry['params'], REDACTED)
+        session_key = self.client.session.session_key
+        self.assertFalse([record for record in logs.records if session_key in JsonFormatter().format(record)])
+
+
+class SlowQueryReportTestCase(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log = Path(directory.name) / 'slow_queries.log'
+
+    def write(self, path, entries):
+        with open(path, 'w', encoding='utf-8') as stream:
+            for entry in entries:
+                stream.write(json.dumps(entry) + '\n')
+            stream.write('not json\n')
+
+    def entry(self, sql, duration, view='transactions:list', line=10):
+        return {
+            'sql': sql, 'duration_ms': duration, 'view': view, 'fingerprint': fingerprint(sql),
+            'frame': {'file': 'transactions/views.py', 'line': line, 'function': 'transaction_list'},
+        }
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql('SELECT "a"."id" FROM "a" WHERE "a"."id" IN (%s, %s, %s) AND x = \'y\' LIMIT 21'),
+            'SELECT "a"."id" FROM "a" WHERE "a"."id" IN (...) AND x = ? LIMIT ?',
+        )
+        self.assertEqual(fingerprint('SELECT 1 FROM t WHERE id IN (%s)'),
+                         fingerprint('SELECT 1 FROM t WHERE id IN (%s, %s)'))
+        self.assertNotEqual(fingerprint('SELECT 1 FROM t'), fingerprint('SELECT 1 FROM u'))
+
+    def test_report_groups_by_fingerprint_including_rotated_files(self):
+        self.write(self.log, [
+            self.entry('SELECT * FROM t WHERE id IN (%s, %s)', 300),
+            self.entry('SELECT * FROM u', 150, view='reference:index', line=5),
+        ])
+        self.write(f'{self.log}.1', [self.entry('SELECT * FROM t WHERE id IN (%s)', 200, line=12)])
+
+        out = StringIO()
+        call_command('slow_query_report', log=str(self.log), json=True, stdout=out)
+        summary = json.loads(out.getvalue())
+
+        self.assertEqual([group['count'] for group in summary], [2, 1])
+        top = summary[0]
+        self.assertEqual(top['total_ms'], 500)
+        self.assertEqual(top['max_ms'], 300)
+        self.assertEqual(top['mean_ms'], 250)
+        self.assertEqual(top['views'], {'transactions:list': 2})
+        self.assertEqual(list(top['frames']), [
+            'transactions/views.py:10 in transaction_list', 'transactions/views.py:12 in transaction_list',
+        ])
+
+        out = StringIO()
+        call_command('slow_query_report', log=str(self.log), view='reference:index', stdout=out)
+        self.assertIn('SELECT * FROM u', out.getvalue())
+        self.assertNotIn('FROM t', out.getvalue())
+
+    def test_missing_log(self):
+        with self.assertRaises(CommandError):
+            call_command('slow_query_report', log=str(self.log), stdout=StringIO())
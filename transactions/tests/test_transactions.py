@@ -1,10 +1,19 @@
+import json
+from unittest.mock import patch
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth.models import User
-from transactions.models import Transaction
+from transactions.flat import flat_queryset, serialize_rows
+from transactions.models import Transaction, TransactionDailyAggregate
+from transactions.serializers import TransactionSerializer
+from transactions.pagination import TransactionCursorPagination, paginate_keyset
+from rest_framework.pagination import Cursor
 from reference.models import Status, OperationType, Category, SubCategory
-from datetime import date
+from datetime import date, timedelta
 
 
 class TransactionAPITestCase(APITestCase):
@@ -47,13 +56,115 @@ class TransactionAPITestCase(APITestCase):
         url = reverse('transaction-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)  # Убрали ['results']
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_transaction_filter_by_date(self):
         url = f"{reverse('transaction-list')}?date={date.today()}"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)  # Убрали ['results']
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_transaction_list_is_cursor_paginated(self):
+        for i in range(3):
+            Transaction.objects.create(
+                date=date.today(),
+                status=self.status,
+                operation_type=self.operation_type,
+                category=self.category,
+                amount=100 + i
+            )
+        url = reverse('transaction-list')
+        response = self.client.get(url, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['next'])
+
+    def test_transaction_list_page_size_is_capped(self):
+        url = reverse('transaction-list')
+        with patch.object(TransactionCursorPagination, 'max_page_size', 1):
+            Transaction.objects.create(
+                date=date.today(),
+                status=self.status,
+                operation_type=self.operation_type,
+                category=self.category,
+                amount=100
+            )
+            response = self.client.get(url, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_transaction_cursor_is_keyset_over_full_ordering(self):
+        # Все записи на одну дату и с двумя суммами: ключ - весь кортеж порядка, а не только date
+        for i in range(11):
+            Transaction.objects.create(
+                date=date.today(),
+                status=self.status,
+                operation_type=self.operation_type,
+                category=self.category,
+                amount=100 if i % 2 else 200
+            )
+        expected = set(Transaction.objects.values_list('pk', flat=True))
+        url = reverse('transaction-list')
+        for ordering in (None, 'amount', '-date'):
+            seen = []
+            params = {'page_size': 3, **({'ordering': ordering} if ordering else {})}
+            response = self.client.get(url, params)
+            pages = [response.data['results']]
+            with CaptureQueriesContext(connection) as queries:
+                while response.data['next']:
+                    response = self.client.get(response.data['next'])
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                    pages.append(response.data['results'])
+            for page in pages:
+                seen.extend(row['id'] for row in page)
+            self.assertEqual(len(seen), len(expected), ordering)
+            self.assertEqual(set(seen), expected, ordering)
+            self.assertFalse([q['sql'] for q in queries.captured_queries if 'OFFSET' in q['sql']])
+
+            # Ссылка назад возвращает ровно предыдущую страницу
+            response = self.client.get(response.data['previous'])
+            self.assertEqual([row['id'] for row in response.data['results']], [row['id'] for row in pages[-2]])
+
+    def test_transaction_cursor_from_other_ordering_is_rejected(self):
+        Transaction.objects.create(
+            date=date.today(),
+            status=self.status,
+            operation_type=self.operation_type,
+            category=self.category,
+            amount=100
+        )
+        url = reverse('transaction-list')
+        next_url = self.client.get(url, {'page_size': 1}).data['next']
+        response = self.client.get(next_url.replace('page_size=1', 'page_size=1&search=x&ordering=amount'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # Порядки одной длины: ('amount', 'id') и ('created_at', 'id')
+        next_url = self.client.get(url, {'page_size': 1, 'ordering': 'amount'}).data['next']
+        response = self.client.get(next_url.replace('ordering=amount', 'ordering=created_at'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_transaction_cursor_with_invalid_values_is_rejected(self):
+        url = reverse('transaction-list')
+        paginator = TransactionCursorPagination()
+        paginator.base_url = 'http://testserver' + url + '?ordering=date'
+        position = json.dumps({'ordering': ['date', 'created_at', 'id'], 'values': ['12.50', 'x', 5]})
+        cursor_url = paginator.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+        response = self.client.get(cursor_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_transaction_ordering_tiebreaker_follows_direction(self):
+        url = reverse('transaction-list')
+        for ordering, expected in (
+            ('amount', ('amount', 'id')),
+            ('-amount', ('-amount', '-id')),
+            ('date', ('date', 'created_at', 'id')),
+            ('-created_at', ('-created_at', '-id')),
+        ):
+            response = self.client.get(url, {'ordering': ordering})
+            self.assertEqual(response.renderer_context['view'].paginator.ordering, expected)
 
     def test_transaction_create(self):
         url = reverse('transaction-list')
@@ -88,4 +199,284 @@ class TransactionAPITestCase(APITestCase):
         url = reverse('transaction-detail', args=[self.transaction.id])
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertEqual(Transaction.objects.count(), 0)
\ No newline at end of file
+        self.assertEqual(Transaction.objects.count(), 0)
+
+    def test_flat_rows_match_transaction_serializer(self):
+        Transaction.objects.create(
+            date=date.today(),
+            status=self.status,
+            operation_type=self.operation_type,
+            category=self.category,
+            amount='10.50'
+        )
+        queryset = Transaction.objects.order_by('id')
+        expected = TransactionSerializer(queryset, many=True).data
+        self.assertEqual(json.dumps(serialize_rows(flat_queryset(queryset))), json.dumps(expected))
+
+    def test_list_uses_single_query_for_page(self):
+        url = reverse('transaction-list')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        transaction_queries = [q for q in queries.captured_queries if 'transactions_transaction' in q['sql']]
+        self.assertEqual(len(transaction_queries), 1)
+        self.assertEqual(response.data['results'][0]['category']['name'], 'Еда')
+
+    def test_list_sparse_fields(self):
+        url = reverse('transaction-list')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id,amount,category_id'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['results'][0],
+            {'id': self.transaction.id, 'amount': '1500.00', 'category_id': self.category.id}
+        )
+        sql = [q['sql'] for q in queries.captured_queries if 'transactions_transaction' in q['sql']][0]
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('"comment"', sql)
+
+    def test_list_expand_relation(self):
+        url = reverse('transaction-list')
+        response = self.client.get(url, {'fields': 'id,status', 'expand': 'category'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0], {
+            'id': self.transaction.id,
+            'status': self.status.id,
+            'category': {
+                'id': self.category.id,
+                'operation_type': self.operation_type.id,
+                'name': 'Еда',
+            },
+        })
+
+    def test_list_unknown_field(self):
+        url = reverse('transaction-list')
+        response = self.client.get(url, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url, {'expand': 'comment'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve_sparse_fields(self):
+        url = reverse('transaction-detail', args=[self.transaction.id])
+        response = self.client.get(url, {'fields': 'id,date,comment'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'id': self.transaction.id,
+            'date': self.transaction.date.isoformat(),
+            'comment': self.transaction.comment,
+        })
+        response = self.client.get(reverse('transaction-detail', args=[0]), {'fields': 'id'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('transaction-detail', args=['abc']), {'fields': 'id,amount'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        # Фильтры запроса действуют так же, как без fields
+        response = self.client.get(url, {'fields': 'id', 'amount_min': '100000'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_amount_range_filter(self):
+        Transaction.objects.create(
+            date=date.today(),
+            status=self.status,
+            operation_type=self.operation_type,
+            category=self.category,
+            amount='15.00'
+        )
+        url = reverse('transaction-list')
+        response = self.client.get(url, {'amount_min': '1000', 'amount_max': '2000'})
+        self.assertEqual([row['amount'] for row in response.data['results']], ['1500.00'])
+        response = self.client.get(url, {'amount_max': '100'})
+        self.assertEqual([row['amount'] for row in response.data['results']], ['15.00'])
+        response = self.client.get(url, {'amount_min': 'много'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_multi_value_filters(self):
+        other_category = Category.objects.create(name='Транспорт', operation_type=self.operation_type)
+        Transaction.objects.create(
+            date=date.today(),
+            status=self.status,
+            operation_type=self.operation_type,
+            category=other_category,
+            amount=100
+        )
+        url = reverse('transaction-list')
+        response = self.client.get(url, {'category__in': f'{self.category.id},{other_category.id}'})
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get(url, {'category__in': other_category.id, 'status__in': self.status.id})
+        self.assertEqual(len(response.data['results']), 1)
+        response = self.client.get(url, {'date_from': date.today() + timedelta(days=1)})
+        self.assertEqual(len(response.data['results']), 0)
+
+
+class TransactionListPaginationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.status = Status.objects.create(name='Бизнес')
+        cls.operation_type = OperationType.objects.create(name='Списание')
+        cls.category = Category.objects.create(
+            name='Маркетинг',
+            operation_type=cls.operation_type
+        )
+        cls.today = date.today()
+        cls.transactions = [
+            Transaction.objects.create(
+                date=cls.today - timedelta(days=i % 3),
+                status=cls.status,
+                operation_type=cls.operation_type,
+                category=cls.category,
+                amount=100 + i
+            )
+            for i in range(7)
+        ]
+
+    def _params(self):
+        return {
+            'date_from': (self.today - timedelta(days=10)).isoformat(),
+            'date_to': self.today.isoformat(),
+        }
+
+    def test_keyset_pages_cover_all_rows_once(self):
+        queryset = Transaction.objects.all()
+        seen = []
+        page, cursor = paginate_keyset(queryset, page_size=3)
+        seen.extend(page)
+        while cursor:
+            page, cursor = paginate_keyset(queryset, cursor, page_size=3)
+            seen.extend(page)
+
+        expected = list(queryset.order_by('-date', '-created_at', '-id'))
+        self.assertEqual([t.pk for t in seen], [t.pk for t in expected])
+
+    def test_list_renders_first_page_with_next_link(self):
+        with patch('transactions.views.paginate_keyset',
+                   side_effect=lambda qs, cursor=None: paginate_keyset(qs, cursor, page_size=5)):
+            response = self.client.get(reverse('transactions:list'), self._params())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['transactions']), 5)
+        self.assertIn('cursor=', response.context['next_page_url'])
+
+    def test_rows_fragment_returns_next_page(self):
+        _, cursor = paginate_keyset(Transaction.objects.all(), page_size=5)
+        params = dict(self._params(), cursor=cursor)
+        response = self.client.get(reverse('transactions:list_rows'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['transactions']), 2)
+        self.assertIsNone(response.context['next_page_url'])
+
+    def test_rows_fragment_rejects_invalid_cursor(self):
+        params = dict(self._params(), cursor='not-a-cursor')
+        response = self.client.get(reverse('transactions:list_rows'), params)
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_amount_range(self):
+        params = dict(self._params(), amount_min='102', amount_max='104')
+        response = self.client.get(reverse('transactions:list'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(t.amount for t in response.context['transactions']), [102, 103, 104])
+
+    def test_list_ignores_invalid_filter_values(self):
+        params = dict(self._params(), amount_min='много', status='abc')
+        response = self.client.get(reverse('transactions:list'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['transactions']), 7)
+
+
+class TransactionBatchAPITestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpass123')
+        cls.status = Status.objects.create(name='Завершено')
+        cls.operation_type = OperationType.objects.create(name='Расход')
+        cls.category = Category.objects.create(name='Еда', operation_type=cls.operation_type)
+        cls.subcategory = SubCategory.objects.create(name='Рестораны', category=cls.category)
+        cls.transaction = Transaction.objects.create(
+            date=date.today(),
+            status=cls.status,
+            operation_type=cls.operation_type,
+            category=cls.category,
+            amount=1500.00,
+            comment='Ужин в ресторане'
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def item(self, **fields):
+        data = {
+            'date': date.today().isoformat(),
+            'status': self.status.id,
+            'operation_type': self.operation_type.id,
+            'category': self.category.id,
+            'amount': '10.00',
+        }
+        data.update(fields)
+        return data
+
+    def test_batch_creates_and_updates(self):
+        url = reverse('transaction-batch')
+        payload = [
+            self.item(amount='10.00'),
+            self.item(amount='20.00', subcategory=self.subcategory.id),
+            {'id': self.transaction.id, 'amount': '999.00'},
+        ]
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['errors']), (2, 1, 0))
+        self.assertEqual([r['status'] for r in response.data['results']], ['created', 'created', 'updated'])
+        self.assertEqual(response.data['results'][2]['id'], self.transaction.id)
+        self.assertEqual(Transaction.objects.count(), 3)
+        self.transaction.refresh_from_db()
+        self.assertEqual(str(self.transaction.amount), '999.00')
+        self.assertEqual(self.transaction.comment, 'Ужин в ресторане')
+
+    def test_batch_query_count_does_not_depend_on_size(self):
+        url = reverse('transaction-batch')
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(url, [self.item() for _ in range(2)], format='json')
+        with CaptureQueriesContext(connection) as large:
+            self.client.post(url, [self.item() for _ in range(50)], format='json')
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_batch_reports_item_errors(self):
+        other_type = OperationType.objects.create(name='Пополнение')
+        url = reverse('transaction-batch')
+        payload = [
+            self.item(),
+            self.item(status=999999),
+            self.item(operation_type=other_type.id),
+            {'id': 999999, 'amount': '1.00'},
+            'not an object',
+        ]
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['errors'], 4)
+        results = response.data['results']
+        self.assertEqual(results[0]['status'], 'created')
+        self.assertIn('status', results[1]['errors'])
+        self.assertIn('category', results[2]['errors'])
+        self.assertIn('id', results[3]['errors'])
+        self.assertEqual(results[4]['status'], 'error')
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_batch_rejects_duplicate_ids(self):
+        url = reverse('transaction-batch')
+        payload = [
+            {'id': self.transaction.id, 'amount': '2000.00'},
+            {'id': str(self.transaction.id), 'amount': '3000.00'},
+        ]
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual((response.data['updated'], response.data['errors']), (1, 1))
+        self.assertIn('id', response.data['results'][1]['errors'])
+        self.transaction.refresh_from_db()
+        self.assertEqual(str(self.transaction.amount), '2000.00')
+        aggregate = TransactionDailyAggregate.objects.get(date=self.transaction.date)
+        self.assertEqual(str(aggregate.total_amount), '2000.00')
+
+    def test_batch_requires_list(self):
+        response = self.client.post(reverse('transaction-batch'), self.item(), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_rejects_category_of_other_operation_type(self):
+        other_type = OperationType.objects.create(name='Пополнение')
+        response = self.client.post(reverse('transaction-list'), self.item(operation_type=other_type.id))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
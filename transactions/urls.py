@@ -1,8 +1,9 @@
 """Конфигурация URL-адресов для работы с транзакциями.
 
 Определяет маршруты для:
-- Просмотра списка транзакций
+- Просмотра списка транзакций и подгрузки его следующих страниц
 - Создания, редактирования и удаления транзакций
+- Потоковой выгрузки транзакций
 - AJAX-эндпоинтов для динамической загрузки категорий и подкатегорий
 
 Attributes:
@@ -18,6 +19,8 @@ app_name = 'transactions'
 urlpatterns = [
     # Основные маршруты для работы с транзакциями
     path('', views.transaction_list, name='list'),
+    path('rows/', views.transaction_list_rows, name='list_rows'),
+    path('export/', views.export_transactions, name='export'),
     path('create/', views.create_transaction, name='create'),
     path('<int:pk>/update/', views.update_transaction, name='update'),
     path('<int:pk>/delete/', views.delete_transaction, name='delete'),
@@ -1,20 +1,45 @@
 """Модуль представлений для работы с транзакциями.
 
 Содержит функции для:
-- Отображения и фильтрации списка транзакций
+- Отображения и фильтрации списка транзакций (с курсорной подгрузкой страниц)
 - Создания, редактирования и удаления транзакций
+- Потоковой выгрузки транзакций в CSV и NDJSON
+- Чтения списков и выгрузок с реплики БД (если она настроена)
 - Обработки AJAX-запросов для динамических форм
 """
 
+from django.db import router
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.utils import timezone
-from datetime import datetime
-from .models import Transaction
+from django.urls import reverse
+from .models import ArchiveState, Transaction
+from .export import EXPORT_FORMATS, iter_export
+from .filters import filter_ledger, filter_transactions
 from .forms import TransactionForm
-from reference.models import Status, OperationType, Category, SubCategory
+from .pagination import InvalidCursor, paginate_keyset
+from reference.cache import get_reference_data
+from cashflow.db.replica import replica_reads
 
 
+def _next_page_url(request, cursor):
+    """Формирует URL следующей страницы с сохранением фильтров.
+
+    Args:
+        request: HttpRequest объект.
+        cursor (str): Курсор следующей страницы или None.
+
+    Returns:
+        str: URL фрагмента со следующей страницей или None.
+    """
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return f"{reverse('transactions:list_rows')}?{params.urlencode()}"
+
+
+@replica_reads
 def transaction_list(request):
     """Отображает список транзакций с возможностью фильтрации.
 
@@ -23,6 +48,12 @@ def transaction_list(request):
     - Статусу операции
     - Типу операции (доход/расход)
     - Категории и подкатегории
+    - Диапазону сумм (amount_min, amount_max)
+
+    Выводится только первая страница; следующие страницы подгружаются
+    при прокрутке через transaction_list_rows по курсору. Если диапазон
+    начинается раньше границы архива, страница предупреждает, что
+    архивные транзакции в список не входят.
 
     Args:
         request: HttpRequest объект.
@@ -30,68 +61,104 @@ def transaction_list(request):
     Returns:
         HttpResponse: HTML страница с отфильтрованным списком транзакций.
     """
-    today = timezone.now().date()
-    default_date_from = today.replace(day=1)  # Первое число текущего месяца
-    default_date_to = today  # Текущая дата
-
-    # Получаем параметры фильтрации из GET-запроса
-    date_from = request.GET.get('date_from', default_date_from.strftime('%Y-%m-%d'))
-    date_to = request.GET.get('date_to', default_date_to.strftime('%Y-%m-%d'))
-    status_id = request.GET.get('status')
-    operation_type_id = request.GET.get('operation_type')
-    category_id = request.GET.get('category')
-    subcategory_id = request.GET.get('subcategory')
+    transactions, filters = filter_transactions(request.GET)
+    page, next_cursor = paginate_keyset(transactions)
 
-    # Обработка и валидация дат
-    try:
-        date_from = datetime.strptime(date_from, '%Y-%m-%d').date()
-        date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
-    except (ValueError, TypeError):
-        date_from = default_date_from
-        date_to = default_date_to
-
-    # Базовый запрос с оптимизацией через select_related
-    transactions = Transaction.objects.filter(
-        date__range=[date_from, date_to]
-    ).select_related(
-        'status', 'operation_type', 'category', 'subcategory'
-    ).order_by('-date', '-created_at')
-
-    # Применение дополнительных фильтров
-    if status_id:
-        transactions = transactions.filter(status_id=status_id)
-    if operation_type_id:
-        transactions = transactions.filter(operation_type_id=operation_type_id)
-    if category_id:
-        transactions = transactions.filter(category_id=category_id)
-    if subcategory_id:
-        transactions = transactions.filter(subcategory_id=subcategory_id)
-
-    # Получение данных для фильтров
-    statuses = Status.objects.all()
-    operation_types = OperationType.objects.all()
-    categories = Category.objects.filter(
-        operation_type_id=operation_type_id) if operation_type_id else Category.objects.all()
-    subcategories = SubCategory.objects.filter(category_id=category_id) if category_id else SubCategory.objects.all()
+    operation_type_id = filters['operation_type']
+    category_id = filters['category']
+
+    # Получение данных для фильтров из кэша справочников
+    references = get_reference_data()
+    statuses = references.statuses
+    operation_types = references.operation_types
+    categories = references.categories_for(
+        operation_type_id) if operation_type_id else references.categories
+    subcategories = references.subcategories_for(category_id) if category_id else references.subcategories
 
     context = {
-        'transactions': transactions,
+        'transactions': page,
+        'next_page_url': _next_page_url(request, next_cursor),
         'statuses': statuses,
         'operation_types': operation_types,
         'categories': categories,
         'subcategories': subcategories,
-        'date_from': date_from.strftime('%Y-%m-%d'),
-        'date_to': date_to.strftime('%Y-%m-%d'),
-        'default_date_from': default_date_from.strftime('%Y-%m-%d'),
-        'default_date_to': default_date_to.strftime('%Y-%m-%d'),
-        'selected_status': status_id,
+        'date_from': filters['date_from'].strftime('%Y-%m-%d'),
+        'date_to': filters['date_to'].strftime('%Y-%m-%d'),
+        'default_date_from': filters['default_date_from'].strftime('%Y-%m-%d'),
+        'default_date_to': filters['default_date_to'].strftime('%Y-%m-%d'),
+        'selected_status': filters['status'],
         'selected_operation_type': operation_type_id,
         'selected_category': category_id,
-        'selected_subcategory': subcategory_id,
+        'selected_subcategory': filters['subcategory'],
+        'amount_min': filters['amount_min'],
+        'amount_max': filters['amount_max'],
+        'archived_before': ArchiveState.objects.hidden_before(filters['date_from']),
     }
     return render(request, 'transactions/transaction_list.html', context)
 
 
+@replica_reads
+def transaction_list_rows(request):
+    """AJAX-обработчик бесконечной прокрутки списка транзакций.
+
+    Принимает те же фильтры, что и transaction_list, плюс курсор
+    последней показанной записи.
+
+    Args:
+        request: HttpRequest объект.
+
+    Returns:
+        HttpResponse: HTML со строками таблицы следующей страницы.
+    """
+    transactions, _ = filter_transactions(request.GET)
+    try:
+        page, next_cursor = paginate_keyset(transactions, request.GET.get('cursor'))
+    except InvalidCursor:
+        return HttpResponseBadRequest('Некорректный курсор')
+
+    return render(request, 'transactions/includes/transaction_rows.html', {
+        'transactions': page,
+        'next_page_url': _next_page_url(request, next_cursor),
+    })
+
+
+@replica_reads
+def export_transactions(request):
+    """Потоково выгружает транзакции в CSV или NDJSON.
+
+    Принимает те же фильтры, что и transaction_list, и параметр
+    format (csv по умолчанию или ndjson). Строки читаются из БД
+    порциями и отправляются клиенту по мере готовности. Если диапазон
+    начинается раньше границы архива, архивные транзакции выгружаются
+    вместе с текущими (Transaction.ledger).
+
+    Args:
+        request: HttpRequest объект.
+
+    Returns:
+        StreamingHttpResponse: Файл выгрузки.
+    """
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest('Неподдерживаемый формат экспорта')
+
+    # Строки читаются уже после выхода из представления, поэтому БД
+    # выбирается сейчас, пока действует маршрутизация запроса
+    using = router.db_for_read(Transaction)
+    transactions, filters = filter_transactions(request.GET)
+    if ArchiveState.objects.hidden_before(filters['date_from']) is not None:
+        transactions, _ = filter_ledger(request.GET, using=using)
+    else:
+        transactions = transactions.using(using)
+    response = StreamingHttpResponse(
+        iter_export(transactions, export_format),
+        content_type=EXPORT_FORMATS[export_format]
+    )
+    filename = f"transactions_{filters['date_from']:%Y%m%d}_{filters['date_to']:%Y%m%d}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
 def create_transaction(request):
     """Обрабатывает создание новой транзакции.
 
@@ -174,7 +241,7 @@ def load_categories(request):
         HttpResponse: HTML с вариантами категорий.
     """
     operation_type_id = request.GET.get('operation_type')
-    categories = Category.objects.filter(operation_type_id=operation_type_id)
+    categories = get_reference_data().categories_for(operation_type_id)
     return render(request, 'transactions/includes/category_options.html', {
         'categories': categories
     })
@@ -190,7 +257,7 @@ def load_subcategories(request):
         HttpResponse: HTML с вариантами подкатегорий.
     """
     category_id = request.GET.get('category')
-    subcategories = SubCategory.objects.filter(category_id=category_id)
+    subcategories = get_reference_data().subcategories_for(category_id)
     return render(request, 'transactions/includes/subcategory_options.html', {
         'subcategories': subcategories
     })
\ No newline at end of file
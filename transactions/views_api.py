@@ -1,40 +1,84 @@
 """ViewSet для работы с транзакциями через REST API.
 
 Предоставляет полный набор CRUD операций для транзакций с поддержкой:
-- Фильтрации по различным полям
-- Поиска по комментариям и суммам
+- Фильтрации по диапазонам дат и сумм и по справочникам
+- Полнотекстового поиска по комментариям с ранжированием
 - Сортировки по дате, сумме и времени создания
+- Курсорной пагинации с ограничением размера страницы
+- Сводных отчетов (суммы и количества), посчитанных в БД
+- Остатка по статусам во времени (оконные функции в БД)
+- Пакетного создания и обновления транзакций
 - Разных сериализаторов для чтения и записи
+- Быстрого чтения списка через values() без вложенных сериализаторов
+- Чтения списка, деталей и отчетов с реплики БД (если она настроена)
+- Выбора полей (?fields=) и раскрытия справочников (?expand=)
 """
 
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from django.utils.dateparse import parse_date
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Transaction
-from .serializers import TransactionSerializer, TransactionCreateSerializer
+from cashflow.db.replica import use_replica
+from .archive import ARCHIVED_BEFORE_HEADER
+from .balance import BALANCE_MAX_POINTS, balance_timeline
+from .batch import BATCH_MAX_SIZE, apply_batch
+from .filters import TransactionFilterSet, filterset_refiner
+from .flat import DEFAULT_PROJECTION, FlatProjection, flat_queryset, parse_field_list, serialize_rows
+from .models import ArchiveState, Transaction
+from .pagination import KEYSET_ORDERING, TransactionCursorPagination
+from .reports import cashflow_summary
+from .search import TransactionOrderingFilter, TransactionSearchFilter
+from .serializers import (
+    BalanceQuerySerializer, TransactionSerializer, TransactionCreateSerializer, TransactionReportQuerySerializer
+)
 
 
 class TransactionViewSet(viewsets.ModelViewSet):
     """ViewSet для управления транзакциями через API.
 
     Attributes:
-        queryset (QuerySet): Набор транзакций, отсортированный по дате (новые сначала).
+        queryset (QuerySet): Набор транзакций со справочниками, отсортированный по дате (новые сначала).
         permission_classes (list): Требуется аутентификация пользователя.
         filter_backends (list): Подключенные бэкенды фильтрации.
-        filterset_fields (list): Поля для точной фильтрации.
-        search_fields (list): Поля для поиска по подстроке.
+        filterset_class (TransactionFilterSet): Фильтры по диапазонам дат и сумм и по справочникам.
+        search_fields (list): Поля поиска по подстроке, если нет FTS5-индекса.
         ordering_fields (list): Поля для сортировки результатов.
+        ordering (tuple): Сортировка по умолчанию (нужна курсорной пагинации).
+        pagination_class (TransactionCursorPagination): Курсорная пагинация.
+        replica_actions (tuple): Действия, читающие с реплики БД.
 
     Methods:
+        initial: Включает чтение с реплики для действий только на чтение.
         get_serializer_class: Выбирает сериализатор в зависимости от действия.
+        get_projection: Набор полей ответа по параметрам fields и expand.
+        list: Список транзакций через быстрый путь values().
+        retrieve: Одна транзакция с учетом fields и expand.
+        report: Сводный отчет по суммам и количествам операций.
+        balance: Остаток по статусам во времени.
+        batch: Пакетное создание и обновление транзакций.
     """
 
-    queryset = Transaction.objects.all().order_by('-date')
+    queryset = Transaction.objects.select_related(
+        'status', 'operation_type', 'category', 'subcategory'
+    ).order_by('-date')
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'operation_type', 'category', 'subcategory', 'date']
-    search_fields = ['comment', 'amount']
+    filter_backends = [DjangoFilterBackend, TransactionSearchFilter, TransactionOrderingFilter]
+    filterset_class = TransactionFilterSet
+    search_fields = ['comment']
     ordering_fields = ['date', 'amount', 'created_at']
+    ordering = KEYSET_ORDERING
+    pagination_class = TransactionCursorPagination
+    replica_actions = ('list', 'retrieve', 'report', 'balance')
+
+    def initial(self, request, *args, **kwargs):
+        """После аутентификации направляет чтения replica_actions на реплику."""
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions:
+            use_replica()
 
     def get_serializer_class(self):
         """Определяет класс сериализатора в зависимости от типа запроса.
@@ -45,6 +89,166 @@ class TransactionViewSet(viewsets.ModelViewSet):
         Returns:
             Serializer: Класс сериализатора в зависимости от действия.
         """
-        if self.action in ['create', 'update', 'partial_update']:
+        if self.action in ['create', 'update', 'partial_update', 'batch']:
             return TransactionCreateSerializer
-        return TransactionSerializer
\ No newline at end of file
+        return TransactionSerializer
+
+    def get_projection(self):
+        """Набор полей ответа по параметрам запроса fields и expand.
+
+        Пример: ?fields=id,date,amount,category_id или
+        ?fields=id,amount&expand=category.
+
+        Returns:
+            FlatProjection: Выбор полей и колонок values().
+
+        Raises:
+            ValidationError: Если указано неизвестное поле или справочник.
+        """
+        params = self.request.query_params
+        fields = parse_field_list(params.get('fields'))
+        expand = parse_field_list(params.get('expand'))
+        if fields is None and expand is None:
+            return DEFAULT_PROJECTION
+        try:
+            return FlatProjection(fields=fields, expand=expand)
+        except ValueError as exc:
+            raise ValidationError({'fields': [str(exc)]})
+
+    def list(self, request, *args, **kwargs):
+        """Список транзакций без ModelSerializer.
+
+        Страница выбирается одним запросом values() только с нужными
+        колонками (JOIN - только для раскрытых справочников) и превращается
+        в словари; без fields и expand - той же формы, что дает
+        TransactionSerializer.
+
+        Если диапазон date_from (или date) начинается раньше границы
+        архива, страница читается через Transaction.ledger из обеих таблиц
+        с теми же фильтрами. Поиск (?search=) идет по FTS-индексу, где
+        архивных транзакций нет: тогда они в список не входят, а граница
+        архива передается в заголовке X-Archived-Before.
+
+        Returns:
+            Response: Страница транзакций.
+        """
+        projection = self.get_projection()
+        queryset = self.filter_queryset(self.get_queryset())
+        params = request.query_params
+        date_from = parse_date(params.get('date_from') or params.get('date') or '')
+        archived_before = ArchiveState.objects.hidden_before(date_from)
+        searching = bool(params.get(TransactionSearchFilter.search_param))
+        if archived_before is not None and not searching:
+            queryset = Transaction.ledger.rows(date_from, refine=filterset_refiner(params))
+        queryset = flat_queryset(queryset, projection)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(serialize_rows(page, projection))
+        else:
+            response = Response(serialize_rows(queryset, projection))
+        if archived_before is not None and searching:
+            response[ARCHIVED_BEFORE_HEADER] = archived_before.isoformat()
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        """Одна транзакция.
+
+        С параметрами fields или expand читается через values() с выбранными
+        колонками, без них - через TransactionSerializer. Поиск записи - как
+        в get_object: с фильтрами запроса, 404 для некорректного pk и
+        проверкой прав на объект.
+
+        Returns:
+            Response: Данные транзакции.
+        """
+        projection = self.get_projection()
+        if projection is DEFAULT_PROJECTION:
+            return super().retrieve(request, *args, **kwargs)
+        queryset = flat_queryset(self.filter_queryset(self.get_queryset()), projection)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(request, row)
+        return Response(projection.row(row))
+
+    @action(detail=False, methods=['get'])
+    def report(self, request):
+        """Сводный отчет по движению денежных средств.
+
+        Параметры запроса:
+        - period: day, week или month (необязательно)
+        - group_by: status, operation_type, category, subcategory через запятую
+        - date_from, date_to: диапазон дат в формате YYYY-MM-DD
+
+        Пример: /api/transactions/report/?period=month&group_by=operation_type
+
+        Returns:
+            Response: {'period': ..., 'group_by': [...], 'results': [...]}.
+        """
+        query = TransactionReportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        group_by = params.get('group_by', [])
+        results = cashflow_summary(
+            period=params.get('period'),
+            group_by=group_by,
+            date_from=params.get('date_from'),
+            date_to=params.get('date_to'),
+        )
+        return Response({
+            'period': params.get('period'),
+            'group_by': group_by,
+            'results': results,
+        })
+
+    @action(detail=False, methods=['get'])
+    def balance(self, request):
+        """Нарастающий остаток денежных средств по статусам.
+
+        Параметры запроса:
+        - date_from, date_to: диапазон дат в формате YYYY-MM-DD
+        - status: id статусов через запятую (по умолчанию - все)
+        - period: day, week, month, quarter или year (по умолчанию -
+          самый подробный, при котором точек не больше points)
+        - points: максимальное число точек на статус
+
+        Пример: /api/transactions/balance/?date_from=2024-01-01&points=52
+
+        Returns:
+            Response: {'period': ..., 'date_from': ..., 'date_to': ..., 'results': [...]}.
+        """
+        query = BalanceQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        try:
+            timeline = balance_timeline(
+                date_from=params.get('date_from'),
+                date_to=params.get('date_to'),
+                statuses=params.get('status'),
+                period=params.get('period'),
+                max_points=params.get('points', BALANCE_MAX_POINTS),
+            )
+        except ValueError as exc:
+            raise ValidationError({'points': [str(exc)]})
+        return Response(timeline)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Пакетное создание и обновление транзакций.
+
+        Принимает JSON-список транзакций (не более BATCH_MAX_SIZE). Элементы
+        с id частично обновляют существующие транзакции, без id - создают
+        новые. Корректные элементы сохраняются, для остальных возвращаются
+        ошибки.
+
+        Returns:
+            Response: Итоги и результат по каждому элементу в порядке запроса.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({'non_field_errors': ['Ожидается список транзакций']})
+        if len(items) > BATCH_MAX_SIZE:
+            raise ValidationError({'non_field_errors': [f'Не более {BATCH_MAX_SIZE} транзакций за запрос']})
+
+        result = apply_batch(items)
+        response_status = status.HTTP_200_OK if not result['errors'] else status.HTTP_207_MULTI_STATUS
+        return Response(result, status=response_status)